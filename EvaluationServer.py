@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+import laminate_batch
+import load_cases
+import matlib
+import stiffness_cache
+from Laminate import Laminate
+from Material import Material
+
+
+class EvaluationRequest:
+
+    def __init__(self, request: dict) -> None:
+        """
+        A parsed evaluation request. The request is a JSON object with:
+            "id": Any value, returned with the response.
+            "layup": {"orientations": [...], "thicknesses": [...] or "thickness": float,
+                      "material": a name in "matlib.py" or a material dict,
+                      or "materials": [...] with "material_indices": [...]}
+                      with at least one ply and a positive total thickness.
+            "load_case": Optional. A load case on the format used by "Laminate.calculate_exposure_factors".
+            "deformation_limits": Required with "load_case".
+        """
+        layup = request["layup"]
+        self.id = request.get("id")
+        self.orientations = np.asarray(layup["orientations"], dtype=np.float64)
+        if "thicknesses" in layup:
+            self.thicknesses = np.asarray(layup["thicknesses"], dtype=np.float64)
+        else:
+            self.thicknesses = np.full(len(self.orientations), layup["thickness"], np.float64)
+        if "materials" in layup:
+            self.materials = [self.resolve_material(material) for material in layup["materials"]]
+            self.material_indices = np.asarray(layup["material_indices"], dtype=np.int16)
+        else:
+            self.materials = [self.resolve_material(layup["material"])]
+            self.material_indices = np.zeros(len(self.orientations), np.int16)
+        if not len(self.orientations) == len(self.thicknesses) == len(self.material_indices):
+            raise ValueError("The orientations, thicknesses and material indices must have the same length")
+        # Layups without thickness have no stiffness, and would fail the batch they are evaluated in
+        if not len(self.orientations):
+            raise ValueError("The layup has no plies")
+        if not (np.isfinite(self.orientations).all() and np.isfinite(self.thicknesses).all()):
+            raise ValueError("The orientations and thicknesses must be finite")
+        if (self.thicknesses < 0).any() or not self.thicknesses.sum() > 0:
+            raise ValueError("The ply thicknesses must be non-negative, with a positive total thickness")
+        if self.material_indices.min() < 0 or self.material_indices.max() >= len(self.materials):
+            raise ValueError("The material indices must refer to the given materials")
+        self.load_case = request.get("load_case")
+        self.deformation_limits = request.get("deformation_limits")
+        if self.load_case is not None and self.deformation_limits is None:
+            raise ValueError("A load case requires deformation limits")
+        self.received = time.perf_counter()
+        self.future = None
+        pass
+
+    @staticmethod
+    def resolve_material(material) -> Material:
+        if isinstance(material, str):
+            found = matlib.get(material)
+            if found is False:
+                raise ValueError("Unknown material '{}'".format(material))
+            return Material.from_dict(found)
+        return Material.from_dict(material)
+
+
+def evaluate_batch(requests: list[EvaluationRequest]) -> list[dict]:
+    """
+    Evaluates a batch of requests with one vectorized ABD computation, and one batched solve for all load cases
+    that only prescribe loads. Load cases with prescribed deformations are solved one at a time.
+    :return: The response of each request.
+    """
+    # A shared material table for the whole batch
+    materials = {}
+    material_indices = []
+    for request in requests:
+        table = [materials.setdefault(material, len(materials)) for material in request.materials]
+        material_indices.append(np.asarray(table, np.int16)[request.material_indices])
+    orientations, thicknesses, material_indices = laminate_batch.pad_layups(
+        [request.orientations for request in requests], [request.thicknesses for request in requests],
+        material_indices)
+    Qts = laminate_batch.compute_Qt_cached(orientations=orientations, material_indices=material_indices,
+                                           materials=list(materials), cache=stiffness_cache.cache)
+    ABDs = laminate_batch.compute_ABD_from_Qt(Qts, thicknesses)
+    laminate_thicknesses = thicknesses.sum(axis=1)
+    Exs, Eys, Gxys, vxys = laminate_batch.laminate_properties_batch(ABDs[:, :3, :3], laminate_thicknesses)
+
+    responses = [{"id": request.id,
+                  "thickness": float(laminate_thicknesses[i]),
+                  "properties": {"Ex": float(Exs[i]), "Ey": float(Eys[i]), "Gxy": float(Gxys[i]),
+                                 "vxy": float(vxys[i])}}
+                 for i, request in enumerate(requests)]
+
+    # The loads of all requests with load cases are stacked, solved together and reduced per request
+    batched = []
+    for i, request in enumerate(requests):
+        if request.load_case is None:
+            continue
+        try:
+            batched.append((i, load_cases.load_case_matrix(request.load_case)))
+        except ValueError:
+            responses[i]["exposure_factors"] = [float(value) for value in Laminate.exposure_factors_from_ABD(
+                ABDs[i], load_case=request.load_case, deformation_limits=request.deformation_limits)]
+    if batched:
+        request_indices = np.concatenate([np.full(len(loads), i) for i, loads in batched])
+        loads = np.concatenate([loads for _, loads in batched])
+        deformations = np.linalg.solve(ABDs[request_indices], loads[:, :, None])[:, :, 0]
+        start = 0
+        for i, request_loads in batched:
+            request_deformations = deformations[start:start+len(request_loads)]
+            start += len(request_loads)
+            exposure = load_cases.exposure_factors(request_deformations, requests[i].deformation_limits)
+            responses[i]["exposure_factors"] = exposure.max(axis=0).tolist()
+    return responses
+
+
+class EvaluationServer:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, batch_window: float = 0.002,
+                 max_batch_size: int = 1024, max_queue_size: int = 8192) -> None:
+        """
+        Local asyncio server evaluating laminates for many concurrent clients. Clients send one JSON request per line
+        (see "EvaluationRequest") and get one JSON response per line, in the order of their requests. Requests arriving
+        within "batch_window" seconds are evaluated together by "evaluate_batch" in a worker thread.
+        A request {"metrics": true} returns the metrics of the server.
+        :param host: The interface to listen on. The default only accepts local clients.
+        :param port: The port to listen on, 0 picks a free port.
+        :param batch_window: The time to wait for more requests after the first request of a batch.
+        :param max_batch_size: The maximum number of requests in a batch.
+        :param max_queue_size: The maximum number of requests waiting for evaluation. When the queue is full, the
+        server stops reading from the clients until there is room, which pushes back on the clients through TCP. Every
+        client also stops being read while it has "max_batch_size" responses waiting to be written.
+        """
+        self.host = host
+        self.port = port
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.queue = None
+        self.max_queue_size = max_queue_size
+        self.server = None
+        self._batcher = None
+
+        self.start_time = None
+        self.n_requests = 0
+        self.n_errors = 0
+        self.n_batches = 0
+        self.max_queue_depth = 0
+        self.evaluation_time = 0.0
+        # The latencies of the most recent requests, from being received to being answered
+        self.latencies = deque(maxlen=10000)
+        pass
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._batcher = asyncio.create_task(self.batch_loop())
+        self.start_time = time.perf_counter()
+        pass
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        self._batcher.cancel()
+        pass
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+        pass
+
+    async def enqueue(self, request: dict) -> asyncio.Future:
+        """
+        Queues a request for evaluation, waiting for room in the queue if it is full.
+        :return: A future with the response, which is set when the batch of the request has been evaluated.
+        """
+        try:
+            parsed = EvaluationRequest(request)
+        except (KeyError, TypeError, ValueError) as error:
+            self.n_errors += 1
+            return self._done({"id": request.get("id") if isinstance(request, dict) else None, "error": str(error)})
+        parsed.future = asyncio.get_running_loop().create_future()
+        await self.queue.put(parsed)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return parsed.future
+
+    async def submit(self, request: dict) -> dict:
+        """
+        Evaluates a request, batched with the other requests arriving at the same time.
+        """
+        return await (await self.enqueue(request))
+
+    async def batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.perf_counter()
+            try:
+                responses = await loop.run_in_executor(None, evaluate_batch, batch)
+            except Exception:
+                # A bad request fails its batch as a whole, so the requests are retried one at a time
+                responses = []
+                for request in batch:
+                    try:
+                        responses += await loop.run_in_executor(None, evaluate_batch, [request])
+                    except Exception as error:
+                        self.n_errors += 1
+                        responses.append({"id": request.id, "error": "{}: {}".format(type(error).__name__, error)})
+            self.evaluation_time += time.perf_counter() - start
+            self.n_batches += 1
+            now = time.perf_counter()
+            for request, response in zip(batch, responses):
+                self.latencies.append(now - request.received)
+                if not request.future.done():
+                    request.future.set_result(response)
+            self.n_requests += len(batch)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Responses are written in the order of the requests, while the requests are evaluated concurrently
+        responses = asyncio.Queue(maxsize=self.max_batch_size)
+
+        async def write_responses():
+            while True:
+                response = await responses.get()
+                if response is None:
+                    break
+                result = await response
+                try:
+                    # NaN and Infinity are not valid JSON for clients other than Python's json module
+                    line = json.dumps(result, allow_nan=False)
+                except ValueError as error:
+                    self.n_errors += 1
+                    line = json.dumps({"id": result.get("id"), "error": "Invalid response: {}".format(error)})
+                writer.write((line + "\n").encode())
+                await writer.drain()
+
+        writer_task = asyncio.create_task(write_responses())
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as error:
+                    self.n_errors += 1
+                    await responses.put(self._done({"id": None, "error": "Invalid JSON: {}".format(error)}))
+                    continue
+                if isinstance(request, dict) and request.get("metrics"):
+                    await responses.put(self._done(self.metrics()))
+                else:
+                    # The next line is not read before the request is admitted to the queue, which is what pushes
+                    # back on the clients when the queue is full
+                    await responses.put(await self.enqueue(request))
+            await responses.put(None)
+            await writer_task
+        except (asyncio.CancelledError, ConnectionError):
+            # The server is shutting down or the client disconnected, the remaining responses are dropped
+            pass
+        finally:
+            writer_task.cancel()
+            writer.close()
+        pass
+
+    @staticmethod
+    def _done(result) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(result)
+        return future
+
+    def metrics(self) -> dict:
+        """
+        :return: Request and batch counts, throughput, latency percentiles over the most recent requests in seconds,
+        and the queue depth.
+        """
+        elapsed = time.perf_counter() - self.start_time if self.start_time is not None else 0.0
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {"requests": self.n_requests,
+                "errors": self.n_errors,
+                "batches": self.n_batches,
+                "mean_batch_size": self.n_requests/self.n_batches if self.n_batches else 0.0,
+                "throughput": self.n_requests/elapsed if elapsed else 0.0,
+                "evaluation_time": self.evaluation_time,
+                "latency_p50": float(np.percentile(latencies, 50)),
+                "latency_p95": float(np.percentile(latencies, 95)),
+                "latency_p99": float(np.percentile(latencies, 99)),
+                "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+                "max_queue_depth": self.max_queue_depth}
+
+
+async def evaluate(requests: list[dict], host: str = "127.0.0.1", port: int = 8765) -> list[dict]:
+    """
+    Minimal client, sending the requests over one connection and returning the responses in order.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write("".join(json.dumps(request) + "\n" for request in requests).encode())
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local laminate evaluation server, see EvaluationServer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-window", type=float, default=0.002, help="Seconds to wait for a batch to fill")
+    parser.add_argument("--max-batch-size", type=int, default=1024)
+    parser.add_argument("--max-queue-size", type=int, default=8192)
+    args = parser.parse_args()
+    server = EvaluationServer(host=args.host, port=args.port, batch_window=args.batch_window,
+                              max_batch_size=args.max_batch_size, max_queue_size=args.max_queue_size)
+    print("Serving laminate evaluations on {}:{}".format(args.host, args.port))
+    asyncio.run(server.serve_forever())
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,78 @@
+import time
+
 import laminatelib
 import numpy as np
 from numpy import ndarray
-import copy
 
+import laminate_batch
+import load_cases
+import load_history
+import ply_strength
+import stiffness_cache
+from instrumentation import Instrumentation
+from LaminationParameters import LaminationParameters
+from Layup import Layup
 from Ply import Ply
 
 
 class Laminate:
 
-    def __init__(self, layup: list[Ply], name: str) -> None:
+    def __init__(self, layup: Layup | list[Ply], name: str, instrumentation: Instrumentation = None) -> None:
         """
         Class for modeling the in-plane properties of a laminate comprised of a stack of plies (using the "Ply"-class).
-        :param layup: A list of "Ply"-objects.
+        :param layup: A "Layup", or a list of "Ply"-objects which is converted to a "Layup".
         :param name: A chosen name for the laminate.
+        :param instrumentation: Records the time spent computing ABD matrices and solving load cases, if given.
         """
-        self.layup = copy.deepcopy(layup)
+        self.layup = Layup.from_plies(layup)
         self.name = name
+        self.instrumentation = instrumentation
         self.thickness = self.compute_thickness()
         self.A = self.compute_A()
+        # The ABD matrix is computed once per layup, see "compute_ABD"
+        self._ABD = None
+        self._ABD_layup = None
         pass
 
     def compute_thickness(self) -> float:
-        return sum([ply.thickness for ply in self.layup])
+        return self.layup.thickness
 
     def compute_A(self) -> ndarray:
-        A = np.zeros((3, 3), float)
-        h_bot = -self.thickness/2
-        for ply in self.layup:
-            Q = laminatelib.Q2D(ply.material)
-            Qt = laminatelib.Q2Dtransform(Q, ply.orientation)
-            h_top = h_bot + ply.thickness
-            A += Qt*(h_top-h_bot)
-            h_bot = h_top
-        return A
-
-    def compute_ABD(self):
-        ABD = np.zeros((6, 6), float)
-        h_bot = -self.thickness/2
-        for ply in self.layup:
-            Q = laminatelib.Q2D(ply.material)
-            Qt = laminatelib.Q2Dtransform(Q, ply.orientation)
-            h_top = h_bot + ply.thickness
-            ABD[0:3, 0:3] += Qt*(h_top-h_bot)
-            ABD[0:3, 3:6] += (1/2)*Qt*(h_top**2-h_bot**2)
-            ABD[3:6, 0:3] += (1/2)*Qt*(h_top**2-h_bot**2)
-            ABD[3:6, 3:6] += (1/3)*Qt*(h_top**3-h_bot**3)
-            h_bot = h_top
-        return ABD
+        orientations, thicknesses, material_indices, materials = laminate_batch.layup_arrays(self.layup)
+        Qts = laminate_batch.compute_Qt_cached(orientations=orientations, material_indices=material_indices,
+                                               materials=materials, cache=stiffness_cache.cache)
+        return laminate_batch.compute_A_from_Qt(Qts, thicknesses)[0]
+
+    def compute_ABD(self) -> ndarray:
+        """
+        :return: A copy of the ABD matrix, which may be modified by the caller.
+        """
+        return self._cached_ABD().copy()
+
+    def _cached_ABD(self) -> ndarray:
+        """
+        :return: The ABD matrix, read-only since it is cached until the layup is replaced.
+        """
+        if self._ABD is None or self._ABD_layup is not self.layup:
+            start = time.perf_counter() if self.instrumentation is not None else None
+            orientations, thicknesses, material_indices, materials = laminate_batch.layup_arrays(self.layup)
+            Qts = laminate_batch.compute_Qt_cached(orientations=orientations, material_indices=material_indices,
+                                                   materials=materials, cache=stiffness_cache.cache)
+            self._ABD = laminate_batch.compute_ABD_from_Qt(Qts, thicknesses)[0]
+            self._ABD.setflags(write=False)
+            self._ABD_layup = self.layup
+            if self.instrumentation is not None:
+                self.instrumentation.add_time("compute_ABD", time.perf_counter() - start)
+        elif self.instrumentation is not None:
+            self.instrumentation.count("ABD_cache_hits")
+        return self._ABD
+
+    def lamination_parameters(self) -> LaminationParameters:
+        """
+        :return: The lamination parameter representation of the laminate, for incremental stiffness updates.
+        Requires all plies to have the same material.
+        """
+        return LaminationParameters.from_laminate(self)
 
     def calculate_laminate_properties(self) -> tuple:
         Ex = (1/self.thickness)*(self.A[0, 0]-self.A[0, 1]**2/self.A[1, 1])
@@ -55,12 +81,81 @@ class Laminate:
         vxy = self.A[0, 1]/self.A[1, 1]
         return Ex, Ey, Gxy, vxy
 
-    def calculate_exposure_factors(self, load_case: dict, deformation_limits: list) -> list:
-        loads, deformations = laminatelib.solveLaminateLoadCase(self.compute_ABD(), **load_case)
+    def calculate_exposure_factors(self, load_case, deformation_limits: list) -> list:
+        """
+        :param load_case: A load case dict passed on to "laminatelib.solveLaminateLoadCase", or multiple load cases
+        on one of the formats accepted by "load_cases.load_case_matrix".
+        :param deformation_limits: A list with a limit or None for each of ex0, ey0, exy0, kx, ky, kxy (may be shorter).
+        :return: The exposure factors, i.e. the magnitudes of the deformations relative to their limits. For multiple
+        load cases the worst case of each exposure factor is returned.
+        """
+        ABD = self._cached_ABD()
+        if self.instrumentation is None:
+            return self.exposure_factors_from_ABD(ABD, load_case=load_case, deformation_limits=deformation_limits)
+        with self.instrumentation.timer("solve_load_case"):
+            return self.exposure_factors_from_ABD(ABD, load_case=load_case, deformation_limits=deformation_limits)
+
+    def calculate_exposure_history(self, source, deformation_limits: list,
+                                   chunk_size: int = load_history.CHUNK_SIZE) -> load_history.ExposureSummary:
+        """
+        Streams a load history through the laminate, holding only one chunk of time steps in memory at a time.
+        :param source: The load history, on one of the formats accepted by "load_history.read_load_chunks".
+        :param deformation_limits: A list with a limit or None for each of ex0, ey0, exy0, kx, ky, kxy (may be shorter).
+        :param chunk_size: The number of time steps evaluated at a time.
+        :return: The worst exposure factors, the time steps where they occur and the number of exceedances.
+        """
+        chunks = load_history.read_load_chunks(source, chunk_size=chunk_size)
+        return load_history.stream_exposure_factors(self._cached_ABD(), chunks=chunks,
+                                                    deformation_limits=deformation_limits)
+
+    def calculate_ply_stresses(self, load_case) -> ndarray:
+        """
+        :param load_case: A load case dict passed on to "laminatelib.solveLaminateLoadCase", or multiple load cases
+        on one of the formats accepted by "load_cases.load_case_matrix".
+        :return: The stresses (s1, s2, t12) in the material coordinate system at the bottom and top of every ply, with
+        shape (load cases, plies, 2, 3). See "ply_strength.ply_stresses".
+        """
+        deformations = self.deformations_from_ABD(self._cached_ABD(), load_case=load_case)
+        orientations, thicknesses, material_indices, materials = laminate_batch.layup_arrays(self.layup)
+        stress_matrices = ply_strength.ply_stress_matrices(orientations[0], material_indices[0], materials,
+                                                           cache=stiffness_cache.cache)
+        return ply_strength.ply_stresses(deformations, stress_matrices, thicknesses[0])
+
+    def calculate_strength_exposure_factors(self, load_case) -> tuple:
+        """
+        Evaluates the strength of every ply using the strength data of its material, for all load cases in one pass.
+        :param load_case: A load case dict passed on to "laminatelib.solveLaminateLoadCase", or multiple load cases
+        on one of the formats accepted by "load_cases.load_case_matrix".
+        :return: The maximum stress and the Tsai-Wu exposure factors at the bottom and top of every ply, each with
+        shape (load cases, plies, 2). The laminate fails where an exposure factor is 1 or larger.
+        """
+        stresses = self.calculate_ply_stresses(load_case)
+        strengths = ply_strength.strength_table(self.layup.materials)[self.layup.material_indices]
+        return ply_strength.strength_exposure_factors(stresses, strengths)
+
+    @staticmethod
+    def deformations_from_ABD(ABD: ndarray, load_case) -> ndarray:
+        """
+        :return: The mid-plane deformations of every load case with shape (load cases, 6).
+        """
+        try:
+            loads = load_cases.load_case_matrix(load_case)
+        except ValueError:
+            # Load case dicts with prescribed deformations are solved by laminatelib
+            loads, deformations = laminatelib.solveLaminateLoadCase(ABD, **load_case)
+            return np.asarray(deformations, float).reshape(1, 6)
+        return load_cases.solve_deformations(ABD, loads)
+
+    @staticmethod
+    def exposure_factors_from_ABD(ABD: ndarray, load_case, deformation_limits: list) -> list:
+        if not isinstance(load_case, dict):
+            loads = load_cases.load_case_matrix(load_case)
+            return list(load_cases.envelope_exposure_factors(ABD, loads, deformation_limits))
+        loads, deformations = laminatelib.solveLaminateLoadCase(ABD, **load_case)
         exposure_factors = []
         for idx, deformation_limit in enumerate(deformation_limits):
             if deformation_limit is not None:
-                exposure_factors.append(deformations[idx]/deformation_limit)
+                exposure_factors.append(abs(deformations[idx])/deformation_limit)
             else:
                 exposure_factors.append(0)
         return exposure_factors
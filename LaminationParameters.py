@@ -0,0 +1,144 @@
+import operator
+
+import numpy as np
+from numpy import ndarray
+
+import laminate_batch
+import stiffness_cache
+from Layup import Layup
+
+
+class LaminationParameters:
+
+    def __init__(self, material: dict, orientations: list = (), thicknesses: list = ()) -> None:
+        """
+        Compact representation of a single-material laminate by its lamination invariants and the thickness-weighted
+        trigonometric sums of its plies. A, B and D are linear combinations of these, and adding, popping or
+        re-orienting a ply updates the sums in constant time. Removing an interior ply shifts the plies above it,
+        which costs one vectorized update of those plies, but never a rebuild of the stack.
+        The sums are integrated from the bottom of the laminate and shifted to the mid-plane when A, B and D are formed.
+        :param material: The material of all plies. On the format used in "matlib.py".
+        :param orientations: The ply orientations in degrees, from the bottom ply.
+        :param thicknesses: The ply thicknesses.
+        """
+        self.material = material
+        self.U = laminate_batch.lamination_invariants(stiffness_cache.cache.get_Q(material))
+        self.orientations = []
+        self.thicknesses = []
+        self.z_bots = []
+        self.height = 0.0
+        # Rows hold the integrals of 1, z and z^2 over the plies, each multiplied by the trigonometric terms
+        self.W = np.zeros((3, 5), float)
+        for orientation, thickness in zip(orientations, thicknesses):
+            self.add_ply(orientation=orientation, thickness=thickness)
+        pass
+
+    @classmethod
+    def from_laminate(cls, laminate) -> "LaminationParameters":
+        """
+        :param laminate: A "Laminate" where all plies have the same material.
+        """
+        layup = Layup.from_plies(laminate.layup)
+        materials = [layup.materials[idx] for idx in np.unique(layup.material_indices)]
+        if len(set([stiffness_cache.material_key(material) for material in materials])) > 1:
+            raise ValueError("Lamination parameters require all plies to have the same material")
+        return cls(material=materials[0], orientations=layup.orientations.tolist(),
+                   thicknesses=layup.thicknesses.tolist())
+
+    @staticmethod
+    def _ply_weights(orientation: float, z_bot: float, z_top: float) -> ndarray:
+        trigonometric_terms = laminate_batch.trigonometric_weights([orientation], [1.0])
+        integrals = np.array([z_top-z_bot, (z_top**2-z_bot**2)/2, (z_top**3-z_bot**3)/3])
+        return integrals[:, None]*trigonometric_terms[None, :]
+
+    def add_ply(self, orientation: float, thickness: float) -> None:
+        """
+        Adds a ply on top of the laminate.
+        """
+        self.W += self._ply_weights(orientation, self.height, self.height+thickness)
+        self.orientations.append(orientation)
+        self.thicknesses.append(thickness)
+        self.z_bots.append(self.height)
+        self.height += thickness
+        pass
+
+    def pop_ply(self) -> tuple:
+        """
+        Removes the top ply of the laminate.
+        :return: The orientation and thickness of the removed ply.
+        """
+        orientation, thickness, z_bot = self.orientations.pop(), self.thicknesses.pop(), self.z_bots.pop()
+        self.W -= self._ply_weights(orientation, z_bot, z_bot+thickness)
+        self.height = z_bot
+        return orientation, thickness
+
+    def reorient_ply(self, index: int, orientation: float) -> None:
+        z_bot = self.z_bots[index]
+        z_top = z_bot + self.thicknesses[index]
+        self.W += self._ply_weights(orientation, z_bot, z_top) \
+            - self._ply_weights(self.orientations[index], z_bot, z_top)
+        self.orientations[index] = orientation
+        pass
+
+    def remove_ply(self, index: int) -> tuple:
+        """
+        Removes a ply anywhere in the laminate. The plies above it are moved down by its thickness, which changes
+        their z-integrals by the parallel axis theorem.
+        :param index: The index of the ply from the bottom, negative indices count from the top.
+        :return: The orientation and thickness of the removed ply.
+        """
+        n_plies = len(self.orientations)
+        index = operator.index(index)
+        if not -n_plies <= index < n_plies:
+            raise IndexError("Ply index {} out of range for {} plies".format(index, n_plies))
+        index %= n_plies
+        if index == n_plies-1:
+            return self.pop_ply()
+        orientation, thickness = self.orientations.pop(index), self.thicknesses.pop(index)
+        z_bot = self.z_bots.pop(index)
+        self.W -= self._ply_weights(orientation, z_bot, z_bot+thickness)
+
+        # Integrals of 1 and z over the plies above, before the shift
+        trigonometric_terms = laminate_batch.trigonometric_weights(np.array(self.orientations[index:], float)[:, None],
+                                                                   np.ones((len(self.orientations)-index, 1)))
+        z_bots = np.array(self.z_bots[index:])
+        z_tops = z_bots + np.array(self.thicknesses[index:])
+        above = (z_tops-z_bots) @ trigonometric_terms
+        above_z = ((z_tops**2-z_bots**2)/2) @ trigonometric_terms
+        # Shifting by -t: int(z-t) = int(z) - t*int(1), and int((z-t)^2) = int(z^2) - 2t*int(z) + t^2*int(1)
+        self.W[1] -= thickness*above
+        self.W[2] -= 2*thickness*above_z - thickness**2*above
+        for i in range(index, len(self.z_bots)):
+            self.z_bots[i] -= thickness
+        self.height -= thickness
+        return orientation, thickness
+
+    def trigonometric_weights(self) -> tuple:
+        """
+        :return: The trigonometric weights of the A, B and D matrices, relative to the mid-plane, each with shape (5,).
+        """
+        h = self.height
+        V_A = self.W[0]
+        V_B = self.W[1] - (h/2)*self.W[0]
+        V_D = self.W[2] - h*self.W[1] + (h**2/4)*self.W[0]
+        return V_A, V_B, V_D
+
+    def lamination_parameters(self) -> ndarray:
+        """
+        :return: The 12 lamination parameters V1-V4 of A, B and D, normalized by h, h^2/4 and h^3/12 respectively.
+        """
+        h = self.height
+        V_A, V_B, V_D = self.trigonometric_weights()
+        return np.concatenate([V_A[1:]/h, V_B[1:]*4/h**2, V_D[1:]*12/h**3])
+
+    def compute_ABD(self) -> ndarray:
+        V_A, V_B, V_D = self.trigonometric_weights()
+        ABD = np.empty((6, 6), float)
+        ABD[0:3, 0:3] = laminate_batch.stiffness_from_invariants(self.U, V_A)
+        ABD[0:3, 3:6] = laminate_batch.stiffness_from_invariants(self.U, V_B)
+        ABD[3:6, 0:3] = ABD[0:3, 3:6]
+        ABD[3:6, 3:6] = laminate_batch.stiffness_from_invariants(self.U, V_D)
+        return ABD
+
+    def compute_A(self) -> ndarray:
+        return laminate_batch.stiffness_from_invariants(self.U, self.W[0])
@@ -0,0 +1,118 @@
+import numpy as np
+from numpy import ndarray
+
+from Material import Material
+from Ply import Ply
+
+
+class Layup:
+
+    def __init__(self, orientations: ndarray, thicknesses: ndarray, material_indices: ndarray,
+                 materials: tuple) -> None:
+        """
+        Compact stack of plies, stored as parallel arrays from the bottom to the top ply together with a material table.
+        Slicing returns views of the arrays, and the materials are shared, so sub-stacks are never copied.
+        Iterating over a layup or indexing a single ply yields "Ply"-objects, created on demand.
+        :param orientations: The ply orientations in degrees.
+        :param thicknesses: The ply thicknesses.
+        :param material_indices: The index of the material of each ply in "materials".
+        :param materials: The material table. Materials on the format used in "matlib.py", or "Material"-objects.
+        """
+        self.orientations = np.asarray(orientations, dtype=np.float64)
+        self.thicknesses = np.asarray(thicknesses, dtype=np.float64)
+        self.material_indices = np.asarray(material_indices, dtype=np.int16)
+        self.materials = tuple(Material.from_dict(material) for material in materials)
+        pass
+
+    @classmethod
+    def from_plies(cls, plies) -> "Layup":
+        """
+        :param plies: A list of "Ply"-objects, or a "Layup" which is returned as is.
+        """
+        if isinstance(plies, Layup):
+            return plies
+        materials = {}
+        material_indices = []
+        for ply in plies:
+            material_indices.append(materials.setdefault(ply.material, len(materials)))
+        return cls(orientations=[ply.orientation for ply in plies], thicknesses=[ply.thickness for ply in plies],
+                   material_indices=material_indices, materials=tuple(materials))
+
+    @classmethod
+    def uniform(cls, material: dict, orientations: list, thickness: float) -> "Layup":
+        """
+        :return: A single-material layup where all plies have the same thickness.
+        """
+        return cls(orientations=orientations, thicknesses=np.full(len(orientations), thickness, np.float64),
+                   material_indices=np.zeros(len(orientations), np.int16), materials=(material,))
+
+    def __len__(self) -> int:
+        return len(self.orientations)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.ply(idx)
+
+    def __getitem__(self, key):
+        """
+        An integer gives a "Ply". A slice gives a "Layup" sharing the arrays of this layup, while a boolean mask or an
+        index array gives a "Layup" with copies of the selected plies.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.ply(key)
+        return Layup(orientations=self.orientations[key], thicknesses=self.thicknesses[key],
+                     material_indices=self.material_indices[key], materials=self.materials)
+
+    def __repr__(self) -> str:
+        return "Layup(orientations={}, thicknesses={}, materials={})".format(
+            self.orientations.tolist(), self.thicknesses.tolist(), [material["name"] for material in self.materials])
+
+    def ply(self, idx: int) -> Ply:
+        return Ply(material=self.materials[self.material_indices[idx]], orientation=float(self.orientations[idx]),
+                   thickness=float(self.thicknesses[idx]))
+
+    @property
+    def thickness(self) -> float:
+        return float(self.thicknesses.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory used by the ply arrays. The material table is shared and not included.
+        """
+        return self.orientations.nbytes + self.thicknesses.nbytes + self.material_indices.nbytes
+
+    def mirrored(self) -> "Layup":
+        """
+        :return: The symmetric layup made of this layup followed by its mirror image.
+        """
+        return Layup(orientations=np.concatenate([self.orientations, self.orientations[::-1]]),
+                     thicknesses=np.concatenate([self.thicknesses, self.thicknesses[::-1]]),
+                     material_indices=np.concatenate([self.material_indices, self.material_indices[::-1]]),
+                     materials=self.materials)
+
+    def is_symmetric(self) -> bool:
+        return bool(np.array_equal(self.orientations, self.orientations[::-1])
+                    and np.array_equal(self.thicknesses, self.thicknesses[::-1])
+                    and np.array_equal(self.material_indices, self.material_indices[::-1]))
+
+    def remove(self, mask: ndarray) -> "Layup":
+        """
+        :param mask: Boolean array that is True for the plies to remove.
+        :return: The layup without the masked plies.
+        """
+        return self[~np.asarray(mask, dtype=bool)]
+
+    def rotated(self, angle: float) -> "Layup":
+        """
+        :return: The layup with all plies rotated by the given angle in degrees.
+        """
+        return Layup(orientations=self.orientations+angle, thicknesses=self.thicknesses,
+                     material_indices=self.material_indices, materials=self.materials)
+
+    def with_material(self, material: dict) -> "Layup":
+        """
+        :return: The layup with all plies made of the given material.
+        """
+        return Layup(orientations=self.orientations, thicknesses=self.thicknesses,
+                     material_indices=np.zeros(len(self), np.int16), materials=(material,))
@@ -0,0 +1,89 @@
+from collections.abc import Mapping, Set
+
+
+def freeze(value):
+    """
+    :return: A hashable form of a material property value, where lists and tuples become tuples, sets become
+    frozensets and mappings become tuples of their items sorted by key. Used to hash and fingerprint materials with
+    nested property values.
+    """
+    if isinstance(value, Mapping):
+        return tuple(sorted(((key, freeze(item)) for key, item in value.items()), key=lambda pair: str(pair[0])))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, Set):
+        return frozenset(freeze(item) for item in value)
+    if hasattr(value, "tolist"):
+        # numpy arrays and scalars
+        return freeze(value.tolist())
+    return value
+
+
+class Material(Mapping):
+
+    __slots__ = ("_properties", "_hash")
+
+    def __init__(self, properties: Mapping = None, **kwargs) -> None:
+        """
+        Immutable and hashable material, read like the material dicts in "matlib.py" (e.g. material["E1"]).
+        Since it cannot change, it can be shared between any number of plies and laminates without being copied.
+        :param properties: The material properties, e.g. a dict from "matlib.py".
+        :param kwargs: Additional properties, overriding those in "properties".
+        """
+        properties = dict(properties if properties is not None else {}, **kwargs)
+        object.__setattr__(self, "_properties", properties)
+        object.__setattr__(self, "_hash", hash(freeze(properties)))
+        pass
+
+    def __getitem__(self, key: str):
+        return self._properties[key]
+
+    def __iter__(self):
+        return iter(self._properties)
+
+    def __len__(self) -> int:
+        return len(self._properties)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Material) and self._hash != other._hash:
+            return False
+        return Mapping.__eq__(self, other)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Material is immutable, use replace() to create a modified copy")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Material is immutable")
+
+    def __reduce__(self) -> tuple:
+        return Material, (self._properties,)
+
+    def __copy__(self) -> "Material":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "Material":
+        return self
+
+    def __repr__(self) -> str:
+        return "Material({!r})".format(self._properties)
+
+    def replace(self, **changes) -> "Material":
+        """
+        :return: A new material with the given properties changed, e.g. material.replace(E2=1.1*material["E2"]).
+        """
+        return Material(self._properties, **changes)
+
+    def as_dict(self) -> dict:
+        return dict(self._properties)
+
+    @classmethod
+    def from_dict(cls, material) -> "Material":
+        """
+        :param material: A material dict on the format used in "matlib.py", or a "Material" which is returned as is.
+        """
+        if isinstance(material, Material):
+            return material
+        return cls(material)
@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+
+import laminatelib
+import numpy as np
+from numpy import ndarray
+
+import matlib
+from Material import Material
+
+TEXT_PROPERTIES = ("name", "units", "type", "fiber", "description")
+NUMERIC_PROPERTIES = ("Vf", "rho",
+                      "E1", "E2", "E3", "v12", "v13", "v23", "G12", "G13", "G23",
+                      "a1", "a2", "a3",
+                      "XT", "YT", "ZT", "XC", "YC", "ZC", "S12", "S13", "S23", "f12", "f13", "f23")
+# Derived matrices stored per material, with the laminatelib function computing them and their shape
+DERIVED_MATRICES = {"Q2D": (laminatelib.Q2D, (3, 3)),
+                    "S2D": (laminatelib.S2D, (3, 3)),
+                    "C3D": (laminatelib.C3D, (6, 6)),
+                    "S3D": (laminatelib.S3D, (6, 6))}
+QUERY_OPERATORS = {"": "=", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+
+
+class MaterialDatabase:
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """
+        Persistent material store in an SQLite database, for libraries with many more material cards than "matlib.py".
+        Names are unique and looked up through an in-memory index, fiber, type and Vf are indexed for queries, and the
+        derived Q2D, S2D, C3D and S3D matrices are computed once when a material is added and stored with it.
+        :param path: The database file. The default keeps the database in memory, see "save".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        columns = ["name TEXT PRIMARY KEY"] + ["{} TEXT".format(key) for key in TEXT_PROPERTIES[1:]] \
+            + ["{} REAL".format(key) for key in NUMERIC_PROPERTIES] \
+            + ["{} BLOB".format(key) for key in DERIVED_MATRICES] + ["extra TEXT"]
+        self.connection.execute("CREATE TABLE IF NOT EXISTS materials ({})".format(", ".join(columns)))
+        for key in ("fiber", "type", "Vf"):
+            self.connection.execute("CREATE INDEX IF NOT EXISTS materials_{0} ON materials ({0})".format(key))
+        self.connection.commit()
+        self._materials = {}
+        pass
+
+    @classmethod
+    def from_matlib(cls, path: str = ":memory:") -> "MaterialDatabase":
+        """
+        :return: A database holding the materials in "matlib.materials".
+        """
+        database = cls(path)
+        database.add_many(matlib.materials)
+        return database
+
+    @classmethod
+    def load(cls, path: str) -> "MaterialDatabase":
+        """
+        Loads a database file into memory.
+        :raises FileNotFoundError: If there is no file at the path, as connecting to it would create an empty one.
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError("No material database at '{}'".format(path))
+        database = cls()
+        source = sqlite3.connect(path)
+        source.backup(database.connection)
+        source.close()
+        return database
+
+    def save(self, path: str) -> None:
+        target = sqlite3.connect(path)
+        self.connection.backup(target)
+        target.close()
+        pass
+
+    def close(self) -> None:
+        self.connection.close()
+        pass
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM materials").fetchone()[0]
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not False
+
+    def names(self) -> list[str]:
+        return [row[0] for row in self.connection.execute("SELECT name FROM materials ORDER BY name")]
+
+    def add(self, material: dict) -> None:
+        self.add_many([material])
+        pass
+
+    def add_many(self, materials: list[dict]) -> None:
+        """
+        Adds or replaces materials, computing their derived matrices. Materials on the format used in "matlib.py".
+        """
+        rows = [self._to_row(material) for material in materials]
+        keys = TEXT_PROPERTIES + NUMERIC_PROPERTIES + tuple(DERIVED_MATRICES) + ("extra",)
+        self.connection.executemany("INSERT OR REPLACE INTO materials ({}) VALUES ({})".format(
+            ", ".join(keys), ", ".join("?"*len(keys))), rows)
+        self.connection.commit()
+        for material in materials:
+            self._materials.pop(material["name"], None)
+        pass
+
+    @staticmethod
+    def _to_row(material: dict) -> tuple:
+        derived = []
+        for function, _ in DERIVED_MATRICES.values():
+            try:
+                derived.append(np.asarray(function(material), dtype=np.float64).tobytes())
+            except KeyError:
+                # Not all material cards have the constants needed for every derived matrix
+                derived.append(None)
+        extra = {key: value for key, value in material.items()
+                 if key not in TEXT_PROPERTIES and key not in NUMERIC_PROPERTIES}
+        try:
+            extra = json.dumps(extra) if extra else None
+        except TypeError as error:
+            raise ValueError("The additional properties of material '{}' must be JSON serializable: {}".format(
+                material.get("name"), error))
+        return tuple(material.get(key) for key in TEXT_PROPERTIES + NUMERIC_PROPERTIES) + tuple(derived) + (extra,)
+
+    def _from_row(self, row: tuple) -> Material:
+        keys = TEXT_PROPERTIES + NUMERIC_PROPERTIES
+        properties = {key: value for key, value in zip(keys, row) if value is not None}
+        if row[-1] is not None:
+            properties.update(json.loads(row[-1]))
+        return Material(properties)
+
+    def get(self, name: str):
+        """
+        :return: The material as an immutable "Material", or False if there is no material with the name (as
+        "matlib.get").
+        """
+        material = self._materials.get(name)
+        if material is None:
+            row = self.connection.execute("SELECT {}, extra FROM materials WHERE name = ?".format(
+                ", ".join(TEXT_PROPERTIES + NUMERIC_PROPERTIES)), (name,)).fetchone()
+            if row is None:
+                return False
+            material = self._materials[name] = self._from_row(row)
+        return material
+
+    def derived(self, name: str, key: str) -> ndarray:
+        """
+        :param name: The name of the material.
+        :param key: One of "Q2D", "S2D", "C3D" and "S3D".
+        :return: The stored derived matrix, or None if the material lacks the constants needed to compute it.
+        """
+        _, shape = DERIVED_MATRICES[key]
+        row = self.connection.execute("SELECT {} FROM materials WHERE name = ?".format(key), (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        if row[0] is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float64).reshape(shape)
+
+    def query(self, **conditions) -> list[Material]:
+        """
+        Bulk query on the stored properties. A keyword is a property name, optionally with one of the suffixes
+        __gt, __ge, __lt or __le, e.g. query(fiber="Carbon", type="UD", E1__gt=120000).
+        :return: The matching materials, ordered by name.
+        """
+        clauses = []
+        values = []
+        for keyword, value in conditions.items():
+            key, _, operator = keyword.partition("__")
+            if key not in TEXT_PROPERTIES + NUMERIC_PROPERTIES or operator not in QUERY_OPERATORS:
+                raise ValueError("Unsupported query condition '{}'".format(keyword))
+            clauses.append("{} {} ?".format(key, QUERY_OPERATORS[operator]))
+            values.append(value)
+        sql = "SELECT {}, extra FROM materials".format(", ".join(TEXT_PROPERTIES + NUMERIC_PROPERTIES))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [self._from_row(row) for row in self.connection.execute(sql + " ORDER BY name", values)]
@@ -0,0 +1,357 @@
+import argparse
+import time
+
+import numpy as np
+from numpy import ndarray
+
+import laminate_batch
+import load_cases
+import matlib
+from Layup import Layup
+from Ply import Ply
+
+# The material constants that can scatter, i.e. those the in-plane stiffness depends on
+SCATTERED_KEYS = ("E1", "E2", "v12", "G12")
+DISTRIBUTIONS = ("normal", "lognormal", "uniform")
+# The evaluated properties of every realization, "max_exposure" only with a load case
+OUTPUTS = ("Ex", "Ey", "Gxy", "vxy", "max_exposure")
+CHUNK_SIZE = 65536
+
+
+class QuantileSketch:
+
+    def __init__(self, relative_accuracy: float = 0.001) -> None:
+        """
+        Mergeable quantile sketch with logarithmically spaced buckets. Every quantile is returned with a relative error
+        of at most "relative_accuracy", using memory proportional to the logarithm of the range of the values rather
+        than to their number. Sketches of separate chunks can be merged in any order with the same result.
+        :param relative_accuracy: The largest relative error of the returned quantiles.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy)/(1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        # The counts of the positive values and of the magnitudes of the negative values, by bucket index
+        self.positive = {}
+        self.negative = {}
+        self.n_zero = 0
+        self.count = 0
+        pass
+
+    def update(self, values: ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        self.count += len(values)
+        self.n_zero += int(np.count_nonzero(values == 0))
+        for buckets, magnitudes in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(magnitudes):
+                indices, counts = np.unique(np.ceil(np.log(magnitudes)/self._log_gamma).astype(np.int64),
+                                            return_counts=True)
+                for index, count in zip(indices.tolist(), counts.tolist()):
+                    buckets[index] = buckets.get(index, 0) + count
+        pass
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.n_zero += other.n_zero
+        self.count += other.count
+        pass
+
+    def quantile(self, q):
+        """
+        :param q: A quantile or an array of quantiles between 0 and 1.
+        :return: The estimated quantiles.
+        """
+        if self.count == 0:
+            raise ValueError("The sketch is empty")
+        negative = sorted(self.negative, reverse=True)
+        positive = sorted(self.positive)
+        values = np.concatenate([-self._bucket_values(negative), [0.0], self._bucket_values(positive)])
+        counts = np.concatenate([[self.negative[index] for index in negative], [self.n_zero],
+                                 [self.positive[index] for index in positive]])
+        ranks = np.asarray(q, dtype=float)*(self.count - 1)
+        return values[np.searchsorted(np.cumsum(counts), ranks, side="right")]
+
+    def _bucket_values(self, indices: list) -> ndarray:
+        # The value of a bucket is the midpoint of its range, which is within the relative accuracy of all its values
+        return 2*self.gamma**np.asarray(indices, dtype=float)/(self.gamma + 1)
+
+
+class StreamingStatistics:
+
+    def __init__(self, relative_accuracy: float = 0.001) -> None:
+        """
+        The count, mean, variance, extremes and quantiles of a stream of values, updated one chunk at a time without
+        storing the values. Statistics of separate chunks are combined with "merge".
+        :param relative_accuracy: The relative accuracy of the quantiles, see "QuantileSketch".
+        """
+        self.count = 0
+        self.mean = 0.0
+        # The sum of squared deviations from the mean
+        self.M2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.sketch = QuantileSketch(relative_accuracy=relative_accuracy)
+        pass
+
+    def update(self, values: ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        chunk = StreamingStatistics(relative_accuracy=self.sketch.relative_accuracy)
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.M2 = float(((values - chunk.mean)**2).sum())
+        chunk.minimum = float(values.min())
+        chunk.maximum = float(values.max())
+        chunk.sketch.update(values)
+        self.merge(chunk)
+        pass
+
+    def merge(self, other: "StreamingStatistics") -> None:
+        # The parallel variant of Welford's algorithm (Chan et al.)
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta*other.count/count
+        self.M2 += other.M2 + delta**2*self.count*other.count/count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.sketch.merge(other.sketch)
+        pass
+
+    @property
+    def variance(self) -> float:
+        """
+        The sample variance.
+        """
+        return self.M2/(self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(self.variance)
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def summary(self, quantiles: tuple = (0.01, 0.05, 0.5, 0.95, 0.99)) -> dict:
+        summary = {"count": self.count, "mean": self.mean, "std": self.std, "min": self.minimum, "max": self.maximum}
+        summary.update({"q{:g}".format(q): float(value) for q, value in zip(quantiles, self.quantile(quantiles))})
+        return summary
+
+
+class ScatterSummary:
+
+    def __init__(self, statistics: dict, n_samples: int = 0, n_rejected: int = 0, entropy: int = None) -> None:
+        """
+        The streaming statistics of a Monte Carlo run (see "MaterialScatter.run").
+        :param statistics: The "StreamingStatistics" of every output, by name.
+        :param n_samples: The number of drawn material realizations.
+        :param n_rejected: The number of realizations that were not physically admissible and therefore left out.
+        :param entropy: The entropy of the root seed sequence, which reproduces the run.
+        """
+        self.statistics = statistics
+        self.n_samples = n_samples
+        self.n_rejected = n_rejected
+        self.entropy = entropy
+        pass
+
+    def __getitem__(self, name: str) -> StreamingStatistics:
+        return self.statistics[name]
+
+    def merge(self, other: "ScatterSummary") -> None:
+        for name, statistics in self.statistics.items():
+            statistics.merge(other.statistics[name])
+        self.n_samples += other.n_samples
+        self.n_rejected += other.n_rejected
+        pass
+
+    def __str__(self) -> str:
+        lines = ["{} realizations, {} rejected".format(self.n_samples, self.n_rejected),
+                 "{:>14}{:>14}{:>14}{:>14}{:>14}{:>14}".format("output", "mean", "std", "q0.05", "q0.5", "q0.95")]
+        for name, statistics in self.statistics.items():
+            summary = statistics.summary(quantiles=(0.05, 0.5, 0.95))
+            lines.append("{:>14}{:>14.6g}{:>14.6g}{:>14.6g}{:>14.6g}{:>14.6g}".format(
+                name, summary["mean"], summary["std"], summary["q0.05"], summary["q0.5"], summary["q0.95"]))
+        return "\n".join(lines)
+
+
+# The scatter model of a worker process, set once by the pool initializer
+_worker_scatter = None
+
+
+def _init_worker(scatter: "MaterialScatter") -> None:
+    global _worker_scatter
+    _worker_scatter = scatter
+    pass
+
+
+def _simulate_chunk(chunk: tuple) -> ScatterSummary:
+    seed_sequence, n_samples = chunk
+    return _worker_scatter.simulate_chunk(seed_sequence, n_samples)
+
+
+class MaterialScatter:
+
+    def __init__(self, material: dict, layup: Layup | list[Ply], distributions: dict, load_case=None,
+                 deformation_limits: list = None, relative_accuracy: float = 0.001) -> None:
+        """
+        Monte Carlo engine for the effect of material scatter on a laminate. Every realization draws one set of
+        material constants that all plies share, as for plies from the same material batch, and evaluates the
+        effective laminate properties and optionally the largest exposure factor of a load case.
+        :param material: The nominal material, on the format used in "matlib.py".
+        :param layup: The layup, of which only the orientations and thicknesses are used.
+        :param distributions: The scatter of each of "SCATTERED_KEYS" that varies, as (distribution, spread), e.g.
+        {"E2": ("normal", 0.05)}. The distributions are centred on the nominal value, and the spread is the
+        coefficient of variation for "normal" and "lognormal", and the relative half-width for "uniform".
+        :param load_case: Optional load cases on one of the formats accepted by "load_cases.load_case_matrix".
+        :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+        Required with "load_case".
+        :param relative_accuracy: The relative accuracy of the quantiles, see "QuantileSketch".
+        """
+        for key, (distribution, spread) in distributions.items():
+            if key not in SCATTERED_KEYS:
+                raise ValueError("Unsupported key '{}', expected one of {}".format(key, SCATTERED_KEYS))
+            if distribution not in DISTRIBUTIONS:
+                raise ValueError("Unknown distribution '{}', expected one of {}".format(distribution, DISTRIBUTIONS))
+        if load_case is not None and deformation_limits is None:
+            raise ValueError("A load case requires deformation limits")
+        self.material = {key: float(material[key]) for key in SCATTERED_KEYS}
+        self.distributions = dict(distributions)
+        self.loads = load_cases.load_case_matrix(load_case) if load_case is not None else None
+        self.deformation_limits = deformation_limits
+        self.relative_accuracy = relative_accuracy
+        self.outputs = OUTPUTS if load_case is not None else OUTPUTS[:-1]
+
+        # The ABD matrices are linear in the lamination invariants of the material, with weights that only depend on
+        # the layup
+        layup = Layup.from_plies(layup)
+        h_bot, h_top = laminate_batch.ply_coordinates(layup.thicknesses)
+        self.thickness = layup.thickness
+        self.weights = [laminate_batch.trigonometric_weights(layup.orientations, weights)
+                        for weights in (h_top - h_bot, (h_top**2 - h_bot**2)/2, (h_top**3 - h_bot**3)/3)]
+        pass
+
+    def sample(self, n_samples: int, rng: np.random.Generator) -> dict:
+        """
+        :return: The material constants of "n_samples" realizations, each with shape (n_samples,).
+        """
+        samples = {}
+        for key in SCATTERED_KEYS:
+            nominal = self.material[key]
+            if key not in self.distributions:
+                samples[key] = np.full(n_samples, nominal)
+                continue
+            distribution, spread = self.distributions[key]
+            if distribution == "normal":
+                samples[key] = rng.normal(nominal, spread*abs(nominal), n_samples)
+            elif distribution == "lognormal":
+                sigma = np.sqrt(np.log1p(spread**2))
+                samples[key] = nominal*rng.lognormal(-sigma**2/2, sigma, n_samples)
+            else:
+                samples[key] = nominal*rng.uniform(1 - spread, 1 + spread, n_samples)
+        return samples
+
+    def evaluate(self, samples: dict) -> tuple:
+        """
+        Evaluates a chunk of realizations in one vectorized pass.
+        :param samples: The material constants of the realizations, see "sample".
+        :return: The outputs by name, each with shape (n,), and a mask of the physically admissible realizations.
+        """
+        E1, E2, v12, G12 = (samples[key] for key in SCATTERED_KEYS)
+        admissible = (E1 > 0) & (E2 > 0) & (G12 > 0) & (v12**2*E2 < E1)
+        Q = laminate_batch.Q2D_batch(E1=np.where(admissible, E1, 1), E2=np.where(admissible, E2, 1),
+                                     v12=np.where(admissible, v12, 0), G12=np.where(admissible, G12, 1))
+        U = laminate_batch.lamination_invariants(Q)
+        A, B, D = (laminate_batch.stiffness_from_invariants(U, weights) for weights in self.weights)
+        outputs = dict(zip(OUTPUTS, laminate_batch.laminate_properties_batch(A, self.thickness)))
+        if self.loads is not None:
+            ABDs = np.block([[A, B], [B, D]])
+            try:
+                exposure = load_cases.envelope_exposure_factors(ABDs, self.loads, self.deformation_limits)
+                outputs["max_exposure"] = exposure.max(axis=1)
+            except np.linalg.LinAlgError:
+                # Some laminates of the chunk are singular. They are found by solving one realization at a time, so
+                # the others keep their exposure factors
+                outputs["max_exposure"] = np.array([self.max_exposure(ABD) for ABD in ABDs])
+        for values in outputs.values():
+            admissible &= np.isfinite(values)
+        return outputs, admissible
+
+    def max_exposure(self, ABD: ndarray) -> float:
+        """
+        :return: The largest exposure factor of one laminate over all load cases, or inf if the laminate is singular,
+        e.g. without plies in some direction, and cannot carry the load.
+        """
+        try:
+            return float(load_cases.envelope_exposure_factors(ABD, self.loads, self.deformation_limits).max())
+        except np.linalg.LinAlgError:
+            return np.inf
+
+    def simulate_chunk(self, seed_sequence: np.random.SeedSequence, n_samples: int) -> ScatterSummary:
+        """
+        :return: The statistics of "n_samples" realizations drawn from the seed sequence.
+        """
+        outputs, admissible = self.evaluate(self.sample(n_samples, np.random.default_rng(seed_sequence)))
+        statistics = {name: StreamingStatistics(relative_accuracy=self.relative_accuracy) for name in self.outputs}
+        for name in self.outputs:
+            statistics[name].update(outputs[name][admissible])
+        return ScatterSummary(statistics, n_samples=n_samples, n_rejected=int(n_samples - admissible.sum()))
+
+    def run(self, n_samples: int, seed: int = None, chunk_size: int = CHUNK_SIZE,
+            workers: int = None) -> ScatterSummary:
+        """
+        Draws and evaluates "n_samples" realizations in chunks of "chunk_size", holding only one chunk per process in
+        memory. Every chunk has its own seed sequence spawned from the root seed, and the chunks are merged in order, so
+        the result only depends on the seed and the chunk size, and not on the number of workers.
+        :param n_samples: The number of realizations.
+        :param seed: The root seed. If None, fresh entropy is used, which is stored in the result.
+        :param chunk_size: The number of realizations evaluated at a time.
+        :param workers: Number of worker processes. If larger than 1, the chunks are evaluated in parallel.
+        :return: The statistics of all outputs.
+        """
+        root = np.random.SeedSequence(seed)
+        n_chunks = -(-n_samples // chunk_size)
+        chunks = [(seed_sequence, min(chunk_size, n_samples - i*chunk_size))
+                  for i, seed_sequence in enumerate(root.spawn(n_chunks))]
+        summary = ScatterSummary({name: StreamingStatistics(relative_accuracy=self.relative_accuracy)
+                                  for name in self.outputs}, entropy=root.entropy)
+        if workers is not None and workers > 1:
+            # Imported here, since the process pool machinery is slow to import and only needed with workers
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+                for chunk_summary in executor.map(_simulate_chunk, chunks):
+                    summary.merge(chunk_summary)
+        else:
+            for seed_sequence, chunk_samples in chunks:
+                summary.merge(self.simulate_chunk(seed_sequence, chunk_samples))
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo material scatter of the Kevlar laminate in "
+                                                 "OptimizedLaminate.py, see MaterialScatter")
+    parser.add_argument("--samples", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    material = matlib.get("Kevlar-49/Epoxy")
+    layup = Layup.uniform(material=material, orientations=[0, 45, -45, -45, 45, 0], thickness=1)
+    scatter = MaterialScatter(material=material, layup=layup,
+                              distributions={"E1": ("normal", 0.03), "E2": ("normal", 0.05),
+                                             "v12": ("uniform", 0.1), "G12": ("lognormal", 0.08)},
+                              load_case={"Nx": 600, "Nxy": 300}, deformation_limits=[0.005, None, 0.005])
+    start = time.perf_counter()
+    summary = scatter.run(n_samples=args.samples, seed=args.seed, workers=args.workers)
+    print(summary)
+    print("{} realizations in {:.2f} s".format(summary.n_samples, time.perf_counter() - start))
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,150 @@
-import copy
+import time
 from operator import attrgetter
+
+import numpy as np
+
 import matlib
+import load_cases
+import ply_strength
+from instrumentation import Instrumentation
 from Laminate import Laminate
+from Layup import Layup
+from ParetoExplorer import ParetoExplorer
 from Ply import Ply
+from PlyStripSearch import PlyStripSearch
 
 
 class OptimizedLaminate(Laminate):
 
-    def __init__(self, laminate: Laminate, ply_thickness: float, load_case: dict, deformation_limits: list, hard_optimization: bool = True) -> None:
+    def __init__(self, laminate: Laminate, ply_thickness: float, load_case, deformation_limits: list,
+                 hard_optimization: bool = True, search: str = "branch_and_bound", workers: int = None,
+                 instrumentation: Instrumentation = None, max_time: float = None, max_evaluations: int = None,
+                 checkpoint: str = None, strength_criterion: str = None, explorer: ParetoExplorer = None) -> None:
+        """
+        Laminate with the ply thicknesses of another laminate reduced to the minimum allowed by a load case.
+        :param laminate: The suboptimal laminate.
+        :param ply_thickness: The thickness of the plies in the optimized laminate.
+        :param load_case: The load case on the format used by "Laminate.calculate_exposure_factors". Multiple load
+        cases (see "load_cases.load_case_matrix") are evaluated together, and the worst case drives the optimization.
+        :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+        :param hard_optimization: Whether to attempt removing symmetric ply pairs after the rough optimization.
+        :param search: The ply removal search, "branch_and_bound" (see "PlyStripSearch") or "exhaustive" (see
+        "strip_ply"). Layups that are not symmetric are always searched exhaustively.
+        :param workers: Number of worker processes used by the "branch_and_bound" search. The result does not depend
+        on the number of workers. Cannot be combined with a search budget or checkpoint.
+        :param instrumentation: Records counters and timers of the optimization and reports its progress, if given.
+        The report of the run is stored in "optimization_report".
+        :param max_time: Stop the "branch_and_bound" search after this many seconds, and use the best layup found so
+        far. The result, with a bound on its distance from the optimum, is stored in "search_result".
+        :param max_evaluations: Stop the "branch_and_bound" search after this many evaluations, as for "max_time".
+        :param checkpoint: A file that the "branch_and_bound" search is resumed from if it exists, and saved to
+        afterwards, so an interrupted or budgeted optimization can be continued. A budgeted or checkpointed search runs
+        depth-first in this process, and therefore raises a ValueError if more than one worker is requested.
+        :param strength_criterion: "max_stress" or "tsai_wu" to also require that no ply fails by the strength data of
+        its material (see "Laminate.calculate_strength_exposure_factors"), or None for the deformation limits only.
+        :param explorer: Keeps every candidate layup the "branch_and_bound" search evaluates, with the Pareto front of
+        them, so the trade-offs between e.g. mass, stiffness and exposure can be queried afterwards. See
+        "ParetoExplorer".
+        """
+        start = time.perf_counter()
+        if strength_criterion is not None and strength_criterion not in ply_strength.CRITERIA:
+            raise ValueError("Unknown strength criterion '{}', expected one of {}".format(strength_criterion,
+                                                                                       ply_strength.CRITERIA))
+        if workers is not None and workers > 1 \
+                and (max_time is not None or max_evaluations is not None or checkpoint is not None):
+            raise ValueError("A search budget or checkpoint cannot be combined with worker processes")
+        self.instrumentation = instrumentation
+        if not isinstance(load_case, dict):
+            load_case = load_cases.load_case_matrix(load_case)
         self.optimized_load_case = load_case
         self.deformation_limits = deformation_limits
-        exposure_factors = laminate.calculate_exposure_factors(load_case=load_case, deformation_limits=deformation_limits)
+        self.strength_criterion = strength_criterion
+        self.explorer = explorer
+        exposure_factors = laminate.calculate_exposure_factors(load_case=load_case,
+                                                               deformation_limits=deformation_limits)
         # It is assumed that the adjustment_factor has a value between 0 and 1.
         # If not, the laminate is broken and cannot be optimized by reducing the ply thickness.
-        adjustment_factor = max(exposure_factors)
+        adjustment_factor = max(max(exposure_factors), self.strength_exposure(laminate))
 
         # A first rough optimization
-        updated_layup = []
-        for ply in laminate.layup:
-            optimized_combined_layer_thickness = ply.thickness*adjustment_factor
-            n_new_plies_per_combined_layer = optimized_combined_layer_thickness // ply_thickness
-            if optimized_combined_layer_thickness % ply_thickness:
-                n_new_plies_per_combined_layer += 1
-            for i in range(int(n_new_plies_per_combined_layer)):
-                updated_layup.append(Ply(material=ply.material, orientation=ply.orientation, thickness=ply_thickness))
+        layup = laminate.layup
+        optimized_combined_layer_thicknesses = layup.thicknesses*adjustment_factor
+        n_new_plies_per_combined_layer = optimized_combined_layer_thicknesses // ply_thickness
+        n_new_plies_per_combined_layer += (optimized_combined_layer_thicknesses % ply_thickness) != 0
+        n_new_plies_per_combined_layer = np.maximum(n_new_plies_per_combined_layer, 0).astype(int)
+        updated_layup = Layup(orientations=np.repeat(layup.orientations, n_new_plies_per_combined_layer),
+                              thicknesses=np.full(n_new_plies_per_combined_layer.sum(), ply_thickness),
+                              material_indices=np.repeat(layup.material_indices, n_new_plies_per_combined_layer),
+                              materials=layup.materials)
 
         # Attempts at making a better optimization by removing layers
         if hard_optimization:
-            self.branch_optimal_laminates = []
-            unique_orientations = list(set([ply.orientation for ply in updated_layup]))
-            tmp_laminate = Laminate(layup=updated_layup, name="")
-
-            # Do the recursive iteration, filling the self.branch_optimal_laminates list
-            self.strip_ply(orientations=unique_orientations, laminate=tmp_laminate)
-            optimized_laminate = min(self.branch_optimal_laminates, key=attrgetter("thickness"))
-            updated_layup = optimized_laminate.layup
-
-        super().__init__(layup=updated_layup, name="Optimized_{}".format(laminate.name))
+            unique_orientations = list(set(updated_layup.orientations.tolist()))
+            if search == "branch_and_bound" and PlyStripSearch.is_symmetric(updated_layup):
+                self.ply_strip_search = PlyStripSearch(layup=updated_layup, orientations=unique_orientations,
+                                                       load_case=load_case, deformation_limits=deformation_limits,
+                                                       instrumentation=instrumentation,
+                                                       strength_criterion=strength_criterion,
+                                                       explorer=explorer)
+                if max_time is None and max_evaluations is None and checkpoint is None:
+                    updated_layup = self.ply_strip_search.search(workers=workers)
+                else:
+                    # The budgeted search is depth-first in this process, so it can stop and resume at any state
+                    self.search_result = self.ply_strip_search.search_anytime(
+                        max_time=max_time, max_evaluations=max_evaluations, checkpoint=checkpoint)
+                    updated_layup = self.search_result.layup
+            elif max_time is not None or max_evaluations is not None or checkpoint is not None \
+                    or explorer is not None:
+                raise ValueError("A search budget, checkpoint or explorer requires the branch_and_bound search of a "
+                                 "symmetric layup")
+            elif search in ("branch_and_bound", "exhaustive"):
+                self.branch_optimal_laminates = []
+                tmp_laminate = Laminate(layup=updated_layup, name="", instrumentation=instrumentation)
+
+                # Do the recursive iteration, filling the self.branch_optimal_laminates list
+                self.strip_ply(orientations=unique_orientations, laminate=tmp_laminate)
+                optimized_laminate = min(self.branch_optimal_laminates, key=attrgetter("thickness"))
+                updated_layup = optimized_laminate.layup
+            else:
+                raise ValueError("Unknown search '{}'".format(search))
+
+        super().__init__(layup=updated_layup, name="Optimized_{}".format(laminate.name),
+                         instrumentation=instrumentation)
 
         # The mass reduction is directly related to the thickness_reduction
         self.mass_reduction = (1 - self.thickness/laminate.thickness)*100
         self.suboptimal_laminate = laminate
+        self.optimization_report = None
+        if instrumentation is not None:
+            instrumentation.add_time("optimization", time.perf_counter() - start)
+            self.optimization_report = instrumentation.report()
         pass
 
-    def strip_ply(self, orientations: list[int], laminate: Laminate) -> None:
+    def strip_ply(self, orientations: list[int], laminate: Laminate, depth: int = 0) -> None:
         tmp_laminates = []
         max_exposure_factors = []
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            instrumentation.maximum("recursion_depth", depth)
+            instrumentation.progress("strip_ply")
 
         for i, orientation in enumerate(orientations):
-            tmp_layup = copy.deepcopy(laminate.layup)
+            if instrumentation is not None:
+                copy_start = time.perf_counter()
+                tmp_layup = list(laminate.layup)
+                instrumentation.add_time("copy_layup", time.perf_counter() - copy_start)
+            else:
+                tmp_layup = list(laminate.layup)
             for j, ply in enumerate(tmp_layup):
                 if ply.orientation == orientation:
                     # Need to remove plies symmetrically
                     tmp_layup.pop(-j-1)
                     tmp_layup.pop(j)
-                    tmp_laminate = Laminate(layup=tmp_layup, name="tmp_layup")
+                    tmp_laminate = Laminate(layup=tmp_layup, name="tmp_layup", instrumentation=instrumentation)
                     tmp_laminates.append(tmp_laminate)
-                    exposure_factors = tmp_laminate.calculate_exposure_factors(load_case=self.optimized_load_case,
-                                                                               deformation_limits=self.deformation_limits)
-                    max_exposure_factors.append(max(exposure_factors))
+                    exposure_factors = tmp_laminate.calculate_exposure_factors(
+                        load_case=self.optimized_load_case, deformation_limits=self.deformation_limits)
+                    max_exposure_factors.append(max(max(exposure_factors), self.strength_exposure(tmp_laminate)))
                     break
 
         # Not very elegant, but gets the job done
@@ -67,29 +153,48 @@ class OptimizedLaminate(Laminate):
             if max_exposure_factors[idx] >= 1:
                 idx_to_pop.append(idx)
 
+        if instrumentation is not None:
+            instrumentation.count("candidates", len(max_exposure_factors))
+            instrumentation.count("infeasible", len(idx_to_pop))
+
         for idx in idx_to_pop[::-1]:
             max_exposure_factors.pop(idx)
             #orientations.pop(idx)
             tmp_laminates.pop(idx)
 
         for tmp_laminate in tmp_laminates:
-            self.strip_ply(orientations=orientations, laminate=tmp_laminate)
+            self.strip_ply(orientations=orientations, laminate=tmp_laminate, depth=depth+1)
 
         # Recursion break criteria
         if len(tmp_laminates) == 0:
             self.branch_optimal_laminates.append(laminate)
 
+    def strength_exposure(self, laminate: Laminate) -> float:
+        """
+        :return: The largest strength exposure factor of the laminate over all load cases, plies and positions, or 0
+        without a strength criterion.
+        """
+        if self.strength_criterion is None:
+            return 0
+        exposure_factors = laminate.calculate_strength_exposure_factors(self.optimized_load_case)
+        return float(exposure_factors[ply_strength.CRITERIA.index(self.strength_criterion)].max())
+
     def __repr__(self) -> str:
+        if isinstance(self.optimized_load_case, dict):
+            load_case_description = "the load case {}".format(self.optimized_load_case)
+        else:
+            load_case_description = "{} load cases".format(len(self.optimized_load_case))
         return "I am the {} mm thick optimized laminate '{}' that " \
                "saved you {} % mass over the {} mm thick suboptimal laminate" \
-               " '{}' for the load case {}. Nice!\nMy exposure factors are {}".format(round(self.thickness, 2),
-                                                                                      self.name,
-                                                                                      round(self.mass_reduction, 2),
-                                                                                      round(self.suboptimal_laminate.thickness, 2),
-                                                                                      self.suboptimal_laminate.name,
-                                                                                      self.optimized_load_case,
-                                                                                      self.calculate_exposure_factors(self.optimized_load_case,
-                                                                                                                      self.deformation_limits))
+               " '{}' for {}. Nice!\nMy exposure factors are {}".format(round(self.thickness, 2),
+                                                                        self.name,
+                                                                        round(self.mass_reduction, 2),
+                                                                        round(self.suboptimal_laminate.thickness, 2),
+                                                                        self.suboptimal_laminate.name,
+                                                                        load_case_description,
+                                                                        self.calculate_exposure_factors(
+                                                                            self.optimized_load_case,
+                                                                            self.deformation_limits))
 
 
 def main():
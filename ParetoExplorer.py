@@ -0,0 +1,223 @@
+import numpy as np
+from numpy import ndarray
+
+from Layup import Layup
+
+# The objectives of the default design space exploration, as (column, "min" or "max")
+OBJECTIVES = (("mass", "min"), ("Ex", "max"), ("Ey", "max"), ("Gxy", "max"), ("max_exposure", "min"))
+# The scalar columns of a "CandidateStore", in addition to the ply masks and the exposure factors
+COLUMNS = ("thickness", "mass", "Ex", "Ey", "Gxy", "vxy", "max_exposure", "strength_exposure", "feasible")
+
+
+class CandidateStore:
+
+    def __init__(self, layup: Layup, n_exposure_factors: int, capacity: int = 1024) -> None:
+        """
+        Compact columnar store of evaluated candidate layups, which are all subsets of the plies of a parent layup.
+        Every candidate is stored as a bit mask of the plies it keeps, and one value per column, in arrays that grow
+        by doubling.
+        :param layup: The parent layup.
+        :param n_exposure_factors: The number of exposure factors of every candidate, i.e. of deformation limits.
+        :param capacity: The initial number of candidates there is room for.
+        """
+        self.parent_layup = layup
+        self.n_candidates = 0
+        self._masks = np.zeros((capacity, (len(layup) + 7)//8), np.uint8)
+        self._exposure_factors = np.zeros((capacity, n_exposure_factors))
+        self._columns = {name: np.zeros(capacity, bool if name == "feasible" else float) for name in COLUMNS}
+        pass
+
+    def __len__(self) -> int:
+        return self.n_candidates
+
+    def _reserve(self, n_candidates: int) -> None:
+        capacity = len(self._masks)
+        if n_candidates <= capacity:
+            return
+        while capacity < n_candidates:
+            capacity *= 2
+
+        def grow(array: ndarray) -> ndarray:
+            grown = np.zeros((capacity,) + array.shape[1:], array.dtype)
+            grown[:self.n_candidates] = array[:self.n_candidates]
+            return grown
+
+        self._masks = grow(self._masks)
+        self._exposure_factors = grow(self._exposure_factors)
+        self._columns = {name: grow(array) for name, array in self._columns.items()}
+        pass
+
+    def append(self, masks: ndarray, columns: dict) -> ndarray:
+        """
+        :param masks: Boolean arrays that are True for the kept plies of the parent layup, with shape (N, P).
+        :param columns: The values of every column in "COLUMNS" with shape (N,), and the "exposure_factors" with shape
+        (N, n_exposure_factors).
+        :return: The ids of the new candidates.
+        """
+        start = self.n_candidates
+        stop = start + len(masks)
+        self._reserve(stop)
+        self._masks[start:stop] = np.packbits(masks, axis=1)
+        self._exposure_factors[start:stop] = columns["exposure_factors"]
+        for name, array in self._columns.items():
+            array[start:stop] = columns[name]
+        self.n_candidates = stop
+        return np.arange(start, stop)
+
+    def column(self, name: str) -> ndarray:
+        """
+        :param name: One of "COLUMNS", or "exposure_factors".
+        :return: A read-only view of the column for all stored candidates.
+        """
+        array = self._exposure_factors if name == "exposure_factors" else self._columns[name]
+        view = array[:self.n_candidates]
+        view.setflags(write=False)
+        return view
+
+    def mask(self, candidate: int) -> ndarray:
+        return np.unpackbits(self._masks[candidate], count=len(self.parent_layup)).astype(bool)
+
+    def layup(self, candidate: int) -> Layup:
+        return self.parent_layup[self.mask(candidate)]
+
+    def save(self, path: str) -> None:
+        """
+        Saves the store to a .npz file, with the parent layup and the packed ply masks.
+        """
+        np.savez(path, orientations=self.parent_layup.orientations, thicknesses=self.parent_layup.thicknesses,
+                 masks=self._masks[:self.n_candidates], exposure_factors=self.column("exposure_factors"),
+                 **{name: self.column(name) for name in COLUMNS})
+        pass
+
+
+class ParetoFront:
+
+    def __init__(self, senses: list[str]) -> None:
+        """
+        Incrementally updated set of non-dominated points. A point dominates another if it is at least as good in every
+        objective and better in at least one.
+        :param senses: "min" or "max" for every objective.
+        """
+        for sense in senses:
+            if sense not in ("min", "max"):
+                raise ValueError("Unknown objective sense '{}', expected 'min' or 'max'".format(sense))
+        # The objectives are stored negated where they are maximized, so that all are minimized
+        self.signs = np.array([1.0 if sense == "min" else -1.0 for sense in senses])
+        self.ids = np.zeros(0, np.int64)
+        self.values = np.zeros((0, len(senses)))
+        pass
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def dominated(points: ndarray, by: ndarray, block_size: int = 1024) -> ndarray:
+        """
+        :param points: Points to test with shape (N, k), in the minimized form.
+        :param by: Points that may dominate them with shape (M, k).
+        :return: Boolean array that is True for the points dominated by any of "by".
+        """
+        result = np.zeros(len(points), bool)
+        if len(by) == 0:
+            return result
+        for start in range(0, len(points), block_size):
+            block = points[start:start+block_size, None, :]
+            result[start:start+block_size] = ((by[None] <= block).all(axis=-1)
+                                              & (by[None] < block).any(axis=-1)).any(axis=1)
+        return result
+
+    def insert(self, ids: ndarray, values: ndarray) -> None:
+        """
+        Inserts a batch of points. Only the points that are not dominated by the front or by the rest of the batch
+        enter the front, and the points of the front they dominate are removed.
+        :param ids: The ids of the points with shape (N,).
+        :param values: The objective values of the points with shape (N, k).
+        """
+        values = np.asarray(values, dtype=float).reshape(len(ids), len(self.signs))*self.signs
+        ids = np.asarray(ids, np.int64)
+        keep = ~self.dominated(values, values)
+        ids, values = ids[keep], values[keep]
+        keep = ~self.dominated(values, self.values)
+        ids, values = ids[keep], values[keep]
+        if len(ids):
+            remaining = ~self.dominated(self.values, values)
+            self.ids = np.concatenate([self.ids[remaining], ids])
+            self.values = np.concatenate([self.values[remaining], values])
+        pass
+
+
+class ParetoExplorer:
+
+    def __init__(self, objectives: tuple = OBJECTIVES, feasible_only: bool = True) -> None:
+        """
+        Design space exploration of a ply stripping search (see "PlyStripSearch" and "OptimizedLaminate"). Every
+        candidate layup the search evaluates is kept in a "CandidateStore", and the non-dominated candidates in a
+        "ParetoFront", so trade-offs between e.g. mass, stiffness and exposure can be queried after a single run.
+        :param objectives: The objectives of the front as (column, "min" or "max"), with columns from "COLUMNS".
+        The "mass" is the areal mass from the material "rho", so ("thickness", "min") should be used for materials
+        without it.
+        :param feasible_only: Whether only the candidates within all limits can enter the front.
+        """
+        for column, _ in objectives:
+            if column not in COLUMNS:
+                raise ValueError("Unknown objective '{}', expected one of {}".format(column, COLUMNS))
+        self.objectives = tuple(objectives)
+        self.feasible_only = feasible_only
+        self.store = None
+        self.pareto_front = None
+        pass
+
+    def attach(self, layup: Layup, n_exposure_factors: int) -> None:
+        """
+        Starts a new exploration of the candidates of a parent layup.
+        """
+        self.store = CandidateStore(layup, n_exposure_factors=n_exposure_factors)
+        self.pareto_front = ParetoFront([sense for _, sense in self.objectives])
+        pass
+
+    def record(self, masks: ndarray, columns: dict) -> ndarray:
+        """
+        Stores a batch of evaluated candidates and updates the front.
+        :return: The ids of the candidates.
+        """
+        ids = self.store.append(masks, columns)
+        values = np.stack([np.asarray(columns[column], dtype=float) for column, _ in self.objectives], axis=1)
+        selected = np.isfinite(values).all(axis=1)
+        if self.feasible_only:
+            selected &= np.asarray(columns["feasible"], bool)
+        self.pareto_front.insert(ids[selected], values[selected])
+        return ids
+
+    def front(self) -> ndarray:
+        """
+        :return: The ids of the candidates on the front, sorted by the first objective.
+        """
+        ids = self.pareto_front.ids
+        return ids[np.argsort(self.store.column(self.objectives[0][0])[ids], kind="stable")]
+
+    def front_columns(self) -> dict:
+        """
+        :return: The columns of the candidates on the front, sorted by the first objective, with their "id".
+        """
+        ids = self.front()
+        columns = {"id": ids}
+        columns.update({name: self.store.column(name)[ids] for name in COLUMNS + ("exposure_factors",)})
+        return columns
+
+    def layup(self, candidate: int) -> Layup:
+        return self.store.layup(candidate)
+
+    def __len__(self) -> int:
+        return len(self.store) if self.store is not None else 0
+
+    def __str__(self) -> str:
+        lines = ["{} candidates, {} on the front".format(len(self), len(self.pareto_front or ())),
+                 "{:>8}{:>12}{:>12}{:>12}{:>12}{:>12}{:>14}".format("id", "thickness", "mass", "Ex", "Ey", "Gxy",
+                                                                    "max_exposure")]
+        if self.store is not None:
+            columns = self.front_columns()
+            for i in range(len(columns["id"])):
+                lines.append("{:>8}{:>12.4g}{:>12.4g}{:>12.5g}{:>12.5g}{:>12.5g}{:>14.4g}".format(
+                    columns["id"][i], columns["thickness"][i], columns["mass"][i], columns["Ex"][i],
+                    columns["Ey"][i], columns["Gxy"][i], columns["max_exposure"][i]))
+        return "\n".join(lines)
@@ -1,19 +1,58 @@
-import laminatelib
-import copy
+import stiffness_cache
+from Material import Material
 
 
 class Ply:
 
+    __slots__ = ("material", "orientation", "thickness", "Te", "Q")
+
     def __init__(self, material: dict, orientation: int, thickness: float) -> None:
         """
-        Simple class for storing ply information in an object.
-        :param material: The material comprising the ply. On the format used in "matlib.py".
+        Simple immutable class for storing ply information in an object. Plies can therefore be shared between layups
+        instead of being copied.
+        :param material: The material comprising the ply. On the format used in "matlib.py", or a "Material".
         :param orientation: The ply orientation in degrees relative to the xyz-coordinate system.
         :param thickness: The thickness of the ply.
         """
-        self.material = copy.deepcopy(material)  # Deepcopy to remove pointer to original material, allowing for change
-        self.orientation = orientation
-        self.thickness = thickness
-        self.Te = laminatelib.T2De(self.orientation)
-        self.Q = laminatelib.Q2D(self.material)
+        # Material dicts are converted once to an immutable "Material", which removes the pointer to the original dict
+        object.__setattr__(self, "material", Material.from_dict(material))
+        object.__setattr__(self, "orientation", orientation)
+        object.__setattr__(self, "thickness", thickness)
+        object.__setattr__(self, "Te", stiffness_cache.cache.get_Te(orientation))
+        object.__setattr__(self, "Q", stiffness_cache.cache.get_Q(self.material))
         pass
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Ply is immutable, use replace() to create a modified copy")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Ply is immutable")
+
+    def __reduce__(self) -> tuple:
+        return Ply, (self.material, self.orientation, self.thickness)
+
+    def __copy__(self) -> "Ply":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "Ply":
+        return self
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Ply):
+            return NotImplemented
+        return (self.material, self.orientation, self.thickness) == (other.material, other.orientation, other.thickness)
+
+    def __hash__(self) -> int:
+        return hash((self.material, self.orientation, self.thickness))
+
+    def __repr__(self) -> str:
+        return "Ply(material={!r}, orientation={}, thickness={})".format(self.material["name"], self.orientation,
+                                                                         self.thickness)
+
+    def replace(self, material: dict = None, orientation: float = None, thickness: float = None) -> "Ply":
+        """
+        :return: A new ply with the given attributes changed.
+        """
+        return Ply(material=self.material if material is None else material,
+                   orientation=self.orientation if orientation is None else orientation,
+                   thickness=self.thickness if thickness is None else thickness)
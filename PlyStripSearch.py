@@ -0,0 +1,580 @@
+import os
+import pickle
+import time
+from concurrent.futures import Executor
+
+import numpy as np
+from numpy import ndarray
+
+import laminate_batch
+import load_cases
+import ply_strength
+import stiffness_cache
+from instrumentation import Instrumentation
+from Laminate import Laminate
+from Layup import Layup
+from Material import freeze
+from ParetoExplorer import ParetoExplorer
+from Ply import Ply
+
+
+class StateEvaluator:
+
+    def __init__(self, Qts: ndarray, thicknesses: ndarray, positions: list[ndarray], load_case,
+                 deformation_limits: list, strength_criterion: str = None, stress_matrices: ndarray = None,
+                 strengths: ndarray = None, densities: ndarray = None) -> None:
+        """
+        The compact array representation of a ply stripping problem, holding everything needed to evaluate a
+        search state. It is shipped once to every worker process instead of pickling "Ply"-objects and materials.
+        :param Qts: The transformed stiffness matrices of the plies in the full layup, with shape (P, 3, 3).
+        :param thicknesses: The thicknesses of the plies in the full layup, with shape (P,).
+        :param positions: For each strippable orientation, the layup indices of the plies with that orientation.
+        :param load_case: A load case dict, or a load case matrix from "load_cases.load_case_matrix".
+        :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+        :param strength_criterion: One of "ply_strength.CRITERIA" if the plies must not fail, or None.
+        :param stress_matrices: The matrices from "ply_strength.ply_stress_matrices" of the plies in the full layup,
+        with shape (P, 3, 3). Required with "strength_criterion".
+        :param strengths: The strengths of the plies in the full layup, with shape (P, 6). Required with
+        "strength_criterion".
+        :param densities: The densities of the plies in the full layup, with shape (P,), for the areal mass in
+        "describe". NaN where unknown.
+        """
+        self.Qts = Qts
+        self.thicknesses = thicknesses
+        self.positions = positions
+        self.load_case = load_case
+        self.deformation_limits = deformation_limits
+        self.strength_criterion = strength_criterion
+        self.stress_matrices = stress_matrices
+        self.strengths = strengths
+        self.densities = densities if densities is not None else np.full(len(thicknesses), np.nan)
+        pass
+
+    def mask(self, state: tuple) -> ndarray:
+        """
+        :param state: The number of ply pairs removed per orientation.
+        :return: Boolean array that is True for the plies that remain in the layup.
+        """
+        mask = np.ones(len(self.thicknesses), bool)
+        for positions, n_removed in zip(self.positions, state):
+            if n_removed:
+                mask[positions[:n_removed]] = False
+                mask[positions[len(positions)-n_removed:]] = False
+        return mask
+
+    def evaluate(self, states: list) -> list[bool]:
+        """
+        Evaluates the feasibility of the given states, i.e. if all exposure factors are below 1. The ABD matrices of
+        all the states are computed in one batch by giving the removed plies zero thickness, and so are the ply stresses
+        with a strength criterion.
+        """
+        if len(states) == 0:
+            return []
+        masks = np.array([self.mask(state) for state in states])
+        thicknesses = self.thicknesses*masks
+        Qts = np.broadcast_to(self.Qts, (len(states),) + self.Qts.shape)
+        ABDs = laminate_batch.compute_ABD_from_Qt(Qts, thicknesses)
+        if isinstance(self.load_case, dict):
+            return [bool(mask.any()) and self.is_feasible(ABD, ply_thicknesses)
+                    for mask, ABD, ply_thicknesses in zip(masks, ABDs, thicknesses)]
+
+        # Multiple load cases are solved for all states at once, with one factorization per ABD matrix
+        non_empty = masks.any(axis=1)
+        feasible = np.zeros(len(states), bool)
+        try:
+            deformations = load_cases.solve_deformations(ABDs[non_empty], self.load_case)
+        except np.linalg.LinAlgError:
+            return [bool(mask.any()) and self.is_feasible(ABD, ply_thicknesses)
+                    for mask, ABD, ply_thicknesses in zip(masks, ABDs, thicknesses)]
+        exposure_factors = load_cases.exposure_factors(deformations, self.deformation_limits).max(axis=-2)
+        feasible[non_empty] = exposure_factors.max(axis=1) < 1
+        if self.strength_criterion is not None:
+            # Only the states within the deformation limits are checked for ply failure
+            candidates = np.flatnonzero(feasible)
+            strength_feasible = self.strength_exposure(deformations[feasible[non_empty]], thicknesses[candidates]) < 1
+            feasible[candidates] = strength_feasible
+        return feasible.tolist()
+
+    def describe(self, states: list) -> dict:
+        """
+        Evaluates the states like "evaluate", and also computes their thickness, areal mass, effective properties and
+        worst exposure factors, as the columns of a "ParetoExplorer.CandidateStore".
+        :return: The columns, and the ply masks of the states as "masks".
+        """
+        masks = np.array([self.mask(state) for state in states]).reshape(len(states), len(self.thicknesses))
+        thicknesses = self.thicknesses*masks
+        Qts = np.broadcast_to(self.Qts, (len(states),) + self.Qts.shape)
+        ABDs = laminate_batch.compute_ABD_from_Qt(Qts, thicknesses)
+        laminate_thicknesses = thicknesses.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            Ex, Ey, Gxy, vxy = laminate_batch.laminate_properties_batch(ABDs[:, :3, :3], laminate_thicknesses)
+
+        # Empty and singular states keep infinite exposure factors
+        exposure_factors = np.full((len(states), len(self.deformation_limits)), np.inf)
+        strength_exposure = np.full(len(states), np.inf if self.strength_criterion is not None else 0.0)
+        non_empty = np.flatnonzero(masks.any(axis=1))
+        deformations = None
+        if not isinstance(self.load_case, dict):
+            try:
+                deformations = load_cases.solve_deformations(ABDs[non_empty], self.load_case)
+            except np.linalg.LinAlgError:
+                pass
+        if deformations is not None:
+            exposure_factors[non_empty] = load_cases.exposure_factors(deformations,
+                                                                      self.deformation_limits).max(axis=-2)
+            if self.strength_criterion is not None:
+                strength_exposure[non_empty] = self.strength_exposure(deformations, thicknesses[non_empty])
+        else:
+            for i in non_empty:
+                try:
+                    exposure_factors[i] = Laminate.exposure_factors_from_ABD(
+                        ABDs[i], load_case=self.load_case, deformation_limits=self.deformation_limits)
+                    if self.strength_criterion is not None:
+                        strength_exposure[i] = self.strength_exposure(
+                            Laminate.deformations_from_ABD(ABDs[i], load_case=self.load_case)[None],
+                            thicknesses[i][None])[0]
+                except np.linalg.LinAlgError:
+                    exposure_factors[i] = np.inf
+        max_exposure = exposure_factors.max(axis=1)
+        return {"masks": masks,
+                "thickness": laminate_thicknesses,
+                "mass": thicknesses @ self.densities,
+                "Ex": Ex, "Ey": Ey, "Gxy": Gxy, "vxy": vxy,
+                "exposure_factors": exposure_factors,
+                "max_exposure": max_exposure,
+                "strength_exposure": strength_exposure,
+                "feasible": (max_exposure < 1) & (strength_exposure < 1)}
+
+    def is_feasible(self, ABD: ndarray, thicknesses: ndarray = None) -> bool:
+        try:
+            exposure_factors = Laminate.exposure_factors_from_ABD(ABD, load_case=self.load_case,
+                                                                  deformation_limits=self.deformation_limits)
+            if self.strength_criterion is None or max(exposure_factors) >= 1:
+                return max(exposure_factors) < 1
+            deformations = Laminate.deformations_from_ABD(ABD, load_case=self.load_case)
+        except np.linalg.LinAlgError:
+            return False
+        return self.strength_exposure(deformations[None], thicknesses[None])[0] < 1
+
+    def strength_exposure(self, deformations: ndarray, thicknesses: ndarray) -> ndarray:
+        """
+        :param deformations: The deformations of N states with shape (N, K, 6).
+        :param thicknesses: The ply thicknesses of the states with shape (N, P), zero for the removed plies.
+        :return: The largest strength exposure factor of each state over all load cases, plies and positions.
+        """
+        return ply_strength.max_criterion_exposure(deformations, self.stress_matrices, thicknesses, self.strengths,
+                                                   self.strength_criterion)
+
+
+# The evaluator of a worker process, set once by the pool initializer
+_worker_evaluator = None
+
+
+def _init_worker(evaluator: StateEvaluator) -> None:
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+    pass
+
+
+def _evaluate_chunk(states: ndarray) -> list[bool]:
+    return _worker_evaluator.evaluate(states)
+
+
+def _describe_chunk(states: ndarray) -> dict:
+    return _worker_evaluator.describe(states)
+
+
+class AnytimeResult:
+
+    def __init__(self, layup: Layup, state: tuple, thickness: float, lower_bound: float, complete: bool,
+                 n_evaluations: int, elapsed: float) -> None:
+        """
+        The best result of a budgeted search (see "PlyStripSearch.search_anytime").
+        :param layup: The thinnest layup found.
+        :param state: The search state of the layup.
+        :param thickness: The thickness of the layup.
+        :param lower_bound: No layup the search can reach is thinner than this.
+        :param complete: Whether the search is complete, in which case the layup is optimal.
+        :param n_evaluations: The total number of state evaluations.
+        :param elapsed: The time spent in this call.
+        """
+        self.layup = layup
+        self.state = state
+        self.thickness = thickness
+        self.lower_bound = lower_bound
+        self.complete = complete
+        self.n_evaluations = n_evaluations
+        self.elapsed = elapsed
+        pass
+
+    @property
+    def gap(self) -> float:
+        """
+        The largest possible thickness reduction from continuing the search.
+        """
+        return self.thickness - self.lower_bound
+
+    @property
+    def relative_gap(self) -> float:
+        return self.gap/self.thickness
+
+    def __repr__(self) -> str:
+        return "AnytimeResult(thickness={}, lower_bound={}, gap={}, complete={}, n_evaluations={})".format(
+            round(self.thickness, 6), round(self.lower_bound, 6), round(self.gap, 6), self.complete,
+            self.n_evaluations)
+
+
+class PlyStripSearch:
+
+    def __init__(self, layup: Layup | list[Ply], orientations: list, load_case, deformation_limits: list,
+                 instrumentation: Instrumentation = None, strength_criterion: str = None,
+                 explorer: ParetoExplorer = None) -> None:
+        """
+        Memoized branch-and-bound replacement for the exhaustive "OptimizedLaminate.strip_ply" recursion.
+        Removing the first remaining ply of an orientation (and its mirrored ply) from a symmetric layup always
+        removes the same plies, regardless of the order of the removals. A search state is therefore fully described
+        by the number of ply pairs removed per orientation, and each state only has to be evaluated once.
+        :param layup: A symmetric "Layup" (or list of "Ply"-objects) with an even number of plies.
+        :param orientations: The orientations that plies can be removed from, in the order they are tried.
+        :param load_case: The load case on the format used by "Laminate.calculate_exposure_factors".
+        :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+        :param instrumentation: Records the evaluations, memo hits, visited and pruned states, the search depth and the
+        time spent evaluating states, and reports progress, if given.
+        :param strength_criterion: One of "ply_strength.CRITERIA" if no ply may fail in a feasible state, or None.
+        :param explorer: Keeps every evaluated state and the Pareto front of them, if given. The depth-first search
+        then does not prune by the thickness bound, so that every feasible state is evaluated. States restored from a
+        checkpoint are not evaluated again, and are therefore not recorded.
+        """
+        if not self.is_symmetric(layup):
+            raise ValueError("PlyStripSearch requires a symmetric layup with an even number of plies")
+        self.layup = Layup.from_plies(layup)
+        self.orientations = list(orientations)
+        self.instrumentation = instrumentation
+
+        ply_orientations, thicknesses, material_indices, materials = laminate_batch.layup_arrays(self.layup)
+        Qts = laminate_batch.compute_Qt_cached(orientations=ply_orientations, material_indices=material_indices,
+                                               materials=materials, cache=stiffness_cache.cache)
+        # The layup indices of the plies with each orientation, from the top to the bottom of the layup
+        positions = [np.flatnonzero(ply_orientations[0] == orientation) for orientation in self.orientations]
+        stress_matrices = strengths = None
+        if strength_criterion is not None:
+            if strength_criterion not in ply_strength.CRITERIA:
+                raise ValueError("Unknown strength criterion '{}', expected one of {}".format(
+                    strength_criterion, ply_strength.CRITERIA))
+            stress_matrices = ply_strength.ply_stress_matrices(ply_orientations[0], material_indices[0], materials,
+                                                               cache=stiffness_cache.cache)
+            strengths = ply_strength.strength_table(materials)[material_indices[0]]
+        self.evaluator = StateEvaluator(Qts=Qts[0], thicknesses=thicknesses[0], positions=positions,
+                                        load_case=load_case, deformation_limits=deformation_limits,
+                                        strength_criterion=strength_criterion, stress_matrices=stress_matrices,
+                                        strengths=strengths,
+                                        densities=np.array([material.get("rho", np.nan) for material in materials],
+                                                           float)[material_indices[0]])
+        self.thicknesses = self.evaluator.thicknesses
+        self.positions = self.evaluator.positions
+
+        self.explorer = explorer
+        if explorer is not None:
+            # The full layup is the root of the search, which is never evaluated as a child
+            explorer.attach(self.layup, n_exposure_factors=len(deformation_limits))
+            columns = self.evaluator.describe([(0,)*len(self.orientations)])
+            explorer.record(columns["masks"], columns)
+
+        self.feasibility = {}
+        self.n_evaluations = 0
+        self.n_visited = 0
+        self.n_pruned = 0
+        pass
+
+    @staticmethod
+    def is_symmetric(layup: Layup | list[Ply]) -> bool:
+        return len(layup) % 2 == 0 and Layup.from_plies(layup).is_symmetric()
+
+    def mask(self, state: tuple) -> ndarray:
+        return self.evaluator.mask(state)
+
+    def thickness(self, state: tuple) -> float:
+        return self.thicknesses[self.mask(state)].sum()
+
+    def lower_bound(self, state: tuple) -> float:
+        """
+        Lower bound on the thickness of every state reachable from the given state, obtained by assuming that all
+        remaining plies of the strippable orientations can be removed.
+        """
+        removable_thickness = 0
+        for positions, n_removed in zip(self.positions, state):
+            removable_thickness += self.thicknesses[positions[n_removed:len(positions)-n_removed]].sum()
+        return self.thickness(state) - removable_thickness
+
+    def children(self, state: tuple) -> list[tuple]:
+        children = []
+        for k, (positions, n_removed) in enumerate(zip(self.positions, state)):
+            if n_removed < len(positions)//2:
+                children.append(state[:k] + (n_removed+1,) + state[k+1:])
+        return children
+
+    def evaluate(self, states: list[tuple], executor: Executor = None, n_chunks: int = 1) -> list[bool]:
+        """
+        Evaluates the feasibility of the given states, memoizing the results. New states are split into "n_chunks"
+        ordered chunks and evaluated in the process pool "executor" if given.
+        """
+        new_states = [state for state in states if state not in self.feasibility]
+        if self.instrumentation is not None:
+            self.instrumentation.count("memo_hits", len(states) - len(new_states))
+        if new_states:
+            start = time.perf_counter() if self.instrumentation is not None else None
+            if self.explorer is not None:
+                results = self.describe(new_states, executor=executor, n_chunks=n_chunks)
+            elif executor is None:
+                results = self.evaluator.evaluate(new_states)
+            else:
+                chunks = np.array_split(np.array(new_states, np.int32), min(n_chunks, len(new_states)))
+                results = [result for chunk_results in executor.map(_evaluate_chunk, chunks)
+                           for result in chunk_results]
+            self.feasibility.update(zip(new_states, results))
+            self.n_evaluations += len(new_states)
+            if self.instrumentation is not None:
+                self.instrumentation.add_time("evaluate_states", time.perf_counter() - start)
+                self.instrumentation.count("evaluations", len(new_states))
+                self.instrumentation.count("infeasible", len(results) - sum(results))
+        return [self.feasibility[state] for state in states]
+
+    def describe(self, states: list[tuple], executor: Executor = None, n_chunks: int = 1) -> list[bool]:
+        """
+        Evaluates the feasibility of the given states with "StateEvaluator.describe", and records them in the explorer.
+        """
+        if executor is None:
+            columns = self.evaluator.describe(states)
+        else:
+            chunks = np.array_split(np.array(states, np.int32), min(n_chunks, len(states)))
+            chunk_columns = list(executor.map(_describe_chunk, chunks))
+            columns = {name: np.concatenate([chunk[name] for chunk in chunk_columns]) for name in chunk_columns[0]}
+        self.explorer.record(columns["masks"], columns)
+        return columns["feasible"].tolist()
+
+    def search(self, workers: int = None) -> Layup:
+        """
+        Searches for the thinnest feasible layup. Among the thinnest feasible layups, the one found first by the
+        "OptimizedLaminate.strip_ply" recursion is returned, which is the one "min(branch_optimal_laminates, ...)"
+        returns. The result does not depend on the number of workers.
+        :param workers: Number of worker processes. If larger than 1, "search_frontier" is used.
+        :return: The thinnest layup found.
+        """
+        if workers is not None and workers > 1:
+            # Imported here, since the process pool machinery is slow to import and only needed with workers
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.evaluator,)) as executor:
+                best_state = self.search_frontier(executor=executor, n_chunks=4*workers)
+        else:
+            best_state = self.search_depth_first()
+        self.best_state = best_state
+        return self.layup[self.mask(best_state)]
+
+    def search_depth_first(self) -> tuple:
+        """
+        Depth-first branch-and-bound search in the same order as the "OptimizedLaminate.strip_ply" recursion.
+        :return: The first of the thinnest feasible states.
+        """
+        self.reset_depth_first()
+        self.resume_depth_first()
+        return self.best_state
+
+    def reset_depth_first(self) -> None:
+        """
+        Sets up a new depth-first search, which is run by "resume_depth_first".
+        """
+        root = (0,)*len(self.orientations)
+        self.stack = [root]
+        self.visited = set()
+        # The first of the thinnest states without feasible children, which is the result of a complete search
+        self.best_state = None
+        self.best_thickness = np.inf
+        # The thinnest state visited so far, which is the result of an incomplete search
+        self.incumbent_state = root
+        self.incumbent_thickness = self.thickness(root)
+        pass
+
+    def resume_depth_first(self, max_time: float = None, max_evaluations: int = None) -> bool:
+        """
+        Continues the depth-first search until it is complete, the budget is spent or it is interrupted (Ctrl+C).
+        The search can be resumed by calling this method again.
+        :param max_time: The maximum time in seconds to search for.
+        :param max_evaluations: The maximum number of new state evaluations.
+        :return: Whether the search is complete.
+        """
+        deadline = time.perf_counter() + max_time if max_time is not None else None
+        evaluation_limit = self.n_evaluations + max_evaluations if max_evaluations is not None else None
+        stack = self.stack
+        visited = self.visited
+        state = None
+        try:
+            while stack:
+                if (deadline is not None and time.perf_counter() >= deadline) \
+                        or (evaluation_limit is not None and self.n_evaluations >= evaluation_limit):
+                    break
+                state = stack.pop()
+                if state in visited:
+                    continue
+                visited.add(state)
+                if self.instrumentation is not None:
+                    self.instrumentation.count("visited")
+                    self.instrumentation.maximum("search_depth", sum(state))
+                    self.instrumentation.progress("depth_first")
+                if self.explorer is None and self.lower_bound(state) >= self.best_thickness:
+                    self.n_pruned += 1
+                    if self.instrumentation is not None:
+                        self.instrumentation.count("pruned_by_bound")
+                    state = None
+                    continue
+
+                thickness = self.thickness(state)
+                if thickness < self.incumbent_thickness:
+                    self.incumbent_state = state
+                    self.incumbent_thickness = thickness
+                children = self.children(state)
+                feasible_children = [child for child, feasible in zip(children, self.evaluate(children)) if feasible]
+                if not feasible_children:
+                    if thickness < self.best_thickness:
+                        self.best_state = state
+                        self.best_thickness = thickness
+                stack.extend([child for child in feasible_children[::-1] if child not in visited])
+                state = None
+        except KeyboardInterrupt:
+            # The state being expanded is put back, so that resuming the search expands it again
+            if state is not None:
+                visited.discard(state)
+                stack.append(state)
+
+        self.n_visited = len(visited)
+        return not stack
+
+    def open_lower_bound(self) -> float:
+        """
+        Lower bound on the thickness of every state the depth-first search has not ruled out, i.e. of the best result a
+        complete search can give.
+        """
+        bounds = [self.lower_bound(state) for state in self.stack if state not in self.visited]
+        return max(0.0, min(bounds + [self.best_thickness]))
+
+    def search_anytime(self, max_time: float = None, max_evaluations: int = None,
+                       checkpoint: str = None) -> "AnytimeResult":
+        """
+        Budgeted depth-first search, returning the best result found so far. Calling it again continues the search,
+        and a complete search gives the same result as "search".
+        :param max_time: The maximum time in seconds to search for.
+        :param max_evaluations: The maximum number of new state evaluations.
+        :param checkpoint: A file that the search is resumed from if it exists, and saved to afterwards.
+        :return: The best layup found and a bound on its distance from the optimum.
+        """
+        start = time.perf_counter()
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load_checkpoint(checkpoint)
+        elif not hasattr(self, "stack"):
+            self.reset_depth_first()
+        complete = self.resume_depth_first(max_time=max_time, max_evaluations=max_evaluations)
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint)
+
+        if complete:
+            state, thickness = self.best_state, self.best_thickness
+        elif self.best_thickness <= self.incumbent_thickness:
+            state, thickness = self.best_state, self.best_thickness
+        else:
+            state, thickness = self.incumbent_state, self.incumbent_thickness
+        return AnytimeResult(layup=self.layup[self.mask(state)], state=state, thickness=thickness,
+                             lower_bound=thickness if complete else self.open_lower_bound(), complete=complete,
+                             n_evaluations=self.n_evaluations, elapsed=time.perf_counter() - start)
+
+    def fingerprint(self) -> tuple:
+        """
+        Identifies the search problem, so that a checkpoint is only restored into the same problem.
+        """
+        load_case = self.evaluator.load_case
+        load_case = sorted(load_case.items()) if isinstance(load_case, dict) else np.asarray(load_case).tolist()
+        return (tuple(self.orientations), self.layup.orientations.tolist(), self.thicknesses.tolist(),
+                self.layup.material_indices.tolist(), tuple(freeze(material) for material in self.layup.materials),
+                load_case, list(self.evaluator.deformation_limits), self.evaluator.strength_criterion)
+
+    def checkpoint(self) -> dict:
+        """
+        :return: The state of the depth-first search, including the memoized evaluations.
+        """
+        return {"fingerprint": self.fingerprint(),
+                "stack": list(self.stack),
+                "visited": set(self.visited),
+                "feasibility": dict(self.feasibility),
+                "best_state": self.best_state,
+                "best_thickness": self.best_thickness,
+                "incumbent_state": self.incumbent_state,
+                "incumbent_thickness": self.incumbent_thickness,
+                "n_evaluations": self.n_evaluations,
+                "n_pruned": self.n_pruned}
+
+    def restore(self, checkpoint: dict) -> None:
+        if checkpoint["fingerprint"] != self.fingerprint():
+            raise ValueError("The checkpoint is from a different ply stripping problem")
+        self.stack = list(checkpoint["stack"])
+        self.visited = set(checkpoint["visited"])
+        self.feasibility = dict(checkpoint["feasibility"])
+        for key in ("best_state", "best_thickness", "incumbent_state", "incumbent_thickness", "n_evaluations",
+                    "n_pruned"):
+            setattr(self, key, checkpoint[key])
+        self.n_visited = len(self.visited)
+        pass
+
+    def save_checkpoint(self, path: str) -> None:
+        # Written to a temporary file first, so an interrupted save never replaces a good checkpoint
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(self.checkpoint(), file)
+        os.replace(path + ".tmp", path)
+        pass
+
+    def load_checkpoint(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self.restore(pickle.load(file))
+        pass
+
+    def search_frontier(self, executor: Executor = None, n_chunks: int = 1) -> tuple:
+        """
+        Level-synchronous search, where all children of one search depth are evaluated together. Every state keeps the
+        lexicographically smallest removal sequence reaching it, which is the order the depth-first recursion would
+        first visit it in. Ties in thickness are broken on that sequence, so the result is the same as for
+        "search_depth_first" regardless of how the evaluations are distributed.
+        :return: The first of the thinnest feasible states.
+        """
+        root = (0,)*len(self.orientations)
+        best_key = None
+        best_state = None
+        frontier = {root: ()}
+        n_visited = 0
+        while frontier:
+            n_visited += len(frontier)
+            if self.instrumentation is not None:
+                self.instrumentation.count("visited", len(frontier))
+                self.instrumentation.maximum("search_depth", sum(next(iter(frontier))))
+                self.instrumentation.progress("frontier")
+            candidates = {}
+            for state, path in frontier.items():
+                for child in self.children(state):
+                    if child not in candidates:
+                        k = next(k for k in range(len(state)) if child[k] != state[k])
+                        candidates[child] = path + (k,)
+            feasibility = dict(zip(candidates, self.evaluate(list(candidates), executor=executor,
+                                                             n_chunks=n_chunks)))
+
+            next_frontier = {}
+            for state, path in frontier.items():
+                feasible_children = [child for child in self.children(state) if feasibility[child]]
+                if not feasible_children:
+                    key = (self.thickness(state), path)
+                    if best_key is None or key < best_key:
+                        best_key = key
+                        best_state = state
+            for child, path in candidates.items():
+                if feasibility[child]:
+                    next_frontier[child] = path
+            frontier = next_frontier
+
+        self.n_visited = n_visited
+        return best_state
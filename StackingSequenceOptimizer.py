@@ -0,0 +1,281 @@
+import numpy as np
+from numpy import ndarray
+
+import laminate_batch
+import load_cases
+import matlib
+import stiffness_cache
+from instrumentation import Instrumentation
+from Laminate import Laminate
+from Layup import Layup
+from Material import Material
+from OptimizedLaminate import OptimizedLaminate
+
+# The gene value of an empty ply (or ply pair) slot
+EMPTY = -1
+
+
+class StackingSequenceOptimizer:
+
+    def __init__(self, material: dict, ply_thickness: float, load_case, deformation_limits: list,
+                 angles: list = (0, 45, 90), max_plies: int = 48, balanced: bool = True,
+                 population_size: int = 100, n_generations: int = 300, n_stall_generations: int = 60,
+                 crossover_rate: float = 0.9, mutation_rate: float = None, swap_rate: float = 0.2,
+                 n_elite: int = 2, seed: int = None, instrumentation: Instrumentation = None) -> None:
+        """
+        Genetic algorithm searching symmetric stacking sequences of a discrete angle set for the lightest laminate
+        satisfying a load case. Unlike "OptimizedLaminate", it can add plies, use any of the angles and reorder the
+        stack. Each generation is evaluated with one vectorized ABD computation ("laminate_batch") and one batched
+        solve of the load cases.
+        A genome describes the lower half of the symmetric layup, from the outer ply towards the mid-plane, as a list of
+        slots that are either empty or hold an angle. Empty slots are plies with zero thickness, so genomes of
+        different lengths share one array.
+        :param material: The material of all plies, on the format used in "matlib.py".
+        :param ply_thickness: The thickness of every ply.
+        :param load_case: The load case on the format used by "Laminate.calculate_exposure_factors".
+        :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+        :param angles: The ply angles in degrees. When balanced, a slot with an angle other than 0 or 90 holds a
+        +angle/-angle ply pair, so that the layup is balanced by construction, and the angles should be in [0, 90].
+        :param max_plies: The maximum number of plies in the full layup. Layups with more plies are infeasible.
+        :param balanced: Whether to only consider balanced layups.
+        :param population_size: The number of layups per generation.
+        :param n_generations: The maximum number of generations.
+        :param n_stall_generations: Stop when the best layup has not improved for this many generations.
+        :param crossover_rate: The probability of one-point crossover between two parents.
+        :param mutation_rate: The probability of changing each slot. Defaults to 1/(number of slots).
+        :param swap_rate: The probability of swapping two slots of a child, which reorders the stack.
+        :param n_elite: The number of best layups kept unchanged between generations.
+        :param seed: Seed of the random number generator, for reproducible runs.
+        :param instrumentation: Records the evaluations and generations, and reports progress, if given.
+        """
+        self.material = Material.from_dict(material)
+        self.ply_thickness = ply_thickness
+        if not isinstance(load_case, dict):
+            load_case = load_cases.load_case_matrix(load_case)
+        self.load_case = load_case
+        self.deformation_limits = deformation_limits
+        self.angles = np.asarray(angles, dtype=np.float64)
+        self.balanced = balanced
+        # Off-axis angles fill two plies of a slot in a balanced layup, the second being empty for 0 and 90
+        self.paired = balanced & (self.angles % 90 != 0)
+        self.plies_per_slot = 2 if self.paired.any() else 1
+        self.max_plies = max_plies
+        self.n_slots = max_plies//2
+        if self.n_slots < 1:
+            raise ValueError("max_plies must be at least 2")
+        self.population_size = population_size
+        self.n_generations = n_generations
+        self.n_stall_generations = n_stall_generations
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate if mutation_rate is not None else 1/self.n_slots
+        self.swap_rate = swap_rate
+        self.n_elite = n_elite
+        self.rng = np.random.default_rng(seed)
+        self.instrumentation = instrumentation
+
+        # The loads are solved in one batch unless the load case prescribes deformations
+        self.loads = None
+        if isinstance(load_case, dict):
+            try:
+                self.loads = load_cases.load_case_matrix(load_case)
+            except ValueError:
+                pass
+        else:
+            self.loads = load_case
+
+        self.n_evaluations = 0
+        self.history = []
+        self.best_genome = None
+        pass
+
+    def decode(self, genomes: ndarray) -> tuple:
+        """
+        :param genomes: Genomes with shape (N, n_slots).
+        :return: The ply orientations and thicknesses of the full symmetric layups, each with shape (N, P).
+        """
+        active = genomes != EMPTY
+        genes = np.where(active, genomes, 0)
+        angles = self.angles[genes]
+        if self.plies_per_slot == 2:
+            half_orientations = np.stack([angles, -angles], axis=-1).reshape(len(genomes), -1)
+            half_active = np.stack([active, active & self.paired[genes]], axis=-1).reshape(len(genomes), -1)
+        else:
+            half_orientations = angles
+            half_active = active
+        half_thicknesses = np.where(half_active, self.ply_thickness, 0.0)
+        orientations = np.concatenate([half_orientations, half_orientations[:, ::-1]], axis=1)
+        thicknesses = np.concatenate([half_thicknesses, half_thicknesses[:, ::-1]], axis=1)
+        return orientations, thicknesses
+
+    def layup(self, genome: ndarray) -> Layup:
+        orientations, thicknesses = self.decode(genome[None, :])
+        present = thicknesses[0] > 0
+        return Layup(orientations=orientations[0][present], thicknesses=thicknesses[0][present],
+                     material_indices=np.zeros(present.sum(), np.int16), materials=(self.material,))
+
+    def evaluate(self, genomes: ndarray) -> tuple:
+        """
+        :param genomes: Genomes with shape (N, n_slots).
+        :return: The laminate thicknesses and the largest exposure factors, each with shape (N,). Empty layups and
+        layups with more than "max_plies" plies have an infinite exposure factor.
+        """
+        orientations, thicknesses = self.decode(genomes)
+        Qts = laminate_batch.compute_Qt_cached(orientations=orientations,
+                                               material_indices=np.zeros(orientations.shape, np.int16),
+                                               materials=[self.material], cache=stiffness_cache.cache)
+        ABDs = laminate_batch.compute_ABD_from_Qt(Qts, thicknesses)
+        laminate_thicknesses = thicknesses.sum(axis=1)
+        empty = laminate_thicknesses == 0
+        ABDs[empty] = np.eye(6)
+        too_many_plies = (thicknesses > 0).sum(axis=1) > self.max_plies
+
+        if self.loads is not None:
+            max_exposure = load_cases.envelope_exposure_factors(ABDs, self.loads, self.deformation_limits).max(axis=1)
+        else:
+            max_exposure = np.array([max(Laminate.exposure_factors_from_ABD(
+                ABD, load_case=self.load_case, deformation_limits=self.deformation_limits)) for ABD in ABDs])
+        max_exposure[empty | too_many_plies] = np.inf
+        self.n_evaluations += len(genomes)
+        if self.instrumentation is not None:
+            self.instrumentation.count("evaluations", len(genomes))
+        return laminate_thicknesses, max_exposure
+
+    def fitness(self, thicknesses: ndarray, max_exposure: ndarray) -> ndarray:
+        """
+        Feasible layups (all exposure factors below 1) rank by thickness, before all infeasible layups, which rank by
+        their largest exposure factor.
+        :return: The fitness of each layup, lower is better.
+        """
+        worst_thickness = 2*self.n_slots*self.plies_per_slot*self.ply_thickness
+        return np.where(max_exposure < 1, thicknesses, worst_thickness + 1 + max_exposure)
+
+    def initial_population(self) -> ndarray:
+        """
+        Random genomes with between one and all slots filled.
+        """
+        n_filled = self.rng.integers(1, self.n_slots + 1, self.population_size)
+        filled = self.rng.random((self.population_size, self.n_slots)).argsort(axis=1) < n_filled[:, None]
+        genes = self.rng.integers(0, len(self.angles), (self.population_size, self.n_slots))
+        return np.where(filled, genes, EMPTY).astype(np.int16)
+
+    def select(self, fitness: ndarray, n: int) -> ndarray:
+        """
+        Binary tournament selection.
+        :return: The indices of the selected parents.
+        """
+        candidates = self.rng.integers(0, len(fitness), (n, 2))
+        return np.where(fitness[candidates[:, 0]] <= fitness[candidates[:, 1]], candidates[:, 0], candidates[:, 1])
+
+    def offspring(self, population: ndarray, fitness: ndarray, n: int) -> ndarray:
+        """
+        Creates children by one-point crossover, slot mutation (changing, adding or removing a ply slot) and swaps of
+        two slots.
+        """
+        n_pairs = (n + 1)//2
+        parents = population[self.select(fitness, 2*n_pairs)].reshape(n_pairs, 2, self.n_slots)
+        cuts = self.rng.integers(1, self.n_slots + 1, n_pairs)
+        cuts[self.rng.random(n_pairs) >= self.crossover_rate] = self.n_slots
+        first = np.arange(self.n_slots)[None, :] < cuts[:, None]
+        children = np.concatenate([np.where(first, parents[:, 0], parents[:, 1]),
+                                   np.where(first, parents[:, 1], parents[:, 0])])[:n]
+
+        mutate = self.rng.random(children.shape) < self.mutation_rate
+        children[mutate] = self.rng.integers(EMPTY, len(self.angles), mutate.sum())
+
+        swap = np.flatnonzero(self.rng.random(n) < self.swap_rate)
+        i, j = self.rng.integers(0, self.n_slots, (2, len(swap)))
+        children[swap, i], children[swap, j] = children[swap, j], children[swap, i]
+        return children
+
+    def optimize(self) -> Laminate:
+        """
+        Runs the genetic algorithm. The best thickness and largest exposure factor of every generation are stored in
+        "history".
+        :return: The lightest feasible laminate found, or the least infeasible one if none is feasible.
+        """
+        population = self.initial_population()
+        thicknesses, max_exposure = self.evaluate(population)
+        fitness = self.fitness(thicknesses, max_exposure)
+        best_fitness = np.inf
+        n_stall = 0
+        for generation in range(self.n_generations):
+            order = np.argsort(fitness, kind="stable")
+            population, thicknesses, max_exposure, fitness = (population[order], thicknesses[order],
+                                                              max_exposure[order], fitness[order])
+            self.history.append((float(thicknesses[0]), float(max_exposure[0])))
+            if fitness[0] < best_fitness:
+                best_fitness = fitness[0]
+                n_stall = 0
+            else:
+                n_stall += 1
+                if n_stall >= self.n_stall_generations:
+                    break
+            if self.instrumentation is not None:
+                self.instrumentation.count("generations")
+                self.instrumentation.progress("stacking_sequence")
+
+            children = self.offspring(population, fitness, self.population_size - self.n_elite)
+            child_thicknesses, child_max_exposure = self.evaluate(children)
+            population = np.concatenate([population[:self.n_elite], children])
+            thicknesses = np.concatenate([thicknesses[:self.n_elite], child_thicknesses])
+            max_exposure = np.concatenate([max_exposure[:self.n_elite], child_max_exposure])
+            fitness = np.concatenate([fitness[:self.n_elite], self.fitness(child_thicknesses, child_max_exposure)])
+
+        best = np.argmin(fitness)
+        self.best_genome = population[best]
+        self.best_feasible = bool(max_exposure[best] < 1)
+        if self.best_feasible:
+            self.best_genome = self.polish(self.best_genome)
+        return Laminate(layup=self.layup(self.best_genome), name="StackingSequence_{}".format(self.material["name"]))
+
+    def polish(self, genome: ndarray) -> ndarray:
+        """
+        Greedy local search after the genetic algorithm. All ways of emptying one slot are evaluated in one batch, and
+        the lightest feasible one is kept until no slot can be emptied.
+        :param genome: A feasible genome.
+        """
+        genome = genome.copy()
+        while True:
+            filled = np.flatnonzero(genome != EMPTY)
+            if len(filled) == 0:
+                return genome
+            candidates = np.repeat(genome[None, :], len(filled), axis=0)
+            candidates[np.arange(len(filled)), filled] = EMPTY
+            thicknesses, max_exposure = self.evaluate(candidates)
+            fitness = self.fitness(thicknesses, max_exposure)
+            best = np.argmin(fitness)
+            if max_exposure[best] >= 1:
+                return genome
+            genome = candidates[best]
+
+
+def main():
+    """
+    The Kevlar example in "OptimizedLaminate.main", optimized by stripping plies and by the stacking sequence search.
+    Ply stripping removes +45 and -45 plies independently, so the stacking sequence search is first run without the
+    balance constraint for a like-for-like comparison. Only those unbalanced runs are lighter than ply stripping (4.2
+    and 2.6 mm against 4.4 mm), the balanced run with 15 degree steps ties it at 4.4 mm.
+    """
+    material = matlib.get("Kevlar-49/Epoxy")
+    load_case = {"Nx": 600, "Nxy": 300}
+    deformation_limits = [0.005, None, 0.005]
+    laminate = Laminate(layup=Layup.uniform(material=material, orientations=[0, 45, -45, -45, 45, 0], thickness=1),
+                        name="Kevlar_Laminate")
+    stripped_laminate = OptimizedLaminate(laminate=laminate, ply_thickness=0.1, load_case=load_case,
+                                          deformation_limits=deformation_limits)
+    print("Ply stripping: {} mm".format(round(stripped_laminate.thickness, 2)))
+
+    for angles, balanced in (((0, 45, -45, 90), False), (range(-75, 91, 15), False), (range(0, 91, 15), True)):
+        optimizer = StackingSequenceOptimizer(material=material, ply_thickness=0.1, load_case=load_case,
+                                              deformation_limits=deformation_limits, angles=angles, max_plies=96,
+                                              balanced=balanced, population_size=200, seed=1)
+        optimized_laminate = optimizer.optimize()
+        print("Stacking sequence search, angles {}, balanced={}: {} mm, exposure factors {}\n  {}".format(
+            list(angles), balanced, round(optimized_laminate.thickness, 2),
+            optimized_laminate.calculate_exposure_factors(load_case, deformation_limits),
+            optimized_laminate.layup.orientations.tolist()))
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Scaling benchmark of the branch-and-bound ply stripping search ("PlyStripSearch") against the exhaustive
+"OptimizedLaminate.strip_ply" recursion, starting from the Kevlar example in "OptimizedLaminate.main".
+
+Run from the repository root:
+    python benchmarks/bench_strip_search.py [--max-exhaustive-plies 60] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matlib
+from Ply import Ply
+from Laminate import Laminate
+from OptimizedLaminate import OptimizedLaminate
+
+LOAD_CASE = {"Nx": 600, "Nxy": 300}
+# The deformation limits of the Kevlar example, and a variant with a relaxed shear limit that leaves many more
+# ply pairs removable
+DEFORMATION_LIMITS = {"kevlar_example": [0.005, None, 0.005],
+                      "relaxed_shear": [0.005, None, 0.02]}
+PLY_THICKNESSES = [0.1, 0.05, 0.025, 0.0125]
+
+
+def time_optimization(laminate: Laminate, ply_thickness: float, deformation_limits: list, search: str,
+                      workers: int = None) -> tuple:
+    start = time.perf_counter()
+    optimized_laminate = OptimizedLaminate(laminate=laminate, ply_thickness=ply_thickness, load_case=LOAD_CASE,
+                                           deformation_limits=deformation_limits, hard_optimization=True,
+                                           search=search, workers=workers)
+    return time.perf_counter() - start, optimized_laminate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-exhaustive-plies", type=int, default=60,
+                        help="Skip the exhaustive search for rough layups with more plies than this")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Also time the branch-and-bound search with this many worker processes")
+    args = parser.parse_args()
+
+    material = matlib.get("Kevlar-49/Epoxy")
+    layup = [Ply(material=material, orientation=orientation, thickness=1) for orientation in (0, 45, -45, -45, 45, 0)]
+    laminate = Laminate(layup=layup, name="Kevlar_Laminate")
+
+    print("{:>15} {:>8} {:>8} {:>14} {:>14} {:>14} {:>8} {:>6}".format(
+        "limits", "t_ply", "plies", "exhaustive (s)", "b&b (s)", "workers (s)", "evals", "same"))
+    for limits_name, deformation_limits in DEFORMATION_LIMITS.items():
+        for ply_thickness in PLY_THICKNESSES:
+            bb_time, bb_laminate = time_optimization(laminate, ply_thickness, deformation_limits, "branch_and_bound")
+            n_rough_plies = len(bb_laminate.ply_strip_search.layup)
+            exhaustive_time, same = float("nan"), "-"
+            if n_rough_plies <= args.max_exhaustive_plies:
+                exhaustive_time, exhaustive_laminate = time_optimization(laminate, ply_thickness, deformation_limits,
+                                                                         "exhaustive")
+                same = [ply.orientation for ply in exhaustive_laminate.layup] == \
+                       [ply.orientation for ply in bb_laminate.layup]
+            workers_time = float("nan")
+            if args.workers:
+                workers_time, workers_laminate = time_optimization(laminate, ply_thickness, deformation_limits,
+                                                                   "branch_and_bound", workers=args.workers)
+                same = same is not False and [ply.orientation for ply in workers_laminate.layup] == \
+                       [ply.orientation for ply in bb_laminate.layup]
+            print("{:>15} {:>8} {:>8} {:>14.4f} {:>14.4f} {:>14.4f} {:>8} {:>6}".format(
+                limits_name, ply_thickness, n_rough_plies, exhaustive_time, bb_time, workers_time,
+                bb_laminate.ply_strip_search.n_evaluations, str(same)))
+    pass
+
+
+if __name__ == "__main__":
+    main()
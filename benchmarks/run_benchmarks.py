@@ -0,0 +1,292 @@
+"""
+Benchmark suite for "Laminate", "OptimizedLaminate" and the test bench sweep in "main.py", and for the time it takes to
+import the core modules in a fresh interpreter. Every benchmark records the best wall time over a number of repeats, the
+peak memory allocated by Python and numpy (from a separate run under tracemalloc) and the number of evaluations per
+second. The results are written to a JSON file, and compared against a baseline file if one is given, flagging
+benchmarks that are slower or use more memory than the baseline allows.
+
+"benchmarks/baseline.json" is a baseline of the full suite, with the Python and numpy versions, platform and number of
+CPUs it was recorded on. Wall times only compare on similar hosts, and the timings of a filtered run can differ from
+those of the full suite, so save a local baseline of the full suite before comparing on other hardware.
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json [--output results.json] [--filter laminate]
+    python benchmarks/run_benchmarks.py --save-baseline local_baseline.json
+
+The exit code is 1 if any benchmark regressed, so the suite can be used as a check.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+import numpy as np
+
+import main
+import matlib
+import surface_sweep
+from Laminate import Laminate
+from Layup import Layup
+from OptimizedLaminate import OptimizedLaminate
+from screening import screen_exposure
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+# The Kevlar example in "OptimizedLaminate.main"
+KEVLAR_ORIENTATIONS = [0, 45, -45, -45, 45, 0]
+KEVLAR_LOAD_CASE = {"Nx": 600, "Nxy": 300}
+KEVLAR_DEFORMATION_LIMITS = [0.005, None, 0.005]
+N_PLIES = [4, 64, 512]
+# Decreasing ply thicknesses give increasing numbers of plies in the rough optimization
+OPTIMIZATION_PLY_THICKNESSES = [0.1, 0.05, 0.025]
+TEST_BENCH_DIMENSIONS = [20, 50, 200]
+N_LOAD_CASES = 100000
+N_SCREENING_CANDIDATES = 100000
+# The import time of the core modules is guarded, such that headless batch use starts fast
+IMPORT_MODULES = ["Ply", "Laminate", "OptimizedLaminate", "surface_sweep", "main"]
+# Modules that are only imported when plotting or starting worker processes. Importing any of the modules above pulls
+# in none of them, which the import benchmarks check in the child interpreter
+LAZY_MODULES = ["matplotlib", "concurrent.futures.process"]
+
+
+def kevlar_laminate(n_plies: int, thickness: float = 1) -> Laminate:
+    """
+    :return: A symmetric laminate repeating the orientations of the Kevlar example.
+    """
+    half = np.resize(KEVLAR_ORIENTATIONS[:3], n_plies//2)
+    layup = Layup.uniform(material=KEVLAR, orientations=np.concatenate([half, half[::-1]]), thickness=thickness)
+    return Laminate(layup=layup, name="Kevlar_{}".format(n_plies))
+
+
+def laminate_construction(n_plies: int):
+    layup = kevlar_laminate(n_plies).layup
+
+    def run() -> int:
+        Laminate(layup=layup, name="")
+        return 1
+    return run
+
+
+def laminate_ABD(n_plies: int):
+    layup = kevlar_laminate(n_plies).layup
+
+    def run() -> int:
+        # A new laminate every time, so the cached ABD matrix is not reused
+        Laminate(layup=layup, name="").compute_ABD()
+        return 1
+    return run
+
+
+def exposure_factors_single():
+    laminate = kevlar_laminate(8)
+
+    def run() -> int:
+        for _ in range(100):
+            laminate.calculate_exposure_factors(KEVLAR_LOAD_CASE, KEVLAR_DEFORMATION_LIMITS)
+        return 100
+    return run
+
+
+def exposure_factors_batch():
+    laminate = kevlar_laminate(8)
+    loads = np.random.default_rng(0).normal(0, 500, (N_LOAD_CASES, 6))
+
+    def run() -> int:
+        laminate.calculate_exposure_factors(loads, KEVLAR_DEFORMATION_LIMITS)
+        return N_LOAD_CASES
+    return run
+
+
+def optimized_laminate(ply_thickness: float, hard_optimization: bool):
+    laminate = kevlar_laminate(6)
+
+    def run() -> int:
+        optimized = OptimizedLaminate(laminate=laminate, ply_thickness=ply_thickness, load_case=KEVLAR_LOAD_CASE,
+                                      deformation_limits=KEVLAR_DEFORMATION_LIMITS,
+                                      hard_optimization=hard_optimization)
+        search = getattr(optimized, "ply_strip_search", None)
+        return search.n_evaluations if search is not None else 1
+    return run
+
+
+def screening(precision: str):
+    # Random symmetric candidates of up to 24 plies, padded with zero-thickness plies
+    rng = np.random.default_rng(0)
+    half_orientations = rng.choice([0, 45, -45, 90], (N_SCREENING_CANDIDATES, 12)).astype(float)
+    half_thicknesses = np.where(rng.random((N_SCREENING_CANDIDATES, 12)) < 0.6, 0.125, 0.0)
+    orientations = np.concatenate([half_orientations, half_orientations[:, ::-1]], axis=1)
+    thicknesses = np.concatenate([half_thicknesses, half_thicknesses[:, ::-1]], axis=1)
+    material_indices = np.zeros(orientations.shape, np.int16)
+
+    def run() -> int:
+        screen_exposure(orientations, thicknesses, material_indices, [KEVLAR], KEVLAR_LOAD_CASE,
+                        KEVLAR_DEFORMATION_LIMITS, precision=precision)
+        return N_SCREENING_CANDIDATES
+    return run
+
+
+def test_bench(dimension: int):
+    def run() -> int:
+        # The sweep cache is cleared, such that every run computes the grids
+        surface_sweep.cache.clear()
+        testbench = main.LaminateTestBench(material=main.GFRP, dimension=dimension)
+        for orientation in range(0, 91, 10):
+            testbench.calculate_effective_properties(testbench.layup_C, orientation)
+        return 10*dimension**2
+    return run
+
+
+def import_time(module: str):
+    # Every import is timed in a fresh interpreter, as modules are only imported once per process. The time includes
+    # the startup of the interpreter, which is the same for all modules
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(filter(None, [REPOSITORY, environment.get("PYTHONPATH")]))
+
+    # The child fails, and the benchmark with it, if the import pulls in any of the lazy modules
+    check = "import sys; assert not set({!r}) & set(sys.modules), 'lazy modules imported'".format(LAZY_MODULES)
+
+    def run():
+        if not tracemalloc.is_tracing():
+            subprocess.run([sys.executable, "-c", "import {}; {}".format(module, check)], cwd=REPOSITORY,
+                           env=environment, check=True)
+            return 1
+        # The memory of the import is allocated in the child, so the child traces it and reports its peak
+        script = "import tracemalloc; tracemalloc.start(); import {}; {}; print(tracemalloc.get_traced_memory()[1])"
+        output = subprocess.run([sys.executable, "-c", script.format(module, check)], cwd=REPOSITORY,
+                                env=environment, check=True, capture_output=True, text=True).stdout
+        return 1, int(output.split()[-1])
+    return run
+
+
+def benchmarks() -> dict:
+    """
+    :return: The benchmarks by name. A benchmark is set up when called, and returns a function that runs it once and
+    returns its number of evaluations. Benchmarks running in a child process return the number of evaluations and
+    the peak memory of the child while tracemalloc is tracing.
+    """
+    suite = {}
+    for n_plies in N_PLIES:
+        suite["laminate_construction[{}]".format(n_plies)] = lambda n=n_plies: laminate_construction(n)
+        suite["laminate_ABD[{}]".format(n_plies)] = lambda n=n_plies: laminate_ABD(n)
+    suite["exposure_factors[single]"] = exposure_factors_single
+    suite["exposure_factors[batch]"] = exposure_factors_batch
+    for ply_thickness in OPTIMIZATION_PLY_THICKNESSES:
+        for hard_optimization in (False, True):
+            suite["optimized_laminate[{},hard={}]".format(ply_thickness, hard_optimization)] = \
+                lambda t=ply_thickness, h=hard_optimization: optimized_laminate(t, h)
+    for precision in ("float64", "float32"):
+        suite["screening[{}]".format(precision)] = lambda p=precision: screening(p)
+    for dimension in TEST_BENCH_DIMENSIONS:
+        suite["test_bench[{}]".format(dimension)] = lambda d=dimension: test_bench(d)
+    for module in IMPORT_MODULES:
+        suite["import[{}]".format(module)] = lambda m=module: import_time(m)
+    return suite
+
+
+def measure(setup, repeat: int, min_time: float) -> dict:
+    """
+    :param setup: The benchmark, see "benchmarks".
+    :param repeat: The number of timings, of which the best is kept.
+    :param min_time: Short benchmarks are run in loops lasting at least this many seconds per timing.
+    """
+    run = setup()
+    start = time.perf_counter()
+    n_evaluations = run()
+    elapsed = time.perf_counter() - start
+    n_loops = max(1, int(min_time/max(elapsed, 1e-9)))
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(n_loops):
+            run()
+        best = min(best, (time.perf_counter() - start)/n_loops)
+
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if isinstance(result, tuple):
+        _, peak_memory = result
+    return {"wall_time": best,
+            "peak_memory": peak_memory,
+            "evaluations": n_evaluations,
+            "evaluations_per_second": n_evaluations/best}
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float, memory_tolerance: float) -> list:
+    """
+    :return: The names of the benchmarks that are slower or use more memory than the baseline, beyond the tolerances.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            result["regression"] = None
+            continue
+        result["time_ratio"] = result["wall_time"]/reference["wall_time"]
+        result["memory_ratio"] = result["peak_memory"]/max(reference["peak_memory"], 1)
+        result["regression"] = result["time_ratio"] > 1+time_tolerance or result["memory_ratio"] > 1+memory_tolerance
+        if result["regression"]:
+            regressions.append(name)
+    return regressions
+
+
+def main_benchmarks():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchmark_results.json", help="The JSON file for the results")
+    parser.add_argument("--baseline", help="A results file to compare against")
+    parser.add_argument("--save-baseline", help="Also write the results to this file, to be used as a baseline")
+    parser.add_argument("--filter", default="", help="Only run the benchmarks with names containing this string")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of timings per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.1, help="The minimum duration of a timing in seconds")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="Flag benchmarks more than this fraction slower than the baseline")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25,
+                        help="Flag benchmarks using more than this fraction more memory than the baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+
+    results = {}
+    print("{:>36} {:>12} {:>12} {:>14} {:>10}".format("benchmark", "time (s)", "memory (kB)", "evals/s", "vs base"))
+    for name, setup in benchmarks().items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup, repeat=args.repeat, min_time=args.min_time)
+        regressions = compare({name: results[name]}, baseline, args.time_tolerance, args.memory_tolerance)
+        ratio = "{:.2f}x".format(results[name]["time_ratio"]) if "time_ratio" in results[name] else "-"
+        print("{:>36} {:>12.6f} {:>12.1f} {:>14.1f} {:>10}{}".format(
+            name, results[name]["wall_time"], results[name]["peak_memory"]/1024,
+            results[name]["evaluations_per_second"], ratio, "  REGRESSION" if regressions else ""))
+
+    regressions = [name for name, result in results.items() if result.get("regression")]
+    report = {"python": platform.python_version(),
+              "numpy": np.__version__,
+              "machine": platform.machine(),
+              "platform": platform.platform(),
+              "cpus": os.cpu_count(),
+              "results": results,
+              "regressions": regressions}
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+    if regressions:
+        print("Regressions against {}: {}".format(args.baseline, ", ".join(regressions)))
+        sys.exit(1)
+    pass
+
+
+if __name__ == "__main__":
+    main_benchmarks()
@@ -0,0 +1,43 @@
+"""
+Command line entry point for the laminate tools. A subcommand only imports the modules it runs, so headless batch
+commands never import matplotlib and every command starts as fast as the modules it needs allow.
+
+    python cli.py testbench               The interactive test bench of "main.py"
+    python cli.py optimize                The Kevlar optimization example of "OptimizedLaminate.py"
+    python cli.py transformations         The 3D transformation study of "stiffness_matrix_transformations.py"
+    python cli.py sweep OUTPUT [options]  Headless deviation grids, see "surface_sweep.py"
+    python cli.py scatter [options]       Monte Carlo material scatter, see "MaterialScatter.py"
+    python cli.py stacking                The genetic stacking sequence optimizer of "StackingSequenceOptimizer.py"
+    python cli.py serve [options]         The local evaluation server, see "EvaluationServer.py"
+
+The options of a subcommand are passed on to the command, e.g. "python cli.py sweep --help".
+"""
+import argparse
+import importlib
+import sys
+
+# The module whose "main" function runs each subcommand
+COMMANDS = {"testbench": "main",
+            "optimize": "OptimizedLaminate",
+            "transformations": "stiffness_matrix_transformations",
+            "sweep": "surface_sweep",
+            "scatter": "MaterialScatter",
+            "stacking": "StackingSequenceOptimizer",
+            "serve": "EvaluationServer"}
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=list(COMMANDS))
+    parser.add_argument("arguments", nargs=argparse.REMAINDER, help="The options of the command")
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(COMMANDS[args.command])
+    # The commands parse their own options from sys.argv
+    sys.argv = ["{} {}".format(sys.argv[0], args.command)] + args.arguments
+    module.main()
+    pass
+
+
+if __name__ == "__main__":
+    main()
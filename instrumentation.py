@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager
+
+
+class Instrumentation:
+
+    def __init__(self, progress_callback=None, progress_interval: float = 1.0) -> None:
+        """
+        Counters, timers and progress reporting for long optimization runs. Instrumented classes take an
+        "instrumentation" argument that defaults to None, and only call into this class when one is given, so runs
+        without instrumentation do not pay for it.
+        :param progress_callback: Called as progress_callback(stage, report) at most every "progress_interval" seconds,
+        where "report" is the current "report()".
+        :param progress_interval: The minimum time in seconds between calls to the progress callback.
+        """
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.counters = {}
+        self.maxima = {}
+        # The total time and the number of calls per timer
+        self.timers = {}
+        self.start_time = time.perf_counter()
+        self._last_progress = -float("inf")
+        pass
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+        pass
+
+    def maximum(self, name: str, value) -> None:
+        """
+        Records the largest value seen, e.g. the recursion depth.
+        """
+        if value > self.maxima.get(name, -float("inf")):
+            self.maxima[name] = value
+        pass
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        total, n_calls = self.timers.get(name, (0.0, 0))
+        self.timers[name] = (total + seconds, n_calls + calls)
+        pass
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def progress(self, stage: str) -> None:
+        """
+        Calls the progress callback, unless it was called less than "progress_interval" seconds ago.
+        """
+        if self.progress_callback is not None:
+            now = time.perf_counter()
+            if now - self._last_progress >= self.progress_interval:
+                self._last_progress = now
+                self.progress_callback(stage, self.report())
+        pass
+
+    def report(self) -> dict:
+        """
+        :return: The counters, maxima and timers (total time, calls and mean time per call), and the elapsed time.
+        """
+        return {"elapsed": time.perf_counter() - self.start_time,
+                "counters": dict(self.counters),
+                "maxima": dict(self.maxima),
+                "timers": {name: {"total": total, "calls": calls, "mean": total/calls if calls else 0.0}
+                           for name, (total, calls) in self.timers.items()}}
+
+    def __str__(self) -> str:
+        report = self.report()
+        lines = ["Elapsed: {:.4f} s".format(report["elapsed"])]
+        lines += ["{:>32}: {}".format(name, value) for name, value in sorted(report["counters"].items())]
+        lines += ["{:>32}: {} (max)".format(name, value) for name, value in sorted(report["maxima"].items())]
+        lines += ["{:>32}: {:.4f} s in {} calls".format(name, timer["total"], timer["calls"])
+                  for name, timer in sorted(report["timers"].items())]
+        return "\n".join(lines)
@@ -0,0 +1,264 @@
+import laminatelib
+import numpy as np
+from numpy import ndarray
+
+from Layup import Layup
+
+
+def T2Ds_batch(orientations: ndarray) -> ndarray:
+    """
+    Vectorized version of "laminatelib.T2Ds".
+    :param orientations: Array of ply orientations in degrees, of any shape (...).
+    :return: Array of stress transformation matrices with shape (..., 3, 3).
+    """
+    a = np.radians(np.asarray(orientations, dtype=float))
+    c, s = np.cos(a), np.sin(a)
+    T = np.empty(a.shape + (3, 3), float)
+    T[..., 0, 0] = c*c
+    T[..., 0, 1] = s*s
+    T[..., 0, 2] = 2*c*s
+    T[..., 1, 0] = s*s
+    T[..., 1, 1] = c*c
+    T[..., 1, 2] = -2*c*s
+    T[..., 2, 0] = -c*s
+    T[..., 2, 1] = c*s
+    T[..., 2, 2] = c*c-s*s
+    return T
+
+
+def T2De_batch(orientations: ndarray) -> ndarray:
+    """
+    Vectorized version of "laminatelib.T2De".
+    :param orientations: Array of ply orientations in degrees, of any shape (...).
+    :return: Array of strain transformation matrices with shape (..., 3, 3).
+    """
+    a = np.radians(np.asarray(orientations, dtype=float))
+    c, s = np.cos(a), np.sin(a)
+    T = np.empty(a.shape + (3, 3), float)
+    T[..., 0, 0] = c*c
+    T[..., 0, 1] = s*s
+    T[..., 0, 2] = c*s
+    T[..., 1, 0] = s*s
+    T[..., 1, 1] = c*c
+    T[..., 1, 2] = -c*s
+    T[..., 2, 0] = -2*c*s
+    T[..., 2, 1] = 2*c*s
+    T[..., 2, 2] = c*c-s*s
+    return T
+
+
+def Q2Dtransform_batch(Q: ndarray, orientations: ndarray) -> ndarray:
+    """
+    Vectorized version of "laminatelib.Q2Dtransform". The inverse of the stress transformation matrix is obtained
+    analytically as T2Ds(-orientation) instead of by a matrix inversion.
+    :param Q: Array of stiffness matrices with shape (..., 3, 3), broadcastable against the orientations.
+    :param orientations: Array of ply orientations in degrees, of any shape (...).
+    :return: Array of transformed stiffness matrices with shape (..., 3, 3).
+    """
+    orientations = np.asarray(orientations, dtype=float)
+    return T2Ds_batch(-orientations) @ Q @ T2De_batch(orientations)
+
+
+def Q2D_batch(E1, E2, v12, G12) -> ndarray:
+    """
+    Vectorized version of "laminatelib.Q2D", taking the material constants as broadcastable arrays instead of a
+    material dict.
+    :return: Array of stiffness matrices with shape (..., 3, 3), where (...) is the broadcast shape of the inputs.
+    """
+    E1, E2, v12, G12 = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in (E1, E2, v12, G12)])
+    v21 = v12*E2/E1
+    Q = np.zeros(E1.shape + (3, 3), float)
+    Q[..., 0, 0] = E1/(1-v12*v21)
+    Q[..., 0, 1] = v12*E2/(1-v12*v21)
+    Q[..., 1, 0] = Q[..., 0, 1]
+    Q[..., 1, 1] = E2/(1-v12*v21)
+    Q[..., 2, 2] = G12
+    return Q
+
+
+def pad_layups(orientations: list, thicknesses: list, material_indices: list = None) -> tuple:
+    """
+    Pads ragged per-layup ply data into rectangular arrays. Padding plies are given zero thickness,
+    so they do not contribute to the stiffness of the laminate.
+    :param orientations: A list of N sequences with the ply orientations of each layup.
+    :param thicknesses: A list of N sequences with the ply thicknesses of each layup.
+    :param material_indices: A list of N sequences with the ply material indices of each layup. Defaults to 0.
+    :return: The padded orientations, thicknesses and material indices, each with shape (N, P).
+    """
+    n_layups = len(orientations)
+    n_plies = max([len(layup) for layup in orientations], default=0)
+    padded_orientations = np.zeros((n_layups, n_plies), float)
+    padded_thicknesses = np.zeros((n_layups, n_plies), float)
+    padded_material_indices = np.zeros((n_layups, n_plies), int)
+    for i in range(n_layups):
+        n = len(orientations[i])
+        padded_orientations[i, :n] = orientations[i]
+        padded_thicknesses[i, :n] = thicknesses[i]
+        if material_indices is not None:
+            padded_material_indices[i, :n] = material_indices[i]
+    return padded_orientations, padded_thicknesses, padded_material_indices
+
+
+def compute_Qt_batch(orientations: ndarray, material_indices: ndarray, materials: list) -> ndarray:
+    """
+    Computes the transformed stiffness matrix of every ply in a population of layups.
+    :param orientations: Ply orientations in degrees with shape (N, P).
+    :param material_indices: Indices into "materials" with shape (N, P).
+    :param materials: The material table. Materials on the format used in "matlib.py".
+    :return: Transformed ply stiffness matrices with shape (N, P, 3, 3).
+    """
+    Qs = np.array([laminatelib.Q2D(material) for material in materials], float).reshape(-1, 3, 3)
+    return Q2Dtransform_batch(Qs[np.asarray(material_indices)], orientations)
+
+
+def compute_Qt_cached(orientations: ndarray, material_indices: ndarray, materials: list, cache,
+                      dtype=np.float64) -> ndarray:
+    """
+    Same as "compute_Qt_batch", but looks up every unique (material, orientation) pair in a "StiffnessCache",
+    such that a ply stiffness is only transformed once per process.
+    :param cache: The "StiffnessCache" to use.
+    :param dtype: The data type of the returned matrices. The matrices are computed in float64 in either case.
+    :return: Transformed ply stiffness matrices with shape (N, P, 3, 3).
+    """
+    orientations = np.asarray(orientations, dtype=float)
+    material_indices = np.asarray(material_indices)
+    # The (material, orientation) pairs are encoded as integers, which are much faster to make unique than rows
+    unique_orientations, orientation_inverse = np.unique(orientations.ravel(), return_inverse=True)
+    unique_materials, material_inverse = np.unique(material_indices.ravel(), return_inverse=True)
+    codes, inverse = np.unique(material_inverse.ravel()*len(unique_orientations) + orientation_inverse.ravel(),
+                               return_inverse=True)
+    unique_Qts = np.array([cache.get_Qt(materials[int(unique_materials[code // len(unique_orientations)])],
+                                        float(unique_orientations[code % len(unique_orientations)]))
+                           for code in codes], dtype).reshape(-1, 3, 3)
+    return unique_Qts[inverse.ravel()].reshape(orientations.shape + (3, 3))
+
+
+def ply_coordinates(thicknesses: ndarray, dtype=np.float64) -> tuple:
+    """
+    Computes the bottom and top z-coordinates of every ply, measured from the mid-plane of each laminate.
+    :param thicknesses: Ply thicknesses with shape (N, P).
+    :return: The bottom and top coordinates, each with shape (N, P).
+    """
+    thicknesses = np.asarray(thicknesses, dtype=dtype)
+    h_top = np.cumsum(thicknesses, axis=-1) - thicknesses.sum(axis=-1, keepdims=True)/2
+    h_bot = h_top - thicknesses
+    return h_bot, h_top
+
+
+def compute_A_from_Qt(Qts: ndarray, thicknesses: ndarray) -> ndarray:
+    """
+    :param Qts: Transformed ply stiffness matrices with shape (N, P, 3, 3).
+    :param thicknesses: Ply thicknesses with shape (N, P).
+    :return: The A matrices with shape (N, 3, 3).
+    """
+    return np.einsum("npij,np->nij", Qts, np.asarray(thicknesses, dtype=float))
+
+
+def compute_ABD_from_Qt(Qts: ndarray, thicknesses: ndarray, dtype=np.float64) -> ndarray:
+    """
+    :param Qts: Transformed ply stiffness matrices with shape (N, P, 3, 3).
+    :param thicknesses: Ply thicknesses with shape (N, P).
+    :param dtype: The precision of the computation, e.g. np.float32 with float32 "Qts" for screening, see
+    "screening.py".
+    :return: The ABD matrices with shape (N, 6, 6).
+    """
+    h_bot, h_top = ply_coordinates(thicknesses, dtype=dtype)
+    ABD = np.empty((Qts.shape[0], 6, 6), dtype)
+    ABD[:, 0:3, 0:3] = np.einsum("npij,np->nij", Qts, h_top-h_bot)
+    ABD[:, 0:3, 3:6] = (1/2)*np.einsum("npij,np->nij", Qts, h_top**2-h_bot**2)
+    ABD[:, 3:6, 0:3] = ABD[:, 0:3, 3:6]
+    ABD[:, 3:6, 3:6] = (1/3)*np.einsum("npij,np->nij", Qts, h_top**3-h_bot**3)
+    return ABD
+
+
+def compute_ABD_batch(orientations: ndarray, thicknesses: ndarray, material_indices: ndarray,
+                      materials: list) -> ndarray:
+    """
+    Computes the ABD matrices of N layups in one pass. Layups with fewer plies must be padded with
+    zero-thickness plies, see "pad_layups".
+    :param orientations: Ply orientations in degrees with shape (N, P).
+    :param thicknesses: Ply thicknesses with shape (N, P).
+    :param material_indices: Indices into "materials" with shape (N, P).
+    :param materials: The material table. Materials on the format used in "matlib.py".
+    :return: The ABD matrices with shape (N, 6, 6).
+    """
+    Qts = compute_Qt_batch(orientations=orientations, material_indices=material_indices, materials=materials)
+    return compute_ABD_from_Qt(Qts, thicknesses)
+
+
+def layup_arrays(layup) -> tuple:
+    """
+    Splits a layup into the arrays used by the batch functions.
+    :param layup: A "Layup" or a list of "Ply"-objects.
+    :return: The orientations, thicknesses and material indices with shape (1, P), and the material table.
+    """
+    layup = Layup.from_plies(layup)
+    return layup.orientations[None, :], layup.thicknesses[None, :], layup.material_indices[None, :], \
+        list(layup.materials)
+
+
+def lamination_invariants(Q: ndarray) -> ndarray:
+    """
+    The orientation-independent invariants U1-U5 of orthotropic ply stiffness matrices.
+    :param Q: Stiffness matrices in the 1-2 coordinate system with shape (..., 3, 3).
+    :return: The invariants with shape (..., 5).
+    """
+    Q11, Q22, Q12, Q66 = Q[..., 0, 0], Q[..., 1, 1], Q[..., 0, 1], Q[..., 2, 2]
+    return np.stack([(3*Q11+3*Q22+2*Q12+4*Q66)/8,
+                     (Q11-Q22)/2,
+                     (Q11+Q22-2*Q12-4*Q66)/8,
+                     (Q11+Q22+6*Q12-4*Q66)/8,
+                     (Q11+Q22-2*Q12+4*Q66)/8], axis=-1)
+
+
+def trigonometric_weights(orientations: ndarray, weights: ndarray) -> ndarray:
+    """
+    The weighted sums of the trigonometric terms that combine with the lamination invariants.
+    :param orientations: Ply orientations in degrees with shape (..., P).
+    :param weights: Ply weights with shape (..., P), e.g. the ply thicknesses for the A matrix.
+    :return: The sums of w, w*cos(2a), w*sin(2a), w*cos(4a) and w*sin(4a), with shape (..., 5).
+    """
+    a = np.radians(np.asarray(orientations, dtype=float))
+    weights = np.asarray(weights, dtype=float)
+    return np.stack([weights.sum(axis=-1),
+                     (weights*np.cos(2*a)).sum(axis=-1),
+                     (weights*np.sin(2*a)).sum(axis=-1),
+                     (weights*np.cos(4*a)).sum(axis=-1),
+                     (weights*np.sin(4*a)).sum(axis=-1)], axis=-1)
+
+
+def stiffness_from_invariants(U: ndarray, V: ndarray) -> ndarray:
+    """
+    Combines lamination invariants and trigonometric weights to a stiffness matrix. With the ply thicknesses as
+    weights this is the A matrix of a single-material layup.
+    :param U: Lamination invariants with shape (..., 5), see "lamination_invariants".
+    :param V: Trigonometric weights with shape (..., 5), broadcastable against U, see "trigonometric_weights".
+    :return: The stiffness matrices with shape (..., 3, 3).
+    """
+    U = np.asarray(U, dtype=float)
+    V = np.asarray(V, dtype=float)
+    U1, U2, U3, U4, U5 = [U[..., k] for k in range(5)]
+    V0, Vc2, Vs2, Vc4, Vs4 = [V[..., k] for k in range(5)]
+    A11 = U1*V0 + U2*Vc2 + U3*Vc4
+    A22 = U1*V0 - U2*Vc2 + U3*Vc4
+    A12 = U4*V0 - U3*Vc4
+    A66 = U5*V0 - U3*Vc4
+    A16 = U2/2*Vs2 + U3*Vs4
+    A26 = U2/2*Vs2 - U3*Vs4
+    return np.stack([np.stack([A11, A12, A16], axis=-1),
+                     np.stack([A12, A22, A26], axis=-1),
+                     np.stack([A16, A26, A66], axis=-1)], axis=-2)
+
+
+def laminate_properties_batch(A: ndarray, thickness) -> tuple:
+    """
+    Vectorized version of "Laminate.calculate_laminate_properties".
+    :param A: A matrices with shape (..., 3, 3).
+    :param thickness: The laminate thickness, broadcastable against (...).
+    :return: Ex, Ey, Gxy and vxy, each with shape (...).
+    """
+    Ex = (1/thickness)*(A[..., 0, 0]-A[..., 0, 1]**2/A[..., 1, 1])
+    Ey = (1/thickness)*(A[..., 1, 1]-A[..., 0, 1]**2/A[..., 0, 0])
+    Gxy = (1/thickness)*A[..., 2, 2]
+    vxy = A[..., 0, 1]/A[..., 1, 1]
+    return Ex, Ey, Gxy, vxy
@@ -0,0 +1,65 @@
+import numpy as np
+from numpy import ndarray
+
+# The order of the loads in a load case matrix, and of the deformations returned for it
+LOAD_KEYS = ("Nx", "Ny", "Nxy", "Mx", "My", "Mxy")
+
+
+def load_case_matrix(load_cases) -> ndarray:
+    """
+    Converts one or more load cases to a matrix with one row of loads per load case.
+    :param load_cases: A load case dict (e.g. {"Nx": 600, "Nxy": 300}), a list of such dicts, or an array with shape
+    (6,) or (K, 6) with the loads in the order of "LOAD_KEYS". Only prescribed loads are supported, not prescribed
+    deformations.
+    :return: The loads with shape (K, 6).
+    """
+    if isinstance(load_cases, dict):
+        load_cases = [load_cases]
+    if len(load_cases) and isinstance(load_cases[0], dict):
+        loads = np.zeros((len(load_cases), len(LOAD_KEYS)), float)
+        for i, load_case in enumerate(load_cases):
+            for key, value in load_case.items():
+                if key not in LOAD_KEYS:
+                    raise ValueError("Unsupported key '{}' in load case, expected one of {}".format(key, LOAD_KEYS))
+                loads[i, LOAD_KEYS.index(key)] = value
+        return loads
+    return np.asarray(load_cases, dtype=float).reshape(-1, len(LOAD_KEYS))
+
+
+def solve_deformations(ABD: ndarray, loads: ndarray) -> ndarray:
+    """
+    Solves for the mid-plane deformations of all load cases with one factorization of each ABD matrix.
+    :param ABD: An ABD matrix with shape (6, 6), or a stack of them with shape (N, 6, 6).
+    :param loads: The loads with shape (K, 6).
+    :return: The deformations (ex0, ey0, exy0, kx, ky, kxy) with shape (K, 6), or (N, K, 6) for a stack.
+    """
+    ABD = np.asarray(ABD)
+    # The loads follow the precision of the ABD matrices, so float32 matrices are solved in float32
+    loads = np.asarray(loads, dtype=np.result_type(ABD.dtype, np.float32))
+    return np.swapaxes(np.linalg.solve(ABD, loads.T), -1, -2)
+
+
+def exposure_factors(deformations: ndarray, deformation_limits: list) -> ndarray:
+    """
+    The magnitudes of the deformations relative to their limits. A limit applies to positive and negative
+    deformations alike, so a reversed load case is as severe as the original one.
+    :param deformations: Deformations with shape (..., 6).
+    :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+    :return: The exposure factors with shape (..., len(deformation_limits)). Components without a limit are 0.
+    """
+    exposure = np.zeros(deformations.shape[:-1] + (len(deformation_limits),), float)
+    for idx, deformation_limit in enumerate(deformation_limits):
+        if deformation_limit is not None:
+            exposure[..., idx] = np.abs(deformations[..., idx])/deformation_limit
+    return exposure
+
+
+def envelope_exposure_factors(ABD: ndarray, loads: ndarray, deformation_limits: list) -> ndarray:
+    """
+    The worst case of every exposure factor over all load cases.
+    :param ABD: An ABD matrix with shape (6, 6), or a stack of them with shape (N, 6, 6).
+    :param loads: The loads with shape (K, 6).
+    :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+    :return: The exposure factors with shape (len(deformation_limits),), or (N, len(deformation_limits)) for a stack.
+    """
+    return exposure_factors(solve_deformations(ABD, loads), deformation_limits).max(axis=-2)
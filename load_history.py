@@ -0,0 +1,143 @@
+import itertools
+
+import numpy as np
+from numpy import ndarray
+
+from load_cases import LOAD_KEYS
+
+# The number of time steps read and evaluated at a time
+CHUNK_SIZE = 65536
+
+
+def read_load_chunks(source, chunk_size: int = CHUNK_SIZE, dtype=np.float64):
+    """
+    Reads a load history in chunks of time steps, without reading the whole history into memory.
+    :param source: An array with shape (T, 6), or a file path:
+        - ".npy": A numpy array with shape (T, 6), memory-mapped.
+        - ".csv" or ".txt": Comma-separated loads with one time step per line. A header line with names from "LOAD_KEYS"
+          gives the order of the columns, and loads missing from the header are 0. Without a header the columns must
+          be in the order of "LOAD_KEYS". An empty file has no time steps.
+        - Any other extension: Raw binary loads in the order of "LOAD_KEYS", memory-mapped with the given dtype.
+    :param chunk_size: The maximum number of time steps in a chunk.
+    :param dtype: The data type of raw binary files.
+    :return: A generator of loads with shape (n, 6), n <= chunk_size.
+    """
+    if isinstance(source, np.ndarray):
+        yield from _array_chunks(source, chunk_size)
+    elif str(source).endswith(".npy"):
+        yield from _array_chunks(np.load(source, mmap_mode="r"), chunk_size)
+    elif str(source).endswith((".csv", ".txt")):
+        yield from _text_chunks(source, chunk_size)
+    else:
+        yield from _array_chunks(np.memmap(source, dtype=dtype, mode="r"), chunk_size)
+
+
+def _array_chunks(loads: ndarray, chunk_size: int):
+    loads = loads.reshape(-1, len(LOAD_KEYS))
+    for start in range(0, len(loads), chunk_size):
+        yield np.asarray(loads[start:start+chunk_size], dtype=np.float64)
+
+
+def _text_chunks(path: str, chunk_size: int):
+    with open(path) as file:
+        first_line = file.readline()
+        if not first_line.strip():
+            # An empty history has no header and no time steps, as a history with only a header
+            return
+        names = [name.strip() for name in first_line.split(",")]
+        if set(names) <= set(LOAD_KEYS):
+            columns = [LOAD_KEYS.index(name) for name in names]
+            lines = file
+        elif len(names) == len(LOAD_KEYS):
+            columns = list(range(len(LOAD_KEYS)))
+            lines = itertools.chain([first_line], file)
+        else:
+            raise ValueError("Unsupported header '{}', expected names from {}".format(first_line.strip(), LOAD_KEYS))
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                break
+            values = np.loadtxt(chunk, delimiter=",", ndmin=2)
+            loads = np.zeros((len(values), len(LOAD_KEYS)), float)
+            loads[:, columns] = values
+            yield loads
+    pass
+
+
+class ExposureSummary:
+
+    def __init__(self, deformation_limits: list) -> None:
+        """
+        Running summary of the exposure factors over a load history, updated one chunk of time steps at a time.
+        :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+        """
+        self.deformation_limits = list(deformation_limits)
+        n = len(self.deformation_limits)
+        self.n_steps = 0
+        # The worst exposure factor of each deformation and the time step where it occurred
+        self.max = np.full(n, -np.inf)
+        self.argmax = np.zeros(n, np.int64)
+        # The number of time steps where each exposure factor, and any exposure factor, is 1 or above
+        self.exceedances = np.zeros(n, np.int64)
+        self.any_exceedances = 0
+        pass
+
+    def __repr__(self) -> str:
+        return "ExposureSummary(n_steps={}, max={}, argmax={}, exceedances={})".format(
+            self.n_steps, self.max.tolist(), self.argmax.tolist(), self.exceedances.tolist())
+
+    def update(self, exposure: ndarray) -> None:
+        """
+        :param exposure: The exposure factors of the next time steps, with shape (n, len(deformation_limits)).
+        """
+        if len(exposure):
+            argmax = exposure.argmax(axis=0)
+            chunk_max = exposure[argmax, np.arange(exposure.shape[1])]
+            improved = chunk_max > self.max
+            self.max[improved] = chunk_max[improved]
+            self.argmax[improved] = self.n_steps + argmax[improved]
+            exceeded = exposure >= 1
+            self.exceedances += exceeded.sum(axis=0)
+            self.any_exceedances += int(exceeded.any(axis=1).sum())
+            self.n_steps += len(exposure)
+        pass
+
+    @property
+    def exposure_factors(self) -> list:
+        """
+        The worst case of each exposure factor, as returned by "Laminate.calculate_exposure_factors" for multiple load
+        cases.
+        """
+        return self.max.tolist()
+
+
+def exposure_matrix(ABD: ndarray, deformation_limits: list) -> ndarray:
+    """
+    Combines the inverted ABD matrix and the deformation limits, so the exposure factors of a time step are the
+    magnitudes of its loads times this matrix. The ABD matrix is inverted once rather than factorized per chunk, since
+    one matrix product per chunk is faster than a solve for a 6x6 system.
+    :return: The matrix with shape (6, len(deformation_limits)). Columns without a limit are 0.
+    """
+    compliance = np.linalg.inv(ABD)
+    matrix = np.zeros((len(LOAD_KEYS), len(deformation_limits)), float)
+    for idx, deformation_limit in enumerate(deformation_limits):
+        if deformation_limit is not None:
+            matrix[:, idx] = compliance[idx, :]/deformation_limit
+    return matrix
+
+
+def stream_exposure_factors(ABD: ndarray, chunks, deformation_limits: list) -> ExposureSummary:
+    """
+    Evaluates the exposure factors of a load history chunk by chunk.
+    :param ABD: The ABD matrix of the laminate.
+    :param chunks: An iterable of loads with shape (n, 6), e.g. from "read_load_chunks".
+    :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+    :return: The summary of the exposure factors over all time steps.
+    """
+    matrix = exposure_matrix(ABD, deformation_limits)
+    summary = ExposureSummary(deformation_limits)
+    for loads in chunks:
+        # Deformations of either sign count against their limits, see "load_cases.exposure_factors"
+        exposure = loads @ matrix
+        summary.update(np.abs(exposure, out=exposure))
+    return summary
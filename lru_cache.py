@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+
+def make_read_only(value) -> None:
+    """
+    :param value: An array, or a tuple of arrays, that is shared through a cache.
+    """
+    for array in value if isinstance(value, tuple) else (value,):
+        array.setflags(write=False)
+    pass
+
+
+class LRUCache:
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Bounded least recently used cache with hit and miss counters, for results that are arrays or tuples of arrays.
+        The cached arrays are shared between all users and are therefore made read-only.
+        :param maxsize: The maximum number of results kept in the cache.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        pass
+
+    def lookup(self, key: tuple, compute):
+        """
+        :param key: A hashable key of the result.
+        :param compute: Called without arguments to compute the result on a miss.
+        :return: The cached or computed result.
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self._count(key, hit=False)
+            value = compute()
+            make_read_only(value)
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+        self._count(key, hit=True)
+        self._entries.move_to_end(key)
+        return value
+
+    def peek(self, key: tuple):
+        """
+        :return: The cached result, or None, without counting the lookup or changing the eviction order.
+        """
+        return self._entries.get(key)
+
+    def _count(self, key: tuple, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        pass
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        pass
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize, "currsize": len(self._entries)}
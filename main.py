@@ -1,99 +1,88 @@
 import numpy as np
-import copy
-import matplotlib.pyplot as plt
-from matplotlib import cm
-from matplotlib.widgets import Slider, Button
 
 import matlib
+import surface_sweep
+from Layup import Layup
 from Ply import Ply
-from Laminate import Laminate
+from surface_sweep import DEVIATION_MAX, DEVIATION_MIN, DIMENSION
 
-DIMENSION = 20
-DEVIATION_MIN = 50
-DEVIATION_MAX = 50
 LAMINATE_ORIENTATION = 0
 
-GFRP = copy.deepcopy(matlib.get("E-glass/Epoxy"))
-CFRP = copy.deepcopy(matlib.get("Carbon/Epoxy(a)"))
+GFRP = matlib.get_material("E-glass/Epoxy")
+CFRP = matlib.get_material("Carbon/Epoxy(a)")
 
 
 class LaminateTestBench:
 
-    def __init__(self, material: dict, layup: list[Ply] = None, layup_name: str = None, fig=None, axs=None) -> None:
-        self.material = material
-
+    def __init__(self, material: dict, layup: Layup = None, layup_name: str = None, fig=None, axs=None,
+                 dimension: int = None, deviation_min: float = None, deviation_max: float = None) -> None:
+        """
+        Interactive surface plots of the effective laminate properties over a grid of material deviations. The grids
+        are computed by "surface_sweep.deviation_grids", which can be used without a display.
+        :param dimension: The number of grid points along each axis, DIMENSION if not given.
+        :param deviation_min: The largest negative deviation in %, DEVIATION_MIN if not given.
+        :param deviation_max: The largest positive deviation in %, DEVIATION_MAX if not given.
+        """
         self.fig = fig
         self.axs = axs
         self.layup = layup
         self.layup_name = layup_name
 
-        self.X = None
-        self.Y = None
-        self.E2s = np.linspace(-DEVIATION_MIN, DEVIATION_MAX, DIMENSION)
-        self.G12s = np.linspace(-DEVIATION_MIN, DEVIATION_MAX, DIMENSION)
+        self.set_grid(dimension=dimension if dimension is not None else DIMENSION,
+                      deviation_min=deviation_min if deviation_min is not None else DEVIATION_MIN,
+                      deviation_max=deviation_max if deviation_max is not None else DEVIATION_MAX)
+        self.set_material(material)
+        pass
+
+    def set_grid(self, dimension: int, deviation_min: float, deviation_max: float) -> None:
+        self.dimension = dimension
+        self.deviation_min = deviation_min
+        self.deviation_max = deviation_max
+
+        self.E2s = np.linspace(-deviation_min, deviation_max, dimension)
+        self.G12s = np.linspace(-deviation_min, deviation_max, dimension)
         self.X, self.Y = np.meshgrid(self.E2s, self.G12s)
 
         # Temporary containers that are constantly overwritten. Put here for easy accessibility.
-        self.Exs = np.zeros((DIMENSION, DIMENSION))
-        self.Eys = np.zeros((DIMENSION, DIMENSION))
-        self.Gxys = np.zeros((DIMENSION, DIMENSION))
-        self.vxys = np.zeros((DIMENSION, DIMENSION))
-
-        self.layup_A = [Ply(material=material, orientation=0,   thickness=1),
-                        Ply(material=material, orientation=90,  thickness=1),
-                        Ply(material=material, orientation=90,  thickness=1),
-                        Ply(material=material, orientation=0,   thickness=1)]
-
-        self.layup_B = [Ply(material=material, orientation=45,  thickness=1),
-                        Ply(material=material, orientation=-45, thickness=1),
-                        Ply(material=material, orientation=-45, thickness=1),
-                        Ply(material=material, orientation=45,  thickness=1)]
-
-        self.layup_C = [Ply(material=material, orientation=0,   thickness=1),
-                        Ply(material=material, orientation=90,  thickness=1),
-                        Ply(material=material, orientation=45,  thickness=1),
-                        Ply(material=material, orientation=-45, thickness=1),
-                        Ply(material=material, orientation=-45, thickness=1),
-                        Ply(material=material, orientation=45,  thickness=1),
-                        Ply(material=material, orientation=90,  thickness=1),
-                        Ply(material=material, orientation=0,   thickness=1)]
+        self.Exs = np.zeros((dimension, dimension))
+        self.Eys = np.zeros((dimension, dimension))
+        self.Gxys = np.zeros((dimension, dimension))
+        self.vxys = np.zeros((dimension, dimension))
+        pass
+
+    def set_material(self, material: dict) -> None:
+        self.material = material
+
+        self.layup_A = Layup.uniform(material=material, orientations=[0, 90, 90, 0], thickness=1)
+
+        self.layup_B = Layup.uniform(material=material, orientations=[45, -45, -45, 45], thickness=1)
+
+        self.layup_C = Layup.uniform(material=material, orientations=[0, 90, 45, -45, -45, 45, 90, 0], thickness=1)
         pass
 
     @staticmethod
-    def substitute_layup_material(layup: list[Ply], substitute: dict) -> list[Ply]:
-        new_layup = copy.deepcopy(layup)
-        for ply in new_layup:
-            ply.material = substitute
-        return new_layup
+    def substitute_layup_material(layup: Layup | list[Ply], substitute: dict) -> Layup:
+        return Layup.from_plies(layup).with_material(substitute)
 
     @staticmethod
-    def substitute_layup_orientation(layup: list[Ply], new_orientation: float) -> list[Ply]:
-        new_layup = copy.deepcopy(layup)
-        for ply in new_layup:
-            ply.orientation += new_orientation
-        return new_layup
-
-    def calculate_effective_properties(self, layup: list[Ply], orientation: float) -> None:
-        rotated_layup = self.substitute_layup_orientation(layup=layup, new_orientation=orientation)
-        laminate = Laminate(layup=rotated_layup, name="base_laminate")
-        np.set_printoptions(precision=2, suppress=True)
-        Ex0, Ey0, Gxy0, vxy0 = laminate.calculate_laminate_properties()
-
-        for i, E2_correction in enumerate(self.E2s):
-            for j, G12_correction in enumerate(self.G12s):
-                m = copy.deepcopy(self.material)
-                m["E2"] *= (1+E2_correction/100)
-                m["G12"] *= (1+G12_correction/100)
-                corrected_layup = self.substitute_layup_material(layup=rotated_layup, substitute=m)
-                laminate = Laminate(layup=corrected_layup, name="{}_{}_{}".format(self.material["name"], i, j))
-                Ex, Ey, Gxy, vxy = laminate.calculate_laminate_properties()
-                self.Exs[j, i] = 100*(Ex-Ex0)/Ex0
-                self.Eys[j, i] = 100*(Ey-Ey0)/Ey0
-                self.Gxys[j, i] = 100*(Gxy-Gxy0)/Gxy0
-                self.vxys[j, i] = 100*(vxy-vxy0)/vxy0
+    def substitute_layup_orientation(layup: Layup | list[Ply], new_orientation: float) -> Layup:
+        return Layup.from_plies(layup).rotated(new_orientation)
+
+    def calculate_effective_properties(self, layup: Layup | list[Ply], orientation: float) -> None:
+        # Returning to a previously shown material, layup, orientation and grid is a cache hit
+        _, _, Exs, Eys, Gxys, vxys = surface_sweep.deviation_grids(
+            material=self.material, layup=layup, orientation=orientation, dimension=self.dimension,
+            deviation_min=self.deviation_min, deviation_max=self.deviation_max)
+        self.Exs[:, :] = Exs
+        self.Eys[:, :] = Eys
+        self.Gxys[:, :] = Gxys
+        self.vxys[:, :] = vxys
         pass
 
     def plot_surfaces(self) -> None:
+        # matplotlib is imported when plotting, so the test bench can be imported and used without it
+        from matplotlib import cm
+
         self.axs[0, 0].cla()
         surf1 = self.axs[0, 0].plot_surface(self.X, self.Y, self.Exs, cmap=cm.RdYlGn_r, linewidth=0, antialiased=False)
         self.axs[0, 0].set_zlabel("E_x (% dev)")
@@ -115,7 +104,9 @@ class LaminateTestBench:
             ax.set_ylabel("G_12 (% dev)")
         pass
 
-    def plot_layup_surface(self, layup: list[Ply], layup_name: str) -> None:
+    def plot_layup_surface(self, layup: Layup | list[Ply], layup_name: str) -> None:
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Slider, Button
 
         self.layup = layup
         self.layup_name = layup_name
@@ -123,7 +114,7 @@ class LaminateTestBench:
         # Make the surface plots
         self.fig, self.axs = plt.subplots(2, 2, subplot_kw={"projection": "3d"})
         self.fig.suptitle("material={}, layup={}, dimensions={}x{}, orientation={}°".format(
-            self.material["name"], self.layup_name, DIMENSION, DIMENSION, LAMINATE_ORIENTATION))
+            self.material["name"], self.layup_name, self.dimension, self.dimension, LAMINATE_ORIENTATION))
 
         self.calculate_effective_properties(layup=self.layup, orientation=LAMINATE_ORIENTATION)
         self.plot_surfaces()
@@ -146,14 +137,13 @@ class LaminateTestBench:
             label='Plot dimensions',
             valmin=5,
             valmax=50,
-            valinit=DIMENSION,
+            valinit=self.dimension,
             valfmt='%0.0f',
         )
 
         def update_plot_dimension(val):
-            global DIMENSION
-            DIMENSION = round(dimension_slider.val)
-            self.__init__(material=self.material, layup=self.layup, layup_name=self.layup_name, fig=self.fig, axs=self.axs)
+            self.set_grid(dimension=round(dimension_slider.val), deviation_min=self.deviation_min,
+                          deviation_max=self.deviation_max)
             update_surface_plot(val=None)
             pass
 
@@ -166,16 +156,13 @@ class LaminateTestBench:
             label='Max/min deviation (%)',
             valmin=10,
             valmax=90,
-            valinit=DEVIATION_MAX,
+            valinit=self.deviation_max,
             valfmt='%0.0f',
         )
 
         def update_plot_deviation(val):
-            global DEVIATION_MAX
-            global DEVIATION_MIN
-            DEVIATION_MAX = round(deviation_slider.val)
-            DEVIATION_MIN = round(deviation_slider.val)
-            self.__init__(material=self.material, layup=self.layup, layup_name=self.layup_name, fig=self.fig, axs=self.axs)
+            self.set_grid(dimension=self.dimension, deviation_min=round(deviation_slider.val),
+                          deviation_max=round(deviation_slider.val))
             update_surface_plot(val=None)
             pass
 
@@ -218,7 +205,7 @@ class LaminateTestBench:
 
         def _GFRP_button(event):
             self.layup = self.substitute_layup_material(layup=self.layup, substitute=GFRP)
-            self.__init__(material=GFRP, layup=self.layup, layup_name=self.layup_name, fig=self.fig, axs=self.axs)
+            self.set_material(GFRP)
             update_surface_plot(val=None)
             pass
         GFRP_button.on_clicked(_GFRP_button)
@@ -228,7 +215,7 @@ class LaminateTestBench:
 
         def _CFRP_button(event):
             self.layup = self.substitute_layup_material(layup=self.layup, substitute=CFRP)
-            self.__init__(material=CFRP, layup=self.layup, layup_name=self.layup_name, fig=self.fig, axs=self.axs)
+            self.set_material(CFRP)
             update_surface_plot(val=None)
             pass
         CFRP_button.on_clicked(_CFRP_button)
@@ -237,7 +224,8 @@ class LaminateTestBench:
             self.calculate_effective_properties(layup=self.layup, orientation=orientation_slider.val)
             self.plot_surfaces()
             self.fig.suptitle("material={}, layup={}, dimensions={}x{}, orientation={}°".format(
-                self.material["name"], self.layup_name, DIMENSION, DIMENSION, round(orientation_slider.val, 0)))
+                self.material["name"], self.layup_name, self.dimension, self.dimension,
+                round(orientation_slider.val, 0)))
             self.fig.canvas.draw_idle()
             pass
 
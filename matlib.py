@@ -1,7 +1,16 @@
 # Available by courtesy of Assoc. Prof. Nils Petter Vedvik, NTNU
 
+from Material import Material
+
 materials = []
 
+# The materials above by name, rebuilt by _index() when materials are added to the list
+_materials_by_name = {}
+_n_indexed_materials = 0
+
+# Immutable versions of the materials above, created on demand by get_material()
+_shared_materials = {}
+
 # The materials used in TMM4175 assignment 05, problem 2
 
 materials.append( {"name": "E-glass/Epoxy", "units": "MPa-mm-Mg", "type": "UD", "fiber": "E-glass",
@@ -43,11 +52,36 @@ materials.append( {"name": "Kevlar-49/Epoxy", "units": "MPa-mm-Mg", "type": "UD"
                    "f12":-0.5, "f13":-0.5, "f23":-0.5} )
 
 
+def _index():
+    """
+    :return: The materials by name. The first material of a name is kept, as by a scan of the list. The index is
+    rebuilt when the length of the list changes, so materials should be added to the list rather than replaced.
+    """
+    global _n_indexed_materials
+    if _n_indexed_materials != len(materials):
+        _materials_by_name.clear()
+        _shared_materials.clear()
+        for m in materials:
+            _materials_by_name.setdefault(m['name'], m)
+        _n_indexed_materials = len(materials)
+    return _materials_by_name
+
+
 def get(matname):
-    for m in materials:
-        if m['name'] == matname:
-            return m
-    return False
+    return _index().get(matname, False)
+
+
+def get_material(matname):
+    """
+    Same as get(), but returns the material as an immutable "Material" that is shared by all callers.
+    """
+    m = _index().get(matname)
+    if m is None:
+        return False
+    material = _shared_materials.get(matname)
+    if material is None:
+        material = _shared_materials[matname] = Material(m)
+    return material
 
 
 def printlist():
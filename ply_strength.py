@@ -0,0 +1,130 @@
+import numpy as np
+from numpy import ndarray
+
+import laminate_batch
+
+# The strength data of a material on the format used in "matlib.py", in the order of a strength table
+STRENGTH_KEYS = ("XT", "XC", "YT", "YC", "S12", "f12")
+CRITERIA = ("max_stress", "tsai_wu")
+# The positions through the thickness of every ply, in the order of the position axis of the results
+POSITIONS = ("bottom", "top")
+
+
+def strength_table(materials: list) -> ndarray:
+    """
+    :param materials: The material table. Materials on the format used in "matlib.py".
+    :return: The strengths of every material in the order of "STRENGTH_KEYS", with shape (M, 6).
+    """
+    try:
+        return np.array([[material[key] for key in STRENGTH_KEYS] for material in materials], float).reshape(-1, 6)
+    except KeyError as error:
+        raise ValueError("The materials must have the strength data {}, missing {}".format(STRENGTH_KEYS, error))
+
+
+def ply_stress_matrices(orientations: ndarray, material_indices: ndarray, materials: list, cache) -> ndarray:
+    """
+    The matrices Q @ Te of every ply, mapping the strains in the xyz-coordinate system to the stresses in the material
+    coordinate system. The "Ply.Te" and "Ply.Q" matrices of every unique orientation and material are looked up in a
+    "StiffnessCache".
+    :param orientations: Ply orientations in degrees with shape (..., P).
+    :param material_indices: Indices into "materials" with shape (..., P).
+    :param materials: The material table. Materials on the format used in "matlib.py".
+    :param cache: The "StiffnessCache" to use.
+    :return: The matrices with shape (..., P, 3, 3).
+    """
+    orientations = np.asarray(orientations, dtype=float)
+    unique_orientations, orientation_inverse = np.unique(orientations.ravel(), return_inverse=True)
+    unique_materials, material_inverse = np.unique(np.asarray(material_indices).ravel(), return_inverse=True)
+    Tes = np.array([cache.get_Te(float(orientation)) for orientation in unique_orientations]).reshape(-1, 3, 3)
+    Qs = np.array([cache.get_Q(materials[int(index)]) for index in unique_materials]).reshape(-1, 3, 3)
+    matrices = Qs[material_inverse.ravel()] @ Tes[orientation_inverse.ravel()]
+    return matrices.reshape(orientations.shape + (3, 3))
+
+
+def ply_stresses(deformations: ndarray, stress_matrices: ndarray, thicknesses: ndarray) -> ndarray:
+    """
+    Computes the material-axis stresses at the bottom and top of every ply for all load cases at once.
+    :param deformations: The mid-plane deformations (ex0, ey0, exy0, kx, ky, kxy) with shape (..., K, 6).
+    :param stress_matrices: The matrices from "ply_stress_matrices" with shape (..., P, 3, 3).
+    :param thicknesses: Ply thicknesses with shape (..., P).
+    :return: The stresses (s1, s2, t12) with shape (..., K, P, 2, 3), see "POSITIONS".
+    """
+    deformations = np.asarray(deformations, dtype=float)
+    stress_matrices = np.asarray(stress_matrices)
+    n_plies = stress_matrices.shape[-3]
+    h_bot, h_top = laminate_batch.ply_coordinates(thicknesses)
+    z = np.stack((h_bot, h_top), axis=-1)
+    # The matrices of all plies side by side, such that the membrane and bending parts of all load cases are mapped to
+    # the stresses of all plies with one matrix product
+    stacked_matrices = np.moveaxis(stress_matrices, -1, -3).reshape(stress_matrices.shape[:-3] + (1, 3, 3*n_plies))
+    parts = deformations.reshape(deformations.shape[:-1] + (2, 3)) @ stacked_matrices
+    parts = parts.reshape(parts.shape[:-1] + (n_plies, 3))
+    return parts[..., 0, :, None, :] + z[..., None, :, :, None]*parts[..., 1, :, None, :]
+
+
+def max_stress_exposure(stresses: ndarray, strengths: ndarray) -> ndarray:
+    """
+    :param stresses: Stresses from "ply_stresses" with shape (..., K, P, 2, 3).
+    :param strengths: The strengths of every ply with shape (..., P, 6), see "strength_table".
+    :return: The maximum stress exposure factors with shape (..., K, P, 2).
+    """
+    XT, XC, YT, YC, S12, _ = np.moveaxis(np.asarray(strengths)[..., None, :, None, :], -1, 0)
+    s1, s2, t12 = np.moveaxis(stresses, -1, 0)
+    fe1 = np.where(s1 >= 0, s1/XT, -s1/XC)
+    fe2 = np.where(s2 >= 0, s2/YT, -s2/YC)
+    return np.maximum(np.maximum(fe1, fe2), np.abs(t12)/S12)
+
+
+def tsai_wu_exposure(stresses: ndarray, strengths: ndarray) -> ndarray:
+    """
+    The Tsai-Wu exposure factors, i.e. the inverse of the factor that the stresses can be scaled by before failure.
+    With a*R**2 + b*R = 1 at failure, the exposure factor is 1/R = (b + sqrt(b**2 + 4*a))/2.
+    :param stresses: Stresses from "ply_stresses" with shape (..., K, P, 2, 3).
+    :param strengths: The strengths of every ply with shape (..., P, 6), see "strength_table".
+    :return: The Tsai-Wu exposure factors with shape (..., K, P, 2).
+    """
+    XT, XC, YT, YC, S12, f12 = np.moveaxis(np.asarray(strengths)[..., None, :, None, :], -1, 0)
+    s1, s2, t12 = np.moveaxis(stresses, -1, 0)
+    F1, F2 = 1/XT - 1/XC, 1/YT - 1/YC
+    F11, F22, F66 = 1/(XT*XC), 1/(YT*YC), 1/S12**2
+    F12 = f12*np.sqrt(F11*F22)
+    a = F11*s1**2 + F22*s2**2 + F66*t12**2 + 2*F12*s1*s2
+    b = F1*s1 + F2*s2
+    return (b + np.sqrt(b**2 + 4*a))/2
+
+
+def strength_exposure_factors(stresses: ndarray, strengths: ndarray) -> tuple:
+    """
+    :return: The maximum stress and the Tsai-Wu exposure factors, each with shape (..., K, P, 2).
+    """
+    return max_stress_exposure(stresses, strengths), tsai_wu_exposure(stresses, strengths)
+
+
+def criterion_exposure(stresses: ndarray, strengths: ndarray, criterion: str) -> ndarray:
+    """
+    :param criterion: One of "CRITERIA".
+    :return: The exposure factors of the criterion with shape (..., K, P, 2).
+    """
+    if criterion == "max_stress":
+        return max_stress_exposure(stresses, strengths)
+    if criterion == "tsai_wu":
+        return tsai_wu_exposure(stresses, strengths)
+    raise ValueError("Unknown strength criterion '{}', expected one of {}".format(criterion, CRITERIA))
+
+
+def max_criterion_exposure(deformations: ndarray, stress_matrices: ndarray, thicknesses: ndarray,
+                           strengths: ndarray, criterion: str) -> ndarray:
+    """
+    The largest exposure factor over all load cases, plies and positions, for a stack of layups that share the same
+    plies but have some of them removed by a zero thickness. Removed plies are ignored.
+    :param deformations: The mid-plane deformations with shape (N, K, 6).
+    :param stress_matrices: The matrices from "ply_stress_matrices" with shape (P, 3, 3) or (N, P, 3, 3).
+    :param thicknesses: Ply thicknesses with shape (N, P).
+    :param strengths: The strengths of every ply with shape (P, 6) or (N, P, 6).
+    :param criterion: One of "CRITERIA".
+    :return: The largest exposure factors with shape (N,).
+    """
+    thicknesses = np.asarray(thicknesses, dtype=float)
+    exposure = criterion_exposure(ply_stresses(deformations, stress_matrices, thicknesses), strengths, criterion)
+    exposure = np.where((thicknesses > 0)[:, None, :, None], exposure, 0)
+    return exposure.max(axis=(1, 2, 3), initial=0)
@@ -0,0 +1,92 @@
+import numpy as np
+from numpy import ndarray
+
+import laminate_batch
+import load_cases
+import stiffness_cache
+
+PRECISIONS = {"float32": np.float32, "float64": np.float64}
+# Candidates with a largest exposure factor this close to 1 in float32 are re-evaluated in float64. The float32 error of
+# the exposure factors is of the order 1e-6 for well-conditioned ABD matrices, so the default leaves a wide margin.
+TOLERANCE = 1e-3
+CHUNK_SIZE = 16384
+
+
+def screening_memory(n_candidates: int, n_plies: int, precision: str = "float32") -> int:
+    """
+    Estimates the peak memory of screening one chunk of candidates, dominated by the transformed ply stiffness
+    matrices (9 values per ply) and the ply coordinates and their powers (about 8 values per ply). float32 halves it.
+    :return: The estimated number of bytes.
+    """
+    itemsize = np.dtype(PRECISIONS[precision]).itemsize
+    return n_candidates*n_plies*(9 + 8)*itemsize + n_candidates*6*6*itemsize
+
+
+def max_exposure_factors(orientations: ndarray, thicknesses: ndarray, material_indices: ndarray, materials: list,
+                         loads: ndarray, deformation_limits: list, dtype=np.float64) -> ndarray:
+    """
+    The largest exposure factor of each candidate over all load cases, computed in the given precision.
+    :return: The largest exposure factors with shape (N,), as float64. Candidates with a singular ABD matrix give inf.
+    """
+    Qts = laminate_batch.compute_Qt_cached(orientations=orientations, material_indices=material_indices,
+                                           materials=materials, cache=stiffness_cache.cache, dtype=dtype)
+    ABDs = laminate_batch.compute_ABD_from_Qt(Qts, thicknesses, dtype=dtype)
+    singular = np.asarray(thicknesses).sum(axis=1) == 0
+    ABDs[singular] = np.eye(6)
+    try:
+        exposure = load_cases.envelope_exposure_factors(ABDs, np.asarray(loads, dtype=dtype), deformation_limits)
+    except np.linalg.LinAlgError:
+        # Candidates are solved one at a time to find the singular ones
+        exposure = np.full((len(ABDs), len(deformation_limits)), np.inf)
+        for i, ABD in enumerate(ABDs):
+            try:
+                exposure[i] = load_cases.envelope_exposure_factors(ABD, np.asarray(loads, dtype=dtype),
+                                                                   deformation_limits)
+            except np.linalg.LinAlgError:
+                pass
+    max_exposure = exposure.max(axis=1).astype(np.float64)
+    max_exposure[singular] = np.inf
+    return max_exposure
+
+
+def screen_exposure(orientations: ndarray, thicknesses: ndarray, material_indices: ndarray, materials: list,
+                    load_case, deformation_limits: list, precision: str = "float32", tolerance: float = TOLERANCE,
+                    chunk_size: int = CHUNK_SIZE) -> tuple:
+    """
+    Screens a large sweep of candidate layups for feasibility against a load case, in chunks of "chunk_size"
+    candidates. With precision="float32", the ABD matrices and load case solves use half the memory bandwidth of
+    float64, and the candidates with a largest exposure factor within "tolerance" of 1 are re-evaluated in float64.
+    Feasibility is therefore the same as for a full float64 evaluation, as long as the float32 error is below the
+    tolerance. See "screening_memory" for the memory used per chunk.
+    :param orientations: Ply orientations in degrees with shape (N, P), padded with zero-thickness plies.
+    :param thicknesses: Ply thicknesses with shape (N, P).
+    :param material_indices: Indices into "materials" with shape (N, P).
+    :param materials: The material table. Materials on the format used in "matlib.py".
+    :param load_case: One or more load cases on one of the formats accepted by "load_cases.load_case_matrix".
+    :param deformation_limits: The deformation limits on the format used by "Laminate.calculate_exposure_factors".
+    :param precision: "float32" or "float64".
+    :param tolerance: The distance from an exposure factor of 1 where float32 results are re-evaluated.
+    :param chunk_size: The number of candidates evaluated at a time.
+    :return: The largest exposure factor of each candidate with shape (N,), where the float32 values are exact only to
+    the float32 precision except near 1, the feasibility of each candidate (all exposure factors below 1), and the
+    number of candidates re-evaluated in float64.
+    """
+    dtype = PRECISIONS[precision]
+    loads = load_cases.load_case_matrix(load_case)
+    n_candidates = len(orientations)
+    max_exposure = np.empty(n_candidates, np.float64)
+    n_reverified = 0
+    for start in range(0, n_candidates, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        chunk_exposure = max_exposure_factors(orientations[chunk], thicknesses[chunk], material_indices[chunk],
+                                              materials, loads, deformation_limits, dtype=dtype)
+        if dtype is not np.float64:
+            # Non-finite results are re-evaluated too, since a float32 ABD matrix can be singular where float64 is not
+            near = np.flatnonzero(~(np.abs(chunk_exposure - 1) > tolerance) | ~np.isfinite(chunk_exposure))
+            if len(near):
+                chunk_exposure[near] = max_exposure_factors(
+                    orientations[chunk][near], thicknesses[chunk][near], material_indices[chunk][near], materials,
+                    loads, deformation_limits, dtype=np.float64)
+                n_reverified += len(near)
+        max_exposure[chunk] = chunk_exposure
+    return max_exposure, max_exposure < 1, n_reverified
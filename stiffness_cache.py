@@ -0,0 +1,81 @@
+import laminatelib
+from numpy import ndarray
+
+from lru_cache import LRUCache
+
+# The material constants that the in-plane ply stiffness depends on
+STIFFNESS_KEYS = ("E1", "E2", "v12", "G12")
+# The kinds of matrices in the cache, the first element of every cache key
+KINDS = ("Q", "Qt", "Te")
+
+
+def material_key(material: dict) -> tuple:
+    """
+    Hashable key for the in-plane stiffness of a material. The key is built from the values rather than the identity
+    of the material, such that copies of the same material share cache entries.
+    :param material: A material on the format used in "matlib.py".
+    """
+    return tuple(float(material[key]) for key in STIFFNESS_KEYS)
+
+
+class StiffnessCache(LRUCache):
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        """
+        Bounded LRU cache for ply stiffness matrices, keyed by (material, orientation). Hits and misses are counted in
+        total and per kind of matrix ("Q", "Qt" and "Te"), where every lookup is counted under exactly one kind.
+        :param maxsize: The maximum number of matrices kept in the cache.
+        """
+        super().__init__(maxsize=maxsize)
+        self.kind_hits = dict.fromkeys(KINDS, 0)
+        self.kind_misses = dict.fromkeys(KINDS, 0)
+        pass
+
+    def _count(self, key: tuple, hit: bool) -> None:
+        super()._count(key, hit)
+        if hit:
+            self.kind_hits[key[0]] += 1
+        else:
+            self.kind_misses[key[0]] += 1
+        pass
+
+    def get_Q(self, material: dict) -> ndarray:
+        """
+        :return: The stiffness matrix of the material in the 1-2 coordinate system, as given by "laminatelib.Q2D".
+        """
+        return self.lookup(("Q", material_key(material)), lambda: laminatelib.Q2D(material))
+
+    def get_Qt(self, material: dict, orientation: float) -> ndarray:
+        """
+        :return: The stiffness matrix of the material rotated to the given orientation in degrees.
+        """
+        return self.lookup(("Qt", material_key(material), float(orientation)),
+                           lambda: laminatelib.Q2Dtransform(self._uncounted_Q(material), orientation))
+
+    def _uncounted_Q(self, material: dict) -> ndarray:
+        # A Qt miss reuses a cached Q without counting it as a Q lookup, so the Qt misses are the transformations
+        Q = self.peek(("Q", material_key(material)))
+        return Q if Q is not None else laminatelib.Q2D(material)
+
+    def get_Te(self, orientation: float) -> ndarray:
+        """
+        :return: The strain transformation matrix for the given orientation in degrees, as given by "laminatelib.T2De".
+        """
+        return self.lookup(("Te", float(orientation)), lambda: laminatelib.T2De(orientation))
+
+    def clear(self) -> None:
+        super().clear()
+        self.kind_hits = dict.fromkeys(KINDS, 0)
+        self.kind_misses = dict.fromkeys(KINDS, 0)
+        pass
+
+    def info(self) -> dict:
+        """
+        :return: The total hits and misses, the size of the cache and the hits and misses of each kind of matrix.
+        """
+        return dict(super().info(),
+                    kinds={kind: {"hits": self.kind_hits[kind], "misses": self.kind_misses[kind]} for kind in KINDS})
+
+
+# The cache shared by "Ply", "Laminate" and "OptimizedLaminate" within a process
+cache = StiffnessCache()
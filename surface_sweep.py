@@ -0,0 +1,123 @@
+import argparse
+
+import numpy as np
+
+import laminate_batch
+import matlib
+from Layup import Layup
+from lru_cache import LRUCache
+from Ply import Ply
+from stiffness_cache import material_key
+
+DIMENSION = 20
+DEVIATION_MIN = 50
+DEVIATION_MAX = 50
+
+
+class SweepCache(LRUCache):
+
+    def __init__(self, maxsize: int = 64) -> None:
+        """
+        Bounded LRU cache for the results of "deviation_grids" and the material grid invariants they are computed from.
+        :param maxsize: The maximum number of results kept in the cache.
+        """
+        super().__init__(maxsize=maxsize)
+        pass
+
+
+# The cache shared by all sweeps within a process
+cache = SweepCache()
+
+
+def deviation_axes(dimension: int = DIMENSION, deviation_min: float = DEVIATION_MIN,
+                   deviation_max: float = DEVIATION_MAX) -> tuple:
+    """
+    :return: The E2 and G12 deviations in % as meshgrids with shape (dimension, dimension).
+    """
+    deviations = np.linspace(-deviation_min, deviation_max, dimension)
+    return np.meshgrid(deviations, deviations)
+
+
+def grid_invariants(material: dict, dimension: int = DIMENSION, deviation_min: float = DEVIATION_MIN,
+                    deviation_max: float = DEVIATION_MAX, cache: SweepCache = cache) -> tuple:
+    """
+    The lamination invariants of the nominal material and of every cell in the E2/G12 grid. They are independent
+    of the layup and its orientation, and are therefore computed once per material and grid.
+    :return: The invariants of the nominal material with shape (5,), and of the grid with shape (DIM, DIM, 5).
+    """
+    def compute():
+        X, Y = deviation_axes(dimension, deviation_min, deviation_max)
+        Q0 = laminate_batch.Q2D_batch(E1=material["E1"], E2=material["E2"], v12=material["v12"], G12=material["G12"])
+        Qs = laminate_batch.Q2D_batch(E1=material["E1"], E2=material["E2"]*(1+X/100), v12=material["v12"],
+                                      G12=material["G12"]*(1+Y/100))
+        return laminate_batch.lamination_invariants(Q0), laminate_batch.lamination_invariants(Qs)
+
+    key = ("invariants", material_key(material), int(dimension), float(deviation_min), float(deviation_max))
+    return cache.lookup(key, compute)
+
+
+def deviation_grids(material: dict, layup: Layup | list[Ply], orientation: float = 0, dimension: int = DIMENSION,
+                    deviation_min: float = DEVIATION_MIN, deviation_max: float = DEVIATION_MAX,
+                    cache: SweepCache = cache) -> tuple:
+    """
+    The deviation in % of the effective laminate properties from their nominal values, over a grid of deviations of the
+    E2 and G12 of the material from their nominal values. Does not depend on matplotlib, and repeated calls with the
+    same inputs return the cached result without recomputation.
+    :param material: The nominal material of every ply, on the format used in "matlib.py". Only its in-plane stiffness
+    is used, the materials of the layup are ignored.
+    :param layup: The layup, of which only the orientations and thicknesses are used.
+    :param orientation: The orientation of the laminate in degrees, added to the orientation of every ply.
+    :param dimension: The number of grid points along each of the E2 and G12 axes.
+    :param deviation_min: The largest negative deviation of E2 and G12 in %.
+    :param deviation_max: The largest positive deviation of E2 and G12 in %.
+    :param cache: The cache to look the result up in and store it to.
+    :return: The read-only grids X (E2 deviation), Y (G12 deviation), Ex, Ey, Gxy and vxy, with shape
+    (dimension, dimension).
+    """
+    layup = Layup.from_plies(layup)
+
+    def compute():
+        # A change of orientation only changes the trigonometric weights, the invariants of the grid are reused
+        U0, Us = grid_invariants(material, dimension, deviation_min, deviation_max, cache=cache)
+        V = laminate_batch.trigonometric_weights(orientations=layup.orientations+orientation, weights=layup.thicknesses)
+        thickness = layup.thickness
+        nominal = laminate_batch.laminate_properties_batch(laminate_batch.stiffness_from_invariants(U0, V), thickness)
+        grids = laminate_batch.laminate_properties_batch(laminate_batch.stiffness_from_invariants(Us, V), thickness)
+        X, Y = deviation_axes(dimension, deviation_min, deviation_max)
+        return (X, Y) + tuple(100*(grid-value)/value for grid, value in zip(grids, nominal))
+
+    key = ("grids", material_key(material), layup.orientations.tobytes(), layup.thicknesses.tobytes(),
+           float(orientation), int(dimension), float(deviation_min), float(deviation_max))
+    return cache.lookup(key, compute)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes the deviation grids of a layup to a .npz file, without a "
+                                                 "display. See surface_sweep.deviation_grids")
+    parser.add_argument("output", help="The .npz file to write")
+    parser.add_argument("--material", default="E-glass/Epoxy", help="A material name in matlib.py")
+    parser.add_argument("--layup", type=float, nargs="+", default=[0, 90, 90, 0], help="The ply orientations")
+    parser.add_argument("--thickness", type=float, default=1, help="The thickness of every ply")
+    parser.add_argument("--orientations", type=float, nargs="+", default=[0], help="The laminate orientations")
+    parser.add_argument("--dimension", type=int, default=DIMENSION)
+    parser.add_argument("--deviation-min", type=float, default=DEVIATION_MIN)
+    parser.add_argument("--deviation-max", type=float, default=DEVIATION_MAX)
+    args = parser.parse_args()
+
+    material = matlib.get_material(args.material)
+    if material is False:
+        parser.error("Unknown material '{}'".format(args.material))
+    layup = Layup.uniform(material=material, orientations=args.layup, thickness=args.thickness)
+    arrays = {}
+    for orientation in args.orientations:
+        X, Y, Exs, Eys, Gxys, vxys = deviation_grids(material=material, layup=layup, orientation=orientation,
+                                                     dimension=args.dimension, deviation_min=args.deviation_min,
+                                                     deviation_max=args.deviation_max)
+        arrays.update({"{}_{:g}".format(name, orientation): grid
+                       for name, grid in zip(("Ex", "Ey", "Gxy", "vxy"), (Exs, Eys, Gxys, vxys))})
+    np.savez(args.output, E2=X, G12=Y, orientations=np.asarray(args.orientations), **arrays)
+    pass
+
+
+if __name__ == "__main__":
+    main()
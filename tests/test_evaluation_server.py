@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+import matlib
+from EvaluationServer import EvaluationServer, evaluate
+from Laminate import Laminate
+from Layup import Layup
+
+MATERIAL = matlib.get_material("Kevlar-49/Epoxy")
+ORIENTATIONS = [0, 45, -45, -45, 45, 0]
+LOAD_CASE = {"Nx": 600, "Nxy": 300}
+DEFORMATION_LIMITS = [0.005, None, 0.005]
+
+
+def request(i: int) -> dict:
+    return {"id": i, "layup": {"orientations": ORIENTATIONS, "thickness": 1 + i/10, "material": "Kevlar-49/Epoxy"},
+            "load_case": LOAD_CASE, "deformation_limits": DEFORMATION_LIMITS}
+
+
+async def run_requests(requests: list[dict]) -> list[dict]:
+    server = EvaluationServer(port=0)
+    await server.start()
+    try:
+        return await evaluate(requests, port=server.port)
+    finally:
+        await server.stop()
+
+
+def test_responses_match_laminate():
+    responses = asyncio.run(run_requests([request(i) for i in range(20)] + [{"id": "bad", "layup": {}}]))
+    assert [response["id"] for response in responses] == list(range(20)) + ["bad"]
+    assert "error" in responses[-1]
+    for i, response in enumerate(responses[:-1]):
+        laminate = Laminate(Layup.uniform(material=MATERIAL, orientations=ORIENTATIONS, thickness=1 + i/10), "")
+        assert response["thickness"] == pytest.approx(laminate.thickness)
+        expected = laminate.calculate_exposure_factors(load_case=LOAD_CASE, deformation_limits=DEFORMATION_LIMITS)
+        np.testing.assert_allclose(response["exposure_factors"], np.asarray(expected, float), rtol=1e-9)
+
+
+def test_full_queue_stops_reading_from_the_client():
+    async def run():
+        server = EvaluationServer(port=0, max_queue_size=4)
+        await server.start()
+        # Without the batcher nothing leaves the queue, so the server must stop reading once it is full
+        server._batcher.cancel()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write("".join(json.dumps(request(i)) + "\n" for i in range(100)).encode())
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        assert server.queue.qsize() == 4
+        assert server.max_queue_depth == 4
+        # No requests are read and held beyond the queue, which would each wait in a task for room in the queue
+        assert len(asyncio.all_tasks()) < 10
+
+        server._batcher = asyncio.create_task(server.batch_loop())
+        responses = [json.loads(await reader.readline()) for _ in range(100)]
+        assert [response["id"] for response in responses] == list(range(100))
+        assert server.max_queue_depth <= 4
+        writer.close()
+        await writer.wait_closed()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("layup", [{"orientations": [], "thicknesses": [], "material": "Kevlar-49/Epoxy"},
+                                   {"orientations": [0, 90], "thickness": 0, "material": "Kevlar-49/Epoxy"},
+                                   {"orientations": [0, 90], "thicknesses": [1, -1], "material": "Kevlar-49/Epoxy"},
+                                   {"orientations": [0, 90], "thicknesses": [1, float("nan")],
+                                    "material": "Kevlar-49/Epoxy"},
+                                   {"orientations": [0, 90], "thickness": 1, "materials": ["Kevlar-49/Epoxy"],
+                                    "material_indices": [0, 1]}])
+def test_invalid_layups_are_rejected_at_enqueue(layup):
+    async def run():
+        server = EvaluationServer(port=0)
+        await server.start()
+        # Rejected requests are answered without being queued
+        server._batcher.cancel()
+        response = await server.submit({"id": "bad", "layup": layup, "load_case": LOAD_CASE,
+                                        "deformation_limits": DEFORMATION_LIMITS})
+        assert server.queue.qsize() == 0
+        await server.stop()
+        return response
+
+    response = asyncio.run(run())
+    assert response["id"] == "bad"
+    assert "error" in response
+
+
+def test_responses_are_strict_json():
+    def reject_constant(name):
+        raise ValueError("Invalid JSON constant {}".format(name))
+
+    async def run():
+        server = EvaluationServer(port=0)
+        await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        empty = {"id": "empty", "layup": {"orientations": [], "thickness": 1, "material": "Kevlar-49/Epoxy"}}
+        requests = [request(0), empty, request(1)]
+        writer.write("".join(json.dumps(item) + "\n" for item in requests).encode())
+        await writer.drain()
+        lines = [await reader.readline() for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        await server.stop()
+        return lines
+
+    responses = [json.loads(line, parse_constant=reject_constant) for line in asyncio.run(run())]
+    assert [response["id"] for response in responses] == [0, "empty", 1]
+    assert "error" in responses[1]
+    assert "error" not in responses[0] and "error" not in responses[2]
@@ -0,0 +1,48 @@
+import numpy as np
+
+import laminatelib
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+
+MATERIAL = matlib.get_material("Kevlar-49/Epoxy")
+
+
+def kevlar_laminate() -> Laminate:
+    layup = Layup.uniform(material=MATERIAL, orientations=[0, 45, -45, -45, 45, 0], thickness=1)
+    return Laminate(layup=layup, name="Kevlar_Laminate")
+
+
+def reference_ABD(layup: Layup) -> np.ndarray:
+    ABD = np.zeros((6, 6))
+    z_bot = -layup.thickness/2
+    for ply in layup:
+        Qt = laminatelib.Q2Dtransform(laminatelib.Q2D(ply.material), ply.orientation)
+        z_top = z_bot + ply.thickness
+        ABD[0:3, 0:3] += Qt*(z_top - z_bot)
+        ABD[0:3, 3:6] += Qt*(z_top**2 - z_bot**2)/2
+        ABD[3:6, 3:6] += Qt*(z_top**3 - z_bot**3)/3
+        z_bot = z_top
+    ABD[3:6, 0:3] = ABD[0:3, 3:6]
+    return ABD
+
+
+def test_ABD_matches_reference():
+    laminate = kevlar_laminate()
+    np.testing.assert_allclose(laminate.compute_ABD(), reference_ABD(laminate.layup), rtol=1e-12, atol=1e-6)
+
+
+def test_compute_ABD_returns_a_writable_copy():
+    laminate = kevlar_laminate()
+    ABD = laminate.compute_ABD()
+    expected = ABD.copy()
+    ABD[0, 0] = 0
+    np.testing.assert_array_equal(laminate.compute_ABD(), expected)
+
+
+def test_exposure_factors_are_unchanged_by_the_cache():
+    laminate = kevlar_laminate()
+    load_case = {"Nx": 600, "Nxy": 300}
+    first = laminate.calculate_exposure_factors(load_case=load_case, deformation_limits=[0.005, None, 0.005])
+    second = laminate.calculate_exposure_factors(load_case=load_case, deformation_limits=[0.005, None, 0.005])
+    assert first == second
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import matlib
+from Laminate import Laminate
+from LaminationParameters import LaminationParameters
+from Ply import Ply
+
+MATERIAL = matlib.get("Kevlar-49/Epoxy")
+ORIENTATIONS = [0, 45, -45, 90, 30, -60]
+THICKNESSES = [0.1, 0.2, 0.15, 0.3, 0.25, 0.05]
+
+
+def laminate_ABD(orientations: list, thicknesses: list) -> np.ndarray:
+    layup = [Ply(material=MATERIAL, orientation=orientation, thickness=thickness)
+             for orientation, thickness in zip(orientations, thicknesses)]
+    return Laminate(layup=layup, name="reference").compute_ABD()
+
+
+def test_construction_matches_laminate():
+    parameters = LaminationParameters(MATERIAL, ORIENTATIONS, THICKNESSES)
+    np.testing.assert_allclose(parameters.compute_ABD(), laminate_ABD(ORIENTATIONS, THICKNESSES), atol=1e-6)
+
+
+@pytest.mark.parametrize("index", [0, 2, 5, -1, -2, -6])
+def test_remove_ply_matches_laminate(index):
+    parameters = LaminationParameters(MATERIAL, ORIENTATIONS, THICKNESSES)
+    removed = parameters.remove_ply(index)
+    assert removed == (ORIENTATIONS[index], THICKNESSES[index])
+    orientations, thicknesses = list(ORIENTATIONS), list(THICKNESSES)
+    del orientations[index], thicknesses[index]
+    np.testing.assert_allclose(parameters.compute_ABD(), laminate_ABD(orientations, thicknesses), atol=1e-6)
+
+
+@pytest.mark.parametrize("index", [6, -7])
+def test_remove_ply_out_of_range(index):
+    parameters = LaminationParameters(MATERIAL, ORIENTATIONS, THICKNESSES)
+    with pytest.raises(IndexError):
+        parameters.remove_ply(index)
+
+
+def test_reorient_ply_matches_laminate():
+    parameters = LaminationParameters(MATERIAL, ORIENTATIONS, THICKNESSES)
+    parameters.reorient_ply(1, 60)
+    orientations = list(ORIENTATIONS)
+    orientations[1] = 60
+    np.testing.assert_allclose(parameters.compute_ABD(), laminate_ABD(orientations, THICKNESSES), atol=1e-6)
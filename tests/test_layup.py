@@ -0,0 +1,40 @@
+import numpy as np
+
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from Ply import Ply
+
+KEVLAR = matlib.get("Kevlar-49/Epoxy")
+CARBON = matlib.get("Carbon/Epoxy(a)")
+PLIES = [Ply(material=KEVLAR, orientation=0, thickness=0.1), Ply(material=CARBON, orientation=45, thickness=0.2),
+         Ply(material=KEVLAR, orientation=-45, thickness=0.3)]
+
+
+def test_from_plies_round_trip():
+    layup = Layup.from_plies(PLIES)
+    assert len(layup.materials) == 2
+    assert [(ply.material["name"], ply.orientation, ply.thickness) for ply in layup] == \
+        [(ply.material["name"], ply.orientation, ply.thickness) for ply in PLIES]
+    assert layup.thickness == sum(ply.thickness for ply in PLIES)
+
+
+def test_slices_share_the_arrays():
+    layup = Layup.from_plies(PLIES)
+    assert np.shares_memory(layup[1:].orientations, layup.orientations)
+    assert all(sliced is original for sliced, original in zip(layup[1:].materials, layup.materials))
+
+
+def test_mirrored_remove_and_symmetry():
+    layup = Layup.from_plies(PLIES).mirrored()
+    assert len(layup) == 6
+    assert layup.is_symmetric()
+    removed = layup.remove(layup.orientations == 45)
+    assert removed.orientations.tolist() == [0, -45, -45, 0]
+    assert removed.is_symmetric()
+    assert not layup[:4].is_symmetric()
+
+
+def test_laminate_from_layup_matches_list_of_plies():
+    np.testing.assert_allclose(Laminate(layup=Layup.from_plies(PLIES), name="layup").compute_ABD(),
+                               Laminate(layup=PLIES, name="plies").compute_ABD())
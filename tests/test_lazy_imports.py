@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that are only imported when plotting or starting worker processes
+LAZY_MODULES = ["matplotlib", "concurrent.futures.process"]
+
+
+@pytest.mark.parametrize("module", ["Ply", "Laminate", "OptimizedLaminate", "PlyStripSearch", "MaterialScatter",
+                                    "surface_sweep", "main", "cli"])
+def test_import_does_not_load_plotting_or_process_pools(module):
+    # Every import is checked in a fresh interpreter, as the tests themselves may already have imported the modules
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(filter(None, [REPOSITORY, environment.get("PYTHONPATH")]))
+    script = "import sys; import {}; print(sorted(set({!r}) & set(sys.modules)))".format(module, LAZY_MODULES)
+    output = subprocess.run([sys.executable, "-c", script], cwd=REPOSITORY, env=environment, check=True,
+                            capture_output=True, text=True).stdout
+    assert output.splitlines()[-1] == "[]"
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import load_cases
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from OptimizedLaminate import OptimizedLaminate
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+DEFORMATION_LIMITS = [0.005, None, 0.005]
+LOAD_CASE = {"Nx": 600, "Nxy": 300}
+REVERSED_LOAD_CASES = [{"Nx": 60, "Nxy": 30}, {"Nx": -600, "Nxy": -300}]
+
+
+def kevlar_laminate(thickness: float) -> Laminate:
+    layup = Layup.uniform(material=KEVLAR, orientations=[0, 45, -45, -45, 45, 0], thickness=thickness)
+    return Laminate(layup=layup, name="Kevlar_Laminate")
+
+
+def test_reversed_load_case_governs_the_envelope():
+    laminate = kevlar_laminate(0.1)
+    envelope = laminate.calculate_exposure_factors(REVERSED_LOAD_CASES, DEFORMATION_LIMITS)
+    reversed_case = laminate.calculate_exposure_factors({"Nx": -600, "Nxy": -300}, DEFORMATION_LIMITS)
+    np.testing.assert_allclose(envelope, reversed_case)
+    np.testing.assert_allclose(envelope, laminate.calculate_exposure_factors(LOAD_CASE, DEFORMATION_LIMITS))
+    assert envelope[0] > 1 and envelope[2] > 1
+
+
+def test_exposure_factors_are_magnitudes():
+    deformations = np.array([[0.002, 0.1, -0.004, 0, 0, 0], [-0.003, 0.1, 0.001, 0, 0, 0]])
+    np.testing.assert_allclose(load_cases.exposure_factors(deformations, DEFORMATION_LIMITS),
+                               [[0.4, 0, 0.8], [0.6, 0, 0.2]])
+
+
+@pytest.mark.parametrize("search", ["branch_and_bound", "exhaustive"])
+def test_optimizer_keeps_the_plies_reversed_load_cases_need(search):
+    laminate = kevlar_laminate(1)
+    envelope = OptimizedLaminate(laminate, 0.1, REVERSED_LOAD_CASES, DEFORMATION_LIMITS, search=search)
+    reference = OptimizedLaminate(laminate, 0.1, LOAD_CASE, DEFORMATION_LIMITS, search=search)
+    assert max(envelope.calculate_exposure_factors(REVERSED_LOAD_CASES, DEFORMATION_LIMITS)) < 1
+    assert envelope.thickness == pytest.approx(reference.thickness)
+    assert envelope.layup.orientations.tolist() == reference.layup.orientations.tolist()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import load_history
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from load_cases import LOAD_KEYS
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+DEFORMATION_LIMITS = [0.005, None, 0.005]
+
+
+@pytest.fixture
+def laminate():
+    layup = Layup.uniform(material=KEVLAR, orientations=[0, 45, -45, -45, 45, 0], thickness=0.5)
+    return Laminate(layup=layup, name="Kevlar_Laminate")
+
+
+def load_steps(n_steps: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    loads = np.zeros((n_steps, len(LOAD_KEYS)))
+    loads[:, [0, 2]] = rng.uniform(-200, 200, (n_steps, 2))
+    return loads
+
+
+def test_csv_with_header(tmp_path):
+    path = tmp_path/"history.csv"
+    path.write_text("Nxy,Nx\n1,2\n3,4\n5,6\n")
+    loads = np.concatenate(list(load_history.read_load_chunks(str(path), chunk_size=2)))
+    expected = np.zeros((3, 6))
+    expected[:, 0] = [2, 4, 6]
+    expected[:, 2] = [1, 3, 5]
+    np.testing.assert_array_equal(loads, expected)
+
+
+def test_csv_without_header(tmp_path):
+    path = tmp_path/"history.txt"
+    path.write_text("1,2,3,4,5,6\n7,8,9,10,11,12\n")
+    loads = np.concatenate(list(load_history.read_load_chunks(str(path))))
+    np.testing.assert_array_equal(loads, np.arange(1, 13).reshape(2, 6))
+
+
+def test_csv_with_unknown_header(tmp_path):
+    path = tmp_path/"history.csv"
+    path.write_text("Nx,Fz\n1,2\n")
+    with pytest.raises(ValueError):
+        list(load_history.read_load_chunks(str(path)))
+
+
+def test_empty_csv_has_no_time_steps(tmp_path):
+    path = tmp_path/"history.csv"
+    path.write_text("")
+    assert list(load_history.read_load_chunks(str(path))) == []
+    path.write_text("Nx,Ny,Nxy\n")
+    assert list(load_history.read_load_chunks(str(path))) == []
+
+
+def test_npy_is_memory_mapped(tmp_path):
+    path = str(tmp_path/"history.npy")
+    loads = load_steps(10)
+    np.save(path, loads)
+    chunks = list(load_history.read_load_chunks(path, chunk_size=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate(chunks), loads)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_raw_binary_is_memory_mapped(tmp_path, dtype):
+    path = str(tmp_path/"history.bin")
+    loads = load_steps(10).astype(dtype)
+    loads.tofile(path)
+    chunks = list(load_history.read_load_chunks(path, chunk_size=3, dtype=dtype))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    np.testing.assert_array_equal(np.concatenate(chunks), loads)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+def test_summary_does_not_depend_on_the_chunk_boundaries(laminate, chunk_size):
+    loads = load_steps(200)
+    # A compressive excursion beyond the limits, which governs both exposure factors
+    loads[150, [0, 2]] = [-1000, -1000]
+    summary = laminate.calculate_exposure_history(loads, DEFORMATION_LIMITS, chunk_size=chunk_size)
+    exposure = np.array([laminate.calculate_exposure_factors(dict(zip(LOAD_KEYS, step)), DEFORMATION_LIMITS)
+                         for step in loads])
+    assert summary.n_steps == len(loads)
+    np.testing.assert_allclose(summary.exposure_factors, exposure.max(axis=0))
+    np.testing.assert_array_equal(summary.argmax[[0, 2]], [150, 150])
+    np.testing.assert_array_equal(summary.exceedances, (exposure >= 1).sum(axis=0))
+    assert summary.any_exceedances == int((exposure >= 1).any(axis=1).sum())
+    assert summary.exceedances[0] >= 1
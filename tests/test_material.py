@@ -0,0 +1,57 @@
+import copy
+import pickle
+
+import pytest
+
+import matlib
+from Material import Material, freeze
+
+
+def test_material_reads_like_its_dict():
+    card = matlib.get("Kevlar-49/Epoxy")
+    material = Material(card)
+    assert material == card
+    assert material["E1"] == card["E1"]
+    assert copy.deepcopy(material) is material
+    assert pickle.loads(pickle.dumps(material)) == material
+
+
+def test_material_is_immutable():
+    material = matlib.get_material("Kevlar-49/Epoxy")
+    with pytest.raises(AttributeError):
+        material.E1 = 1
+    changed = material.replace(E2=2*material["E2"])
+    assert changed["E2"] == 2*material["E2"]
+    assert changed != material
+
+
+def test_material_with_nested_properties():
+    card = dict(matlib.get("Kevlar-49/Epoxy"), custom=[1, 2], notes={"source": ["a", "b"]})
+    material = Material(card)
+    assert material["custom"] == [1, 2]
+    assert hash(material) == hash(Material(dict(card)))
+    assert material == Material(dict(card))
+    assert hash(material) != hash(Material(card, custom=[2, 1]))
+
+
+def test_freeze_is_order_independent_for_mappings():
+    assert freeze({"a": 1, "b": [1, {"c": 2}]}) == freeze({"b": [1, {"c": 2}], "a": 1})
+    hash(freeze({"a": {1, 2}, "b": ([1], {"c": [3]})}))
+
+
+def test_matlib_name_index():
+    for card in matlib.materials:
+        assert matlib.get(card["name"]) is card
+        assert matlib.get_material(card["name"]) is matlib.get_material(card["name"])
+        assert matlib.get_material(card["name"]) == card
+    assert matlib.get("Unobtainium") is False
+    assert matlib.get_material("Unobtainium") is False
+    # A material added to the list is found by name
+    card = dict(matlib.get("Kevlar-49/Epoxy"), name="Kevlar-49/Epoxy(b)", E2=5500)
+    matlib.materials.append(card)
+    try:
+        assert matlib.get("Kevlar-49/Epoxy(b)") is card
+        assert matlib.get_material("Kevlar-49/Epoxy(b)")["E2"] == 5500
+    finally:
+        matlib.materials.remove(card)
+    assert matlib.get("Kevlar-49/Epoxy(b)") is False
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import laminatelib
+import matlib
+from Material import Material
+from MaterialDatabase import MaterialDatabase
+
+
+@pytest.fixture
+def database():
+    database = MaterialDatabase.from_matlib()
+    yield database
+    database.close()
+
+
+def test_get_round_trip(database):
+    for card in matlib.materials:
+        material = database.get(card["name"])
+        assert isinstance(material, Material)
+        assert material == card
+    assert database.get("Unobtainium") is False
+    assert len(database) == len(matlib.materials)
+
+
+def test_nested_extras_round_trip(database, tmp_path):
+    card = dict(matlib.get("Kevlar-49/Epoxy"), name="Custom Kevlar", custom=[1, 2], notes={"source": ["a", "b"]})
+    database.add(card)
+    assert database.get("Custom Kevlar") == card
+    assert [material["name"] for material in database.query(fiber="Kevlar-49")] == ["Custom Kevlar",
+                                                                                     "Kevlar-49/Epoxy"]
+    path = str(tmp_path/"materials.db")
+    database.save(path)
+    loaded = MaterialDatabase.load(path)
+    assert loaded.get("Custom Kevlar") == card
+    loaded.close()
+
+
+def test_loading_a_missing_file(tmp_path):
+    path = tmp_path/"missing.db"
+    with pytest.raises(FileNotFoundError):
+        MaterialDatabase.load(str(path))
+    assert not path.exists()
+
+
+def test_unserializable_extras_are_rejected(database):
+    card = dict(matlib.get("Kevlar-49/Epoxy"), name="Custom Kevlar", custom=object())
+    with pytest.raises(ValueError):
+        database.add(card)
+    assert "Custom Kevlar" not in database
+
+
+def test_replacing_a_material(database):
+    card = matlib.get("Kevlar-49/Epoxy")
+    assert database.get(card["name"])["E2"] == card["E2"]
+    database.add(dict(card, E2=2*card["E2"]))
+    assert database.get(card["name"])["E2"] == 2*card["E2"]
+
+
+def test_query(database):
+    names = [material["name"] for material in database.query(fiber="Carbon", E1__gt=100000)]
+    assert names == ["Carbon/Epoxy(a)"]
+    assert len(database.query(Vf__ge=0.55)) == len(matlib.materials)
+    with pytest.raises(ValueError):
+        database.query(E1__ne=1)
+
+
+def test_derived_matrices(database):
+    card = matlib.get("E-glass/Epoxy")
+    np.testing.assert_allclose(database.derived(card["name"], "Q2D"), laminatelib.Q2D(card))
+    np.testing.assert_allclose(database.derived(card["name"], "S3D"), laminatelib.S3D(card))
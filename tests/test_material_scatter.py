@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from MaterialScatter import MaterialScatter, QuantileSketch, StreamingStatistics
+
+MATERIAL = matlib.get_material("Kevlar-49/Epoxy")
+ORIENTATIONS = [0, 45, -45, -45, 45, 0]
+LOAD_CASE = {"Nx": 600, "Nxy": 300}
+DEFORMATION_LIMITS = [0.005, None, 0.005]
+DISTRIBUTIONS = {"E1": ("normal", 0.03), "E2": ("normal", 0.05), "v12": ("uniform", 0.1), "G12": ("lognormal", 0.08)}
+QUANTILES = [0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1]
+
+
+def kevlar_scatter() -> MaterialScatter:
+    layup = Layup.uniform(material=MATERIAL, orientations=ORIENTATIONS, thickness=1)
+    return MaterialScatter(material=MATERIAL, layup=layup, distributions=DISTRIBUTIONS, load_case=LOAD_CASE,
+                           deformation_limits=DEFORMATION_LIMITS)
+
+
+@pytest.mark.parametrize("values", [np.random.default_rng(0).lognormal(0, 2, 10001),
+                                    np.random.default_rng(1).normal(0, 1, 5000),
+                                    np.concatenate([np.zeros(100), np.random.default_rng(2).uniform(-5, 5, 999)])])
+def test_sketch_quantiles_within_relative_accuracy(values):
+    sketch = QuantileSketch(relative_accuracy=0.001)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+    expected = np.quantile(values, QUANTILES, method="lower")
+    np.testing.assert_allclose(sketch.quantile(QUANTILES), expected, rtol=0.001, atol=0)
+
+
+def test_merged_statistics_match_numpy():
+    values = np.random.default_rng(3).normal(10, 2, 20000)
+    statistics = StreamingStatistics()
+    for chunk in np.array_split(values, 9):
+        chunk_statistics = StreamingStatistics()
+        chunk_statistics.update(chunk)
+        statistics.merge(chunk_statistics)
+    assert statistics.count == len(values)
+    assert statistics.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert statistics.variance == pytest.approx(values.var(ddof=1), rel=1e-9)
+    assert (statistics.minimum, statistics.maximum) == (values.min(), values.max())
+
+
+def test_evaluate_matches_laminate():
+    scatter = kevlar_scatter()
+    samples = scatter.sample(5, np.random.default_rng(4))
+    outputs, admissible = scatter.evaluate(samples)
+    assert admissible.all()
+    for i in range(5):
+        material = MATERIAL.replace(**{key: float(values[i]) for key, values in samples.items()})
+        laminate = Laminate(Layup.uniform(material=material, orientations=ORIENTATIONS, thickness=1), "")
+        properties = laminate.calculate_laminate_properties()
+        np.testing.assert_allclose([outputs[name][i] for name in ("Ex", "Ey", "Gxy", "vxy")], properties, rtol=1e-9)
+        exposure = laminate.calculate_exposure_factors(load_case=LOAD_CASE, deformation_limits=DEFORMATION_LIMITS)
+        assert outputs["max_exposure"][i] == pytest.approx(max(exposure), rel=1e-9)
+
+
+def test_singular_realization_does_not_reject_its_chunk():
+    # Without transverse stiffness, the unidirectional laminate of the second realization is singular
+    layup = Layup.uniform(material=MATERIAL, orientations=[0, 0, 0, 0], thickness=1)
+    scatter = MaterialScatter(material=MATERIAL, layup=layup, distributions={}, load_case=LOAD_CASE,
+                              deformation_limits=DEFORMATION_LIMITS)
+    samples = {"E1": np.array([73000, 73000, 70000]), "E2": np.array([5000, 1e-320, 5500]),
+               "v12": np.array([0.35, 0, 0.3]), "G12": np.array([2200, 1e-320, 2000])}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        outputs, admissible = scatter.evaluate(samples)
+    np.testing.assert_array_equal(admissible, [True, False, True])
+    assert outputs["max_exposure"][1] == np.inf
+    regular, _ = scatter.evaluate({key: values[[0, 2]] for key, values in samples.items()})
+    np.testing.assert_allclose(outputs["max_exposure"][[0, 2]], regular["max_exposure"], rtol=1e-12)
+
+
+def test_run_is_independent_of_the_workers():
+    scatter = kevlar_scatter()
+    serial = scatter.run(n_samples=50000, seed=5, chunk_size=8192)
+    parallel = scatter.run(n_samples=50000, seed=5, chunk_size=8192, workers=2)
+    assert (serial.n_samples, serial.n_rejected) == (parallel.n_samples, parallel.n_rejected)
+    for name in scatter.outputs:
+        assert serial[name].summary() == parallel[name].summary()
+    assert scatter.run(n_samples=50000, seed=6, chunk_size=8192)["Ex"].mean != serial["Ex"].mean
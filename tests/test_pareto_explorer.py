@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from OptimizedLaminate import OptimizedLaminate
+from ParetoExplorer import CandidateStore, ParetoExplorer, ParetoFront
+
+MATERIAL = matlib.get_material("Kevlar-49/Epoxy")
+
+
+def brute_force_front(values: np.ndarray, senses: list[str]) -> set:
+    minimized = values*np.array([1 if sense == "min" else -1 for sense in senses])
+    front = set()
+    for i, point in enumerate(minimized):
+        if not any((other <= point).all() and (other < point).any() for other in minimized):
+            front.add(i)
+    return front
+
+
+@pytest.mark.parametrize("senses", [["min", "min"], ["min", "max", "max"], ["max", "min", "max", "min"]])
+def test_insert_matches_brute_force(senses):
+    rng = np.random.default_rng(len(senses))
+    # Rounded values give ties and duplicate points
+    values = np.round(rng.random((600, len(senses))), 1)
+    front = ParetoFront(senses)
+    for ids in np.array_split(np.arange(len(values)), 11):
+        front.insert(ids, values[ids])
+    assert set(front.ids.tolist()) == brute_force_front(values, senses)
+
+
+def test_insert_empty_batch():
+    front = ParetoFront(["min", "max"])
+    front.insert(np.zeros(0, int), np.zeros((0, 2)))
+    assert len(front) == 0
+
+
+def test_candidate_store_round_trip():
+    layup = Layup.uniform(material=MATERIAL, orientations=[0, 45, -45, 90]*3, thickness=0.1)
+    store = CandidateStore(layup, n_exposure_factors=3, capacity=2)
+    rng = np.random.default_rng(0)
+    masks = rng.random((10, len(layup))) < 0.5
+    columns = {name: rng.random(10) for name in ("thickness", "mass", "Ex", "Ey", "Gxy", "vxy", "max_exposure",
+                                                 "strength_exposure")}
+    columns.update(feasible=rng.random(10) < 0.5, exposure_factors=rng.random((10, 3)))
+    ids = store.append(masks, columns)
+    assert ids.tolist() == list(range(10)) and len(store) == 10
+    for i in ids:
+        np.testing.assert_array_equal(store.mask(i), masks[i])
+        assert store.layup(i).orientations.tolist() == layup.orientations[masks[i]].tolist()
+    np.testing.assert_array_equal(store.column("Ex"), columns["Ex"])
+    np.testing.assert_array_equal(store.column("exposure_factors"), columns["exposure_factors"])
+
+
+def test_explorer_front_of_an_optimization():
+    laminate = Laminate(Layup.uniform(material=MATERIAL, orientations=[0, 45, -45, -45, 45, 0], thickness=1), "")
+    objectives = (("mass", "min"), ("Ex", "max"), ("max_exposure", "min"))
+    explorer = ParetoExplorer(objectives=objectives)
+    optimized = OptimizedLaminate(laminate, 0.1, {"Nx": 600, "Nxy": 300}, [0.005, None, 0.005], explorer=explorer)
+    store = explorer.store
+    feasible = np.flatnonzero(store.column("feasible"))
+    values = np.stack([store.column(column)[feasible] for column, _ in objectives], axis=1)
+    expected = set(feasible[list(brute_force_front(values, [sense for _, sense in objectives]))].tolist())
+    assert set(explorer.front().tolist()) == expected
+    # The optimum is the lightest feasible candidate, which is always on the front
+    assert optimized.thickness == pytest.approx(store.column("thickness")[explorer.front()[0]])
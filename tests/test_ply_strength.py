@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import laminatelib
+import matlib
+import ply_strength
+import stiffness_cache
+from Laminate import Laminate
+from Layup import Layup
+from OptimizedLaminate import OptimizedLaminate
+
+E_GLASS = matlib.get_material("E-glass/Epoxy")
+ORIENTATIONS = [0, 45, -45, 90, 90, -45, 45, 0]
+LOAD_CASES = [{"Nx": 400, "Ny": 100, "Nxy": 50}, {"Nx": -300, "Mx": 20}, {"Ny": 150, "Mxy": -10}]
+
+
+def reference_exposure(s1, s2, t12, material) -> tuple:
+    # The maximum stress and Tsai-Wu exposure factors of one stress state, written out per term
+    XT, XC, YT, YC, S12, f12 = (material[key] for key in ply_strength.STRENGTH_KEYS)
+    max_stress = max(s1/XT if s1 >= 0 else -s1/XC, s2/YT if s2 >= 0 else -s2/YC, abs(t12)/S12)
+    F11, F22 = 1/(XT*XC), 1/(YT*YC)
+    a = F11*s1**2 + F22*s2**2 + t12**2/S12**2 + 2*f12*np.sqrt(F11*F22)*s1*s2
+    b = (1/XT - 1/XC)*s1 + (1/YT - 1/YC)*s2
+    return max_stress, (b + np.sqrt(b**2 + 4*a))/2
+
+
+@pytest.mark.parametrize("load_case", LOAD_CASES)
+def test_strength_exposure_matches_per_ply_reference(load_case):
+    laminate = Laminate(Layup.uniform(material=E_GLASS, orientations=ORIENTATIONS, thickness=0.5), name="laminate")
+    stresses = laminate.calculate_ply_stresses(load_case)
+    max_stress, tsai_wu = laminate.calculate_strength_exposure_factors(load_case)
+    assert stresses.shape == (1, len(ORIENTATIONS), 2, 3)
+    assert max_stress.shape == tsai_wu.shape == (1, len(ORIENTATIONS), 2)
+    _, deformations = laminatelib.solveLaminateLoadCase(laminate.compute_ABD(), **load_case)
+    Q = laminatelib.Q2D(E_GLASS)
+    z = -laminate.thickness/2
+    for index, orientation in enumerate(ORIENTATIONS):
+        for position, height in enumerate((z, z + 0.5)):
+            strains = deformations[0:3] + height*deformations[3:6]
+            reference = Q @ laminatelib.T2De(orientation) @ strains
+            np.testing.assert_allclose(stresses[0, index, position], reference, rtol=1e-9, atol=1e-9)
+            reference_max_stress, reference_tsai_wu = reference_exposure(*reference, E_GLASS)
+            assert max_stress[0, index, position] == pytest.approx(reference_max_stress, rel=1e-9)
+            assert tsai_wu[0, index, position] == pytest.approx(reference_tsai_wu, rel=1e-9)
+        z += 0.5
+
+
+def test_multiple_load_cases_match_single_load_cases():
+    laminate = Laminate(Layup.uniform(material=E_GLASS, orientations=ORIENTATIONS, thickness=0.5), name="laminate")
+    together = laminate.calculate_strength_exposure_factors(LOAD_CASES)
+    for index, load_case in enumerate(LOAD_CASES):
+        for criterion, alone in zip(together, laminate.calculate_strength_exposure_factors(load_case)):
+            np.testing.assert_allclose(criterion[index], alone[0], rtol=1e-12)
+
+
+def test_ply_stresses_with_removed_plies():
+    # Plies removed by a zero thickness must not shift the positions of the remaining plies
+    layup = Layup.uniform(material=E_GLASS, orientations=ORIENTATIONS, thickness=0.5)
+    thicknesses = np.array([0.5, 0, 0.5, 0.5, 0.5, 0.5, 0, 0.5])
+    kept = thicknesses > 0
+    reduced = Laminate(Layup(orientations=layup.orientations[kept], thicknesses=thicknesses[kept],
+                             material_indices=layup.material_indices[kept], materials=layup.materials),
+                       name="reduced")
+    deformations = np.array([[1e-3, -2e-4, 5e-4, 2e-3, -1e-3, 5e-4]])
+    stress_matrices = ply_strength.ply_stress_matrices(layup.orientations, layup.material_indices,
+                                                       layup.materials, cache=stiffness_cache.cache)
+    masked = ply_strength.ply_stresses(deformations, stress_matrices, thicknesses)
+    expected = ply_strength.ply_stresses(deformations, stress_matrices[kept], thicknesses[kept])
+    np.testing.assert_allclose(masked[:, kept], expected, rtol=1e-12)
+    # The reduced laminate gives the same stresses for the deformations it is subjected to
+    load_case = {"Nx": 200, "Mx": 10}
+    _, reduced_deformations = laminatelib.solveLaminateLoadCase(reduced.compute_ABD(), **load_case)
+    masked = ply_strength.ply_stresses(reduced_deformations[None], stress_matrices, thicknesses)
+    np.testing.assert_allclose(masked[:, kept], reduced.calculate_ply_stresses(load_case), rtol=1e-9, atol=1e-9)
+    # The removed plies are ignored by the largest exposure factor
+    strengths = ply_strength.strength_table(layup.materials)[layup.material_indices]
+    largest = ply_strength.max_criterion_exposure(reduced_deformations[None], stress_matrices, thicknesses[None],
+                                                  strengths, "tsai_wu")
+    assert largest[0] == pytest.approx(reduced.calculate_strength_exposure_factors(load_case)[1].max(), rel=1e-9)
+
+
+def test_unknown_criterion_and_missing_strength_data():
+    with pytest.raises(ValueError):
+        ply_strength.criterion_exposure(np.zeros((1, 1, 2, 3)), np.ones((1, 6)), "von_mises")
+    with pytest.raises(ValueError):
+        ply_strength.strength_table([{"XT": 1000}])
+
+
+@pytest.mark.parametrize("criterion", ply_strength.CRITERIA)
+def test_optimization_with_active_strength_constraint(criterion):
+    # The strength of the plies, not the deformation limits, decides the thickness
+    laminate = Laminate(Layup.uniform(material=E_GLASS, orientations=ORIENTATIONS, thickness=1), name="laminate")
+    load_case, deformation_limits = LOAD_CASES[0], [0.01, 0.01, 0.02]
+    deformation_only = OptimizedLaminate(laminate, 0.1, load_case, deformation_limits)
+    optimized = OptimizedLaminate(laminate, 0.1, load_case, deformation_limits, strength_criterion=criterion)
+    index = ply_strength.CRITERIA.index(criterion)
+    assert deformation_only.calculate_strength_exposure_factors(load_case)[index].max() > 1
+    assert optimized.calculate_strength_exposure_factors(load_case)[index].max() <= 1
+    assert max(optimized.calculate_exposure_factors(load_case, deformation_limits)) < 1
+    assert optimized.thickness > deformation_only.thickness
+    with pytest.raises(ValueError):
+        OptimizedLaminate(laminate, 0.1, load_case, deformation_limits, strength_criterion="von_mises")
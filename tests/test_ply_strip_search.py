@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from OptimizedLaminate import OptimizedLaminate
+from Ply import Ply
+from PlyStripSearch import PlyStripSearch
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+CARBON = matlib.get_material("Carbon/Epoxy(a)")
+LOAD_CASE = {"Nx": 600, "Nxy": 300}
+DEFORMATION_LIMITS = [0.005, None, 0.02]
+ORIENTATIONS = [0, 45, -45]
+
+
+def rough_layup(material) -> Layup:
+    # The rough optimized layup of the Kevlar example, with 0.1 mm plies
+    half = np.repeat(ORIENTATIONS, [6, 5, 5])
+    return Layup.uniform(material=material, orientations=np.concatenate([half, half[::-1]]), thickness=0.1)
+
+
+def strip_search(material) -> PlyStripSearch:
+    return PlyStripSearch(rough_layup(material), ORIENTATIONS, LOAD_CASE, DEFORMATION_LIMITS)
+
+
+@pytest.mark.parametrize("material_name, orientations, load_case, deformation_limits, thickness", [
+    ("Kevlar-49/Epoxy", [0, 45, -45, -45, 45, 0], {"Nx": 600, "Nxy": 300}, [0.005, None, 0.005], 1),
+    ("Carbon/Epoxy(a)", [0, 90, 45, -45, -45, 45, 90, 0], {"Nx": 300, "Ny": 200, "Nxy": 100}, [0.002, 0.003, 0.004],
+     0.5),
+    ("E-glass/Epoxy", [90, 0, 30, -30, -30, 30, 0, 90], {"Nx": 300, "Mx": 50}, [0.004, None, None, 0.01], 0.5)])
+def test_branch_and_bound_matches_exhaustive(material_name, orientations, load_case, deformation_limits, thickness):
+    layup = [Ply(material=matlib.get(material_name), orientation=orientation, thickness=thickness)
+             for orientation in orientations]
+    laminate = Laminate(layup=layup, name="laminate")
+    exhaustive = OptimizedLaminate(laminate, 0.1, load_case, deformation_limits, search="exhaustive")
+    branch_and_bound = OptimizedLaminate(laminate, 0.1, load_case, deformation_limits)
+    assert [ply.orientation for ply in branch_and_bound.layup] == [ply.orientation for ply in exhaustive.layup]
+    assert branch_and_bound.thickness == pytest.approx(exhaustive.thickness)
+
+
+def test_workers_match_depth_first():
+    layup = [Ply(material=matlib.get("Kevlar-49/Epoxy"), orientation=orientation, thickness=1)
+             for orientation in [0, 45, -45, -45, 45, 0]]
+    laminate = Laminate(layup=layup, name="laminate")
+    depth_first = OptimizedLaminate(laminate, 0.1, {"Nx": 600, "Nxy": 300}, [0.005, None, 0.02])
+    with_workers = OptimizedLaminate(laminate, 0.1, {"Nx": 600, "Nxy": 300}, [0.005, None, 0.02], workers=2)
+    assert [ply.orientation for ply in with_workers.layup] == [ply.orientation for ply in depth_first.layup]
+    assert with_workers.thickness == pytest.approx(depth_first.thickness)
+
+
+def test_checkpoint_resume_gives_the_complete_result(tmp_path):
+    path = str(tmp_path/"search.pkl")
+    reference = strip_search(KEVLAR)
+    reference_layup = reference.search()
+    while True:
+        result = strip_search(KEVLAR).search_anytime(max_evaluations=10, checkpoint=path)
+        if result.complete:
+            break
+    assert result.layup.orientations.tolist() == reference_layup.orientations.tolist()
+    assert result.thickness == pytest.approx(reference_layup.thickness)
+
+
+def test_checkpoint_is_not_restored_for_another_material(tmp_path):
+    path = str(tmp_path/"search.pkl")
+    strip_search(KEVLAR).search_anytime(max_evaluations=10, checkpoint=path)
+    with pytest.raises(ValueError):
+        strip_search(CARBON).load_checkpoint(path)
+    with pytest.raises(ValueError):
+        strip_search(KEVLAR.replace(E2=2*KEVLAR["E2"])).search_anytime(max_evaluations=10, checkpoint=path)
+    strip_search(KEVLAR).load_checkpoint(path)
+
+
+def test_budget_stops_early_with_a_valid_gap():
+    # A layup twice as thick as the rough layup, which leaves many plies to strip
+    half = np.repeat(ORIENTATIONS, [12, 10, 10])
+    layup = Layup.uniform(material=KEVLAR, orientations=np.concatenate([half, half[::-1]]), thickness=0.1)
+    optimum = PlyStripSearch(layup, ORIENTATIONS, LOAD_CASE, DEFORMATION_LIMITS).search().thickness
+    search = PlyStripSearch(layup, ORIENTATIONS, LOAD_CASE, DEFORMATION_LIMITS)
+    result = search.search_anytime(max_evaluations=5)
+    assert not result.complete
+    assert result.n_evaluations <= 5 + len(ORIENTATIONS)
+    assert result.lower_bound <= optimum + 1e-12
+    assert result.thickness >= optimum - 1e-12
+    assert result.gap == pytest.approx(result.thickness - result.lower_bound)
+    assert result.relative_gap == pytest.approx(result.gap/result.thickness)
+    assert result.gap >= result.thickness - optimum - 1e-12 > 0
+    laminate = Laminate(layup=result.layup, name="best_so_far")
+    assert result.thickness == pytest.approx(laminate.thickness)
+    assert max(laminate.calculate_exposure_factors(LOAD_CASE, DEFORMATION_LIMITS)) < 1
+
+    # Continuing the same search completes it, closing the gap at the optimum
+    while not result.complete:
+        result = search.search_anytime(max_evaluations=100)
+    assert result.thickness == pytest.approx(optimum)
+    assert result.gap == 0
+
+
+@pytest.mark.parametrize("budget", [{"max_time": 1}, {"max_evaluations": 10}, {"checkpoint": "search.pkl"}])
+def test_budget_cannot_be_combined_with_workers(budget):
+    laminate = Laminate(layup=rough_layup(KEVLAR), name="laminate")
+    with pytest.raises(ValueError):
+        OptimizedLaminate(laminate, 0.1, LOAD_CASE, DEFORMATION_LIMITS, workers=2, **budget)
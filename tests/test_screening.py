@@ -0,0 +1,61 @@
+import numpy as np
+
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from screening import screen_exposure
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+ORIENTATIONS = [0, 45, -45, -45, 45, 0]
+LOAD_CASES = [{"Nx": 600, "Nxy": 300}, {"Nx": -200, "Ny": 100}]
+DEFORMATION_LIMITS = [0.005, 0.005, 0.005]
+
+
+def candidates() -> tuple:
+    # In-plane exposure factors scale with 1/thickness, so scaling the plies of a reference laminate by its exposure
+    # factor gives candidates arbitrarily close to 1 on either side
+    reference = Laminate(Layup.uniform(material=KEVLAR, orientations=ORIENTATIONS, thickness=1), "reference")
+    critical_thickness = max(reference.calculate_exposure_factors(LOAD_CASES, DEFORMATION_LIMITS))
+    rng = np.random.default_rng(0)
+    scales = np.concatenate([1 + np.array([-1e-3, -1e-4, -1e-5, -1e-7, 1e-7, 1e-5, 1e-4, 1e-3]),
+                             rng.uniform(0.5, 2, 30)])
+    thicknesses = np.repeat(critical_thickness*scales[:, None], len(ORIENTATIONS), axis=1)
+    # Candidates without plies are padded with zero-thickness plies only
+    thicknesses = np.concatenate([thicknesses, np.zeros((3, len(ORIENTATIONS)))])
+    orientations = np.tile(np.asarray(ORIENTATIONS, float), (len(thicknesses), 1))
+    material_indices = np.zeros(orientations.shape, np.int16)
+    order = rng.permutation(len(thicknesses))
+    return orientations[order], thicknesses[order], material_indices[order]
+
+
+def test_float32_gives_the_same_feasibility_as_float64():
+    orientations, thicknesses, material_indices = candidates()
+    exposure_64, feasible_64, n_reverified_64 = screen_exposure(orientations, thicknesses, material_indices, [KEVLAR],
+                                                                LOAD_CASES, DEFORMATION_LIMITS, precision="float64",
+                                                                chunk_size=7)
+    exposure_32, feasible_32, n_reverified_32 = screen_exposure(orientations, thicknesses, material_indices, [KEVLAR],
+                                                                LOAD_CASES, DEFORMATION_LIMITS, precision="float32",
+                                                                chunk_size=7)
+    assert n_reverified_64 == 0
+    assert n_reverified_32 > 0
+    np.testing.assert_array_equal(feasible_32, feasible_64)
+    assert 0 < feasible_64.sum() < len(feasible_64)
+
+    empty = thicknesses.sum(axis=1) == 0
+    assert np.isinf(exposure_32[empty]).all() and np.isinf(exposure_64[empty]).all()
+    assert not feasible_32[empty].any()
+    np.testing.assert_allclose(exposure_32[~empty], exposure_64[~empty], rtol=1e-4)
+    # The candidates near 1 are re-evaluated in float64
+    near = np.abs(exposure_64 - 1) < 1e-3
+    np.testing.assert_array_equal(exposure_32[near], exposure_64[near])
+
+
+def test_float64_matches_laminate():
+    orientations, thicknesses, material_indices = candidates()
+    exposure, _, _ = screen_exposure(orientations, thicknesses, material_indices, [KEVLAR], LOAD_CASES,
+                                     DEFORMATION_LIMITS, precision="float64", chunk_size=7)
+    for candidate_thicknesses, candidate_exposure in zip(thicknesses, exposure):
+        if candidate_thicknesses.sum() > 0:
+            layup = Layup.uniform(material=KEVLAR, orientations=ORIENTATIONS, thickness=candidate_thicknesses[0])
+            expected = max(Laminate(layup, "candidate").calculate_exposure_factors(LOAD_CASES, DEFORMATION_LIMITS))
+            np.testing.assert_allclose(candidate_exposure, expected, rtol=1e-12)
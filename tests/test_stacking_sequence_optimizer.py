@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import matlib
+from Laminate import Laminate
+from Layup import Layup
+from OptimizedLaminate import OptimizedLaminate
+from StackingSequenceOptimizer import EMPTY, StackingSequenceOptimizer
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+LOAD_CASE = {"Nx": 600, "Nxy": 300}
+DEFORMATION_LIMITS = [0.005, None, 0.005]
+
+
+def optimizer(**kwargs) -> StackingSequenceOptimizer:
+    arguments = dict(material=KEVLAR, ply_thickness=0.1, load_case=LOAD_CASE, deformation_limits=DEFORMATION_LIMITS,
+                     angles=(0, 45, 90), max_plies=48, seed=0)
+    arguments.update(kwargs)
+    return StackingSequenceOptimizer(**arguments)
+
+
+def test_decode_is_symmetric_and_balanced():
+    search = optimizer()
+    genomes = search.initial_population()
+    orientations, thicknesses = search.decode(genomes)
+    np.testing.assert_array_equal(orientations, orientations[:, ::-1])
+    np.testing.assert_array_equal(thicknesses, thicknesses[:, ::-1])
+    for genome, genome_orientations, genome_thicknesses in zip(genomes, orientations, thicknesses):
+        present = genome_thicknesses > 0
+        # A 45 degree slot holds a +45/-45 pair, 0 and 90 degree slots hold a single ply on each side
+        assert (genome_orientations[present] == 45).sum() == (genome_orientations[present] == -45).sum()
+        n_pairs = (genome == 1).sum()
+        n_singles = ((genome != EMPTY) & (genome != 1)).sum()
+        assert present.sum() == 2*(2*n_pairs + n_singles)
+
+
+def test_unbalanced_slots_hold_one_ply():
+    search = optimizer(angles=(0, 45, -45, 90), balanced=False)
+    genome = np.array([[0, 1, EMPTY, 2] + [EMPTY]*(search.n_slots - 4)], np.int16)
+    orientations, thicknesses = search.decode(genome)
+    assert orientations[0][thicknesses[0] > 0].tolist() == [0, 45, -45, -45, 45, 0]
+
+
+def test_evaluate_matches_laminate():
+    search = optimizer(angles=(0, 15, 45, 90))
+    genomes = search.initial_population()
+    thicknesses, max_exposure = search.evaluate(genomes)
+    for genome, thickness, exposure in zip(genomes, thicknesses, max_exposure):
+        laminate = Laminate(layup=search.layup(genome), name="genome")
+        assert thickness == pytest.approx(laminate.thickness)
+        if np.isfinite(exposure):
+            assert exposure == pytest.approx(max(laminate.calculate_exposure_factors(LOAD_CASE, DEFORMATION_LIMITS)))
+        else:
+            assert len(laminate.layup) > search.max_plies
+
+
+def test_polish_returns_feasible_genomes():
+    search = optimizer(max_plies=96)
+    genomes = search.initial_population()
+    _, max_exposure = search.evaluate(genomes)
+    feasible = genomes[max_exposure < 1]
+    assert len(feasible)
+    for genome in feasible:
+        polished = search.polish(genome)
+        polished_thickness, polished_exposure = search.evaluate(polished[None, :])
+        assert polished_exposure[0] < 1
+        assert polished_thickness[0] <= search.evaluate(genome[None, :])[0][0]
+
+
+def test_optimize_is_no_thicker_than_ply_stripping():
+    laminate = Laminate(layup=Layup.uniform(material=KEVLAR, orientations=[0, 45, -45, -45, 45, 0], thickness=1),
+                        name="Kevlar_Laminate")
+    stripped = OptimizedLaminate(laminate=laminate, ply_thickness=0.1, load_case=LOAD_CASE,
+                                 deformation_limits=DEFORMATION_LIMITS)
+    search = optimizer(angles=(0, 45, -45, 90), balanced=False, max_plies=96, population_size=200, seed=1)
+    optimized = search.optimize()
+    assert search.best_feasible
+    assert max(optimized.calculate_exposure_factors(LOAD_CASE, DEFORMATION_LIMITS)) < 1
+    assert optimized.thickness <= stripped.thickness + 1e-9
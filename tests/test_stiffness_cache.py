@@ -0,0 +1,32 @@
+import matlib
+import stiffness_cache
+from Laminate import Laminate
+from Layup import Layup
+
+KEVLAR = matlib.get_material("Kevlar-49/Epoxy")
+
+
+def test_qt_miss_is_not_counted_as_a_q_lookup():
+    cache = stiffness_cache.StiffnessCache()
+    cache.get_Qt(KEVLAR, 45)
+    assert cache.info()["kinds"]["Qt"] == {"hits": 0, "misses": 1}
+    assert cache.info()["kinds"]["Q"] == {"hits": 0, "misses": 0}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_repeated_laminate_construction_has_no_new_qt_misses():
+    layup = Layup.uniform(material=KEVLAR, orientations=[0, 45, -45, 90, 90, -45, 45, 0], thickness=0.1)
+    Laminate(layup=layup, name="first").compute_ABD()
+    misses = stiffness_cache.cache.info()["kinds"]["Qt"]["misses"]
+    for _ in range(3):
+        Laminate(layup=layup, name="repeated").compute_ABD()
+    assert stiffness_cache.cache.info()["kinds"]["Qt"]["misses"] == misses
+
+
+def test_clear_resets_the_counters():
+    cache = stiffness_cache.StiffnessCache()
+    cache.get_Q(KEVLAR)
+    cache.get_Q(KEVLAR)
+    cache.clear()
+    assert cache.info() == {"hits": 0, "misses": 0, "maxsize": cache.maxsize, "currsize": 0,
+                            "kinds": {kind: {"hits": 0, "misses": 0} for kind in ("Q", "Qt", "Te")}}
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import matlib
+import surface_sweep
+from Laminate import Laminate
+from Layup import Layup
+
+GFRP = matlib.get_material("E-glass/Epoxy")
+ORIENTATIONS = [0, 90, 45, -45, -45, 45, 90, 0]
+
+
+def reference_grids(material, layup: Layup, orientation: float, dimension: int) -> list:
+    # The effective properties of one Laminate per grid cell, relative to the nominal laminate
+    X, Y = surface_sweep.deviation_axes(dimension)
+    nominal = Laminate(layup.rotated(orientation), "nominal").calculate_laminate_properties()
+    grids = np.zeros((4, dimension, dimension))
+    for i in range(dimension):
+        for j in range(dimension):
+            cell_material = material.replace(E2=material["E2"]*(1+X[i, j]/100), G12=material["G12"]*(1+Y[i, j]/100))
+            laminate = Laminate(layup.rotated(orientation).with_material(cell_material), "cell")
+            grids[:, i, j] = laminate.calculate_laminate_properties()
+    return [100*(grid-value)/value for grid, value in zip(grids, nominal)]
+
+
+@pytest.mark.parametrize("orientation", [0, 30])
+def test_grids_match_laminate(orientation):
+    layup = Layup.uniform(material=GFRP, orientations=ORIENTATIONS, thickness=0.5)
+    cache = surface_sweep.SweepCache()
+    X, Y, *grids = surface_sweep.deviation_grids(material=GFRP, layup=layup, orientation=orientation, dimension=5,
+                                                 cache=cache)
+    for grid, expected in zip(grids, reference_grids(GFRP, layup, orientation, 5)):
+        np.testing.assert_allclose(grid, expected, rtol=1e-10, atol=1e-10)
+
+
+def test_grids_are_cached_read_only():
+    layup = Layup.uniform(material=GFRP, orientations=ORIENTATIONS, thickness=0.5)
+    cache = surface_sweep.SweepCache()
+    first = surface_sweep.deviation_grids(material=GFRP, layup=layup, orientation=15, dimension=5, cache=cache)
+    misses = cache.misses
+    second = surface_sweep.deviation_grids(material=GFRP, layup=layup, orientation=15, dimension=5, cache=cache)
+    assert all(a is b for a, b in zip(first, second))
+    assert cache.misses == misses and cache.hits == 1
+    assert not any(grid.flags.writeable for grid in first)
+    # Another orientation reuses the invariants of the material grid
+    surface_sweep.deviation_grids(material=GFRP, layup=layup, orientation=30, dimension=5, cache=cache)
+    assert cache.misses == misses + 1 and cache.hits == 2
@@ -0,0 +1,32 @@
+import laminatelib
+import numpy as np
+import pytest
+
+import matlib
+from transformations_3d import rotate_compliance, rotate_stiffness, sequence_transformations
+
+MATERIAL = matlib.get_material("Carbon/Epoxy(a)")
+ANGLES = [-90, -60, -45, -15, 0, 10, 30, 45, 75, 90]
+
+
+def test_rotations_about_z_match_laminatelib():
+    C, S = laminatelib.C3D(MATERIAL), laminatelib.S3D(MATERIAL)
+    rotated_C = rotate_stiffness(C, ["z"], np.array(ANGLES)[:, None])
+    rotated_S = rotate_compliance(S, ["z"], np.array(ANGLES)[:, None])
+    for angle, C_batch, S_batch in zip(ANGLES, rotated_C, rotated_S):
+        Ts, Te = laminatelib.T3Ds(angle), laminatelib.T3De(angle)
+        np.testing.assert_allclose(C_batch, np.linalg.inv(Ts) @ C @ Te, rtol=1e-12, atol=1e-8*np.abs(C).max())
+        np.testing.assert_allclose(S_batch, np.linalg.inv(Te) @ S @ Ts, rtol=1e-12, atol=1e-8*np.abs(S).max())
+
+
+def test_sequence_matches_the_product_of_laminatelib_transformations():
+    Ts, Te = sequence_transformations(["z", "z"], [30, 45])
+    np.testing.assert_allclose(Ts[0], laminatelib.T3Ds(30) @ laminatelib.T3Ds(45), atol=1e-12)
+    np.testing.assert_allclose(Te[0], laminatelib.T3De(30) @ laminatelib.T3De(45), atol=1e-12)
+
+
+@pytest.mark.parametrize("axes, angles", [(["x", "z"], [90, 30]), (["y", "x", "z"], [-45, 20, 60])])
+def test_rotated_stiffness_and_compliance_are_inverse(axes, angles):
+    C, S = laminatelib.C3D(MATERIAL), laminatelib.S3D(MATERIAL)
+    product = rotate_stiffness(C, axes, angles)[0] @ rotate_compliance(S, axes, angles)[0]
+    np.testing.assert_allclose(product, np.eye(6), atol=1e-10)
@@ -0,0 +1,157 @@
+import numpy as np
+from numpy import ndarray
+
+# Voigt notation order of the stress and strain components: 11, 22, 33, 23, 13, 12
+VOIGT_PAIRS = ((0, 0), (1, 1), (2, 2), (1, 2), (0, 2), (0, 1))
+# Factor between the tensor and the engineering strain components
+VOIGT_STRAIN_FACTORS = np.array([1, 1, 1, 2, 2, 2], float)
+AXES = ("x", "y", "z")
+
+
+def compliance_matrix(E1, E2, E3, v12, v13, v23, G12, G13, G23) -> ndarray:
+    """
+    The compliance matrix of an orthotropic material in its principal coordinate system, as "S_bar" in
+    "stiffness_matrix_transformations.py". The constants may be broadcastable arrays.
+    :return: The compliance matrices with shape (..., 6, 6).
+    """
+    constants = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in (E1, E2, E3, v12, v13, v23,
+                                                                                  G12, G13, G23)])
+    E1, E2, E3, v12, v13, v23, G12, G13, G23 = constants
+    S = np.zeros(E1.shape + (6, 6), float)
+    S[..., 0, 0] = 1/E1
+    S[..., 1, 1] = 1/E2
+    S[..., 2, 2] = 1/E3
+    S[..., 0, 1] = S[..., 1, 0] = -v12/E1
+    S[..., 0, 2] = S[..., 2, 0] = -v13/E1
+    S[..., 1, 2] = S[..., 2, 1] = -v23/E2
+    S[..., 3, 3] = 1/G23
+    S[..., 4, 4] = 1/G13
+    S[..., 5, 5] = 1/G12
+    return S
+
+
+def rotation_matrices(axes, angles) -> ndarray:
+    """
+    Direction cosines of coordinate systems rotated about one of the axes, using the same sign convention as the
+    laminatelib transformation matrices.
+    :param axes: The rotation axes, "x", "y" or "z", broadcastable against the angles.
+    :param angles: The rotation angles in degrees, of any shape (...).
+    :return: The rotation matrices with shape (..., 3, 3), where row i holds the new axis i in the old system.
+    """
+    angles = np.radians(np.asarray(angles, dtype=float))
+    axes = np.broadcast_to(np.asarray(axes), angles.shape)
+    if not np.isin(axes, AXES).all():
+        raise ValueError("Rotation axes must be one of {}".format(AXES))
+    c, s = np.cos(angles), np.sin(angles)
+    R = np.zeros(angles.shape + (3, 3), float)
+    for axis_index, axis in enumerate(AXES):
+        selected = axes == axis
+        i, j = [k for k in range(3) if k != axis_index]
+        R[selected, axis_index, axis_index] = 1
+        R[selected, i, i] = c[selected]
+        R[selected, j, j] = c[selected]
+        # The sign is reversed for rotations about y, where the cyclic order of the remaining axes is (z, x)
+        sign = -1 if axis == "y" else 1
+        R[selected, i, j] = sign*s[selected]
+        R[selected, j, i] = -sign*s[selected]
+    return R
+
+
+def stress_transformation(R: ndarray) -> ndarray:
+    """
+    The stress transformation matrices Ts (sigma' = Ts sigma) in Voigt notation for the given rotation matrices.
+    :param R: Rotation matrices with shape (..., 3, 3).
+    :return: The transformation matrices with shape (..., 6, 6).
+    """
+    # The components are built with the matrix indices first, so each component is a contiguous array
+    R = np.ascontiguousarray(np.moveaxis(R, (-2, -1), (0, 1)))
+    Ts = np.empty((6, 6) + R.shape[2:], float)
+    for row, (i, j) in enumerate(VOIGT_PAIRS):
+        for column, (k, m) in enumerate(VOIGT_PAIRS):
+            if k == m:
+                np.multiply(R[i, k], R[j, k], out=Ts[row, column, ...])
+            else:
+                np.multiply(R[i, k], R[j, m], out=Ts[row, column, ...])
+                Ts[row, column, ...] += R[i, m]*R[j, k]
+    return np.moveaxis(Ts, (0, 1), (-2, -1))
+
+
+def strain_transformation(R: ndarray) -> ndarray:
+    """
+    The strain transformation matrices Te (epsilon' = Te epsilon) in Voigt notation with engineering shear strains.
+    :param R: Rotation matrices with shape (..., 3, 3).
+    :return: The transformation matrices with shape (..., 6, 6).
+    """
+    return stress_transformation(R)*VOIGT_STRAIN_FACTORS[:, None]/VOIGT_STRAIN_FACTORS[None, :]
+
+
+def _sequence_product(transformation, axes, angles) -> ndarray:
+    angles = np.atleast_2d(np.asarray(angles, dtype=float))
+    axes = np.broadcast_to(np.asarray(axes), angles.shape)
+    steps = transformation(rotation_matrices(axes, angles))
+    T = steps[:, 0]
+    for k in range(1, angles.shape[1]):
+        T = T @ steps[:, k]
+    return T
+
+
+def sequence_transformations(axes, angles) -> tuple:
+    """
+    The combined stress and strain transformation matrices of sequences of rotations. The rotations are applied in the
+    order given, e.g. axes=("z", "x") and angles=(-90, 90) gives the transformation of case C in
+    "stiffness_matrix_transformations.py".
+    :param axes: The rotation axes with shape (K,) or (N, K).
+    :param angles: The rotation angles in degrees with shape (K,) or (N, K).
+    :return: The combined Ts and Te, each with shape (N, 6, 6).
+    """
+    return _sequence_product(stress_transformation, axes, angles), \
+        _sequence_product(strain_transformation, axes, angles)
+
+
+def rotate_stiffness(C: ndarray, axes, angles) -> ndarray:
+    """
+    Rotates stiffness matrices through sequences of rotations, using inv(Ts) = Te^T instead of a matrix inversion.
+    :param C: A stiffness matrix with shape (6, 6), or one per sequence with shape (N, 6, 6).
+    :param axes: The rotation axes with shape (K,) or (N, K).
+    :param angles: The rotation angles in degrees with shape (K,) or (N, K).
+    :return: The rotated stiffness matrices with shape (N, 6, 6).
+    """
+    Te = _sequence_product(strain_transformation, axes, angles)
+    return np.swapaxes(Te, -1, -2) @ C @ Te
+
+
+def rotate_compliance(S: ndarray, axes, angles) -> ndarray:
+    """
+    Rotates compliance matrices through sequences of rotations, using inv(Te) = Ts^T instead of a matrix inversion.
+    :param S: A compliance matrix with shape (6, 6), or one per sequence with shape (N, 6, 6).
+    :param axes: The rotation axes with shape (K,) or (N, K).
+    :param angles: The rotation angles in degrees with shape (K,) or (N, K).
+    :return: The rotated compliance matrices with shape (N, 6, 6).
+    """
+    Ts = _sequence_product(stress_transformation, axes, angles)
+    return np.swapaxes(Ts, -1, -2) @ S @ Ts
+
+
+def engineering_constants_from_compliance(S: ndarray) -> dict:
+    """
+    :param S: Compliance matrices with shape (6, 6) or (..., 6, 6).
+    :return: The engineering constants, each a float or an array with shape (...).
+    """
+    return {"E_1": 1/S[..., 0, 0],
+            "E_2": 1/S[..., 1, 1],
+            "E_3": 1/S[..., 2, 2],
+            "G_23": 1/S[..., 3, 3],
+            "G_13": 1/S[..., 4, 4],
+            "G_12": 1/S[..., 5, 5],
+            "v_12": -S[..., 0, 1]/S[..., 0, 0],
+            "v_13": -S[..., 0, 2]/S[..., 0, 0],
+            "v_23": -S[..., 1, 2]/S[..., 1, 1]}
+
+
+def compute_engineering_constants(C: ndarray) -> dict:
+    """
+    :param C: Stiffness matrices with shape (6, 6) or (..., 6, 6). Prefer "engineering_constants_from_compliance" on
+    the output of "rotate_compliance", which needs no inversion.
+    :return: The engineering constants, each a float or an array with shape (...).
+    """
+    return engineering_constants_from_compliance(np.linalg.inv(C))